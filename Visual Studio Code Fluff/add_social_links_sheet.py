@@ -1,54 +1,23 @@
-import pandas as pd
-import openpyxl
-from openpyxl.utils.dataframe import dataframe_to_rows
+import os
+import sys
 
-# Read the CSV file
-print("Reading the CSV file...")
-df = pd.read_csv('rappers_final_enriched.csv')
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-# Define the columns we want to keep
-columns_to_keep = [
-    'Artist',
-    'instagram_url',
-    'instagram_handle',
-    'tiktok_url',
-    'tiktok_handle',
-    'youtube_url',
-    'youtube_channel_id',
-    'soundcloud_url',
-    'soundcloud_handle',
-    'twitter_url',
-    'twitter_handle',
-    'facebook_url',
-    'website_url'
-]
+from social_links.excel_export import frame_rows, replace_sheet
+from social_links.store import SOCIAL_LINK_COLUMNS, ArtistStore
 
-# Create a new dataframe with only the selected columns
-print("Extracting artist and social media columns...")
-social_links_df = df[columns_to_keep].copy()
+# Read only the artist and social media columns from the store
+print("Reading the social links from the artist store...")
+social_links_df = ArtistStore().read('rappers', columns=SOCIAL_LINK_COLUMNS)
+social_links_df = social_links_df.rename(columns={'artist_name': 'Artist'})
+columns_to_keep = list(social_links_df.columns)
 
-# Load the existing Excel file
-print("Loading existing Excel file...")
+# Swap the 'Social Links' sheet (added if missing) into the existing Excel
+# file; the other sheets are copied as-is, never parsed
 excel_file = 'rappers_final_enriched.xlsx'
-workbook = openpyxl.load_workbook(excel_file)
-
-# Check if 'Social Links' sheet already exists and remove it
-if 'Social Links' in workbook.sheetnames:
-    print("Removing existing 'Social Links' sheet...")
-    del workbook['Social Links']
-
-# Create a new sheet for social links
-print("Creating new 'Social Links' sheet...")
-social_sheet = workbook.create_sheet('Social Links')
-
-# Write the dataframe to the new sheet
-print("Writing data to the new sheet...")
-for row in dataframe_to_rows(social_links_df, index=False, header=True):
-    social_sheet.append(row)
-
-# Save the workbook
-print("Saving the updated Excel file...")
-workbook.save(excel_file)
+print("Writing the 'Social Links' sheet...")
+replace_sheet(excel_file, 'Social Links', *frame_rows(social_links_df))
 
 print(f"\nSuccess! Added 'Social Links' sheet to {excel_file}")
 print(f"Total artists: {len(social_links_df)}")
@@ -7,36 +7,6 @@ facebook_url, website_url, lookup_status, Artist_Type
 """
 
 import pandas as pd
-import re
-
-def extract_youtube_channel_id(youtube_url):
-    """Extract YouTube channel ID from URL"""
-    if pd.isna(youtube_url) or not youtube_url:
-        return None
-    
-    url_str = str(youtube_url).strip()
-    
-    # Pattern for /channel/ URLs (actual channel IDs)
-    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', url_str)
-    if channel_match:
-        return channel_match.group(1)
-    
-    # Pattern for @handle URLs (new YouTube format)
-    handle_match = re.search(r'/@([a-zA-Z0-9_.-]+)', url_str)
-    if handle_match:
-        return f"@{handle_match.group(1)}"
-    
-    # Pattern for /c/ custom URLs
-    custom_match = re.search(r'/c/([a-zA-Z0-9_-]+)', url_str)
-    if custom_match:
-        return f"c/{custom_match.group(1)}"
-    
-    # Pattern for /user/ URLs
-    user_match = re.search(r'/user/([a-zA-Z0-9_-]+)', url_str)
-    if user_match:
-        return f"user/{user_match.group(1)}"
-    
-    return None
 
 def main():
     # Read the DJProducers file
@@ -3,32 +3,21 @@
 Analyze social media links in female_singers_final.xlsx
 """
 
-import pandas as pd
-import re
+import os
+import sys
 
-def extract_youtube_channel_id(youtube_url):
-    """Extract YouTube channel ID from URL"""
-    if pd.isna(youtube_url) or not youtube_url:
-        return None
-    
-    # Pattern for /channel/ URLs
-    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', str(youtube_url))
-    if channel_match:
-        return channel_match.group(1)
-    
-    # Pattern for @handle URLs
-    handle_match = re.search(r'/@([a-zA-Z0-9_.-]+)', str(youtube_url))
-    if handle_match:
-        return f"@{handle_match.group(1)}"
-    
-    return None
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.file_cache import read_excel
+from social_links.handles import youtube_channel_ids
 
 def main():
     # Read the Excel file
     file_path = 'Final_Social Links/female_singers_final.xlsx'
     print(f"Reading {file_path}...\n")
     
-    df = pd.read_excel(file_path)
+    df = read_excel(file_path)
     
     print("="*80)
     print("SOCIAL MEDIA LINKS ANALYSIS")
@@ -60,12 +49,7 @@ def main():
     print("="*80)
     
     youtube_urls = df[df['youtube_url'].notna()]['youtube_url']
-    extractable = 0
-    
-    for url in youtube_urls:
-        channel_id = extract_youtube_channel_id(url)
-        if channel_id:
-            extractable += 1
+    extractable = int(youtube_channel_ids(youtube_urls).notna().sum())
     
     print(f"YouTube URLs present: {len(youtube_urls)}")
     print(f"Channel IDs extractable: {extractable}")
@@ -2,58 +2,67 @@
 """
 Create a multi-sheet Excel file for DJ Producers with:
 - Sheet 1: Original data from source file
-- Sheet 2: Social media links only
+- Sheet 2: Social media links only, from the artist store
 """
 
+import os
+import sys
+
 import pandas as pd
 
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.excel_export import StreamingWorkbook, frame_rows
+from social_links.store import ArtistStore
+
+CATEGORY = 'dj_producers'
+
+# Links joined on from the store; only these columns are read from it
+STORE_COLUMNS = [
+    'spotify_id',
+    'instagram_url',
+    'instagram_handle',
+    'tiktok_url',
+    'tiktok_handle',
+    'youtube_url',
+    'youtube_channel_id',
+    'soundcloud_url',
+    'soundcloud_handle',
+    'twitter_url',
+    'twitter_handle',
+    'facebook_url',
+    'website_url',
+    'lookup_status'
+]
+
 def main():
-    # Read the original source file
-    original_file = 'Soundcharts Pulled-Out Data/DJProducers.xlsx'
-    enriched_file = 'Final_Social Links/dj_producers_final_enriched.xlsx'
+    # Read the original source file (the CSV of the same Soundcharts pull
+    # parses far faster than the .xlsx)
+    original_file = 'Soundcharts Pulled-Out Data/DJProducers.csv'
     output_file = 'Final_Social Links/dj_producers_final.xlsx'
     
     print(f"Reading original file: {original_file}...")
-    df_original = pd.read_excel(original_file)
-    
-    print(f"Reading enriched file: {enriched_file}...")
-    df_enriched = pd.read_excel(enriched_file)
-    
-    # Define social media columns
-    social_columns = [
-        'Artist',  # Keep artist name for reference
-        'Artist country',  # Keep country for reference
-        'spotify_id',
-        'instagram_url',
-        'instagram_handle',
-        'tiktok_url',
-        'tiktok_handle',
-        'youtube_url',
-        'youtube_channel_id',
-        'soundcloud_url',
-        'soundcloud_handle',
-        'twitter_url',
-        'twitter_handle',
-        'facebook_url',
-        'website_url',
-        'lookup_status',
-        'Artist_Type'
-    ]
+    df_original = pd.read_csv(original_file, low_memory=False)
     
-    # Create social links dataframe
-    df_social = df_enriched[social_columns].copy()
+    # Social media columns: name and country for reference, links from the store
+    print(f"Reading social links from the artist store ({CATEGORY})...")
+    store = ArtistStore()
+    df_social = store.join_by_name(CATEGORY, df_original[['Artist', 'Artist country']],
+                                   name_col='Artist', columns=STORE_COLUMNS)
+    df_social['Artist_Type'] = 'DJ/Producer'
     
     print(f"\nCreating multi-sheet Excel file...")
     print(f"  Sheet 1 'Original Data': {len(df_original)} rows, {len(df_original.columns)} columns")
     print(f"  Sheet 2 'Social Links': {len(df_social)} rows, {len(df_social.columns)} columns")
     
-    # Create Excel writer
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    # Write-only workbook: rows are streamed out instead of held as cells
+    with StreamingWorkbook(output_file) as wb:
         # Write original data to first sheet
-        df_original.to_excel(writer, sheet_name='Original Data', index=False)
+        wb.add_sheet('Original Data', *frame_rows(df_original))
         
         # Write social links to second sheet
-        df_social.to_excel(writer, sheet_name='Social Links', index=False)
+        wb.add_sheet('Social Links', *frame_rows(df_social))
     
     print(f"\n✓ Multi-sheet Excel file created: {output_file}")
     
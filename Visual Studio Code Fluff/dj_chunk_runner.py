@@ -3,13 +3,17 @@
 Simple chunked DJ processor - runs a specific range
 """
 import os
-import re
 import sys
-import time
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.negative_cache import NegativeCache
+from social_links.soundcloud import search_soundcloud
+from social_links.spotify import SpotifyClient
+
 load_dotenv()
 
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
@@ -26,69 +30,13 @@ COLUMNS = [
     "lookup_status", "error_message",
 ]
 
-class SpotifyClient:
-    def __init__(self):
-        self.session = requests.Session()
-        self.token_expires_at = 0
-        self._refresh()
-
-    def _refresh(self):
-        r = requests.post(
-            "https://accounts.spotify.com/api/token",
-            data={"grant_type": "client_credentials"},
-            auth=(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET),
-            timeout=15,
-        )
-        r.raise_for_status()
-        d = r.json()
-        self.session.headers["Authorization"] = f"Bearer {d['access_token']}"
-        self.token_expires_at = time.time() + d.get("expires_in", 3600) - 300
-
-    def search(self, name):
-        if time.time() >= self.token_expires_at:
-            self._refresh()
-        try:
-            r = self.session.get(
-                "https://api.spotify.com/v1/search",
-                params={"q": name, "type": "artist", "limit": 5},
-                timeout=10,
-            )
-            if r.status_code == 429:
-                time.sleep(int(r.headers.get("Retry-After", 3)))
-                return self.search(name)
-            r.raise_for_status()
-            items = r.json().get("artists", {}).get("items", [])
-            if not items:
-                return None
-            for i in items:
-                if i.get("name", "").lower() == name.lower():
-                    return i
-            return items[0]
-        except:
-            return None
-
-def sc_search(name):
-    try:
-        r = requests.get(
-            "https://soundcloud.com/search/people",
-            params={"q": name},
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=8,
-        )
-        skip = {"discover","search","stream","upload","you","pages","settings","charts","stations","people","tracks","sets","groups","tags","popular","pro","go","creators","feed","library"}
-        for m in re.findall(r'href="/([a-zA-Z0-9_-]+)"', r.text):
-            if m.lower() not in skip and len(m) > 1:
-                return {"url": f"https://soundcloud.com/{m}", "handle": m}
-    except:
-        pass
-    return None
-
 def process(start, end, outfile):
     df = pd.read_csv("dj_producers_input.csv")
     end = min(end, len(df))
     print(f"Chunk {start}-{end} -> {outfile}", flush=True)
 
-    sp = SpotifyClient()
+    sp = SpotifyClient(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, negative_cache=NegativeCache("spotify"))
+    sc_negatives = NegativeCache("soundcloud")
     rows = []
 
     for i in range(start, end):
@@ -103,14 +51,12 @@ def process(start, end, outfile):
         r["soundcharts_uuid"] = uuid
         src = []
 
-        res = sp.search(name)
-        time.sleep(0.15)
+        res = sp.search_artist(name)
         if res:
             r["spotify_id"] = res.get("id")
             src.append("spotify")
 
-        sc = sc_search(name)
-        time.sleep(0.3)
+        sc = search_soundcloud(name, sc_negatives)
         if sc:
             r["soundcloud_url"] = sc["url"]
             r["soundcloud_handle"] = sc["handle"]
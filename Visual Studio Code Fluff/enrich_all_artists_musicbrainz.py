@@ -13,20 +13,23 @@ Usage:
 
 import os
 import sys
-import time
 import argparse
 import logging
-import requests
 import pandas as pd
 from datetime import datetime
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.mb_replica import MBReplica
+from social_links.musicbrainz import MusicBrainzClient
+from social_links.negative_cache import NO_LINKS, NegativeCache
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 
 USER_AGENT = "ArtistEnrichmentPipeline/1.0 (research project)"
-MB_API_BASE = "https://musicbrainz.org/ws/2"
-REQUEST_DELAY = 1.1  # Rate limit: 1 request per second
 SAVE_INTERVAL = 100  # Save progress every N artists
 
 logging.basicConfig(
@@ -40,123 +43,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# ---------------------------------------------------------------------------
-# MusicBrainz API Client
-# ---------------------------------------------------------------------------
-
-class MusicBrainzClient:
-    """Client for MusicBrainz API lookups."""
-
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": USER_AGENT,
-            "Accept": "application/json",
-        })
-
-    def search_artist(self, name: str):
-        """Search for an artist by name, return best match."""
-        try:
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist",
-                params={"query": f'artist:"{name}"', "limit": 5, "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            artists = data.get("artists", [])
-            if not artists:
-                return None
-
-            # Find exact match
-            for artist in artists:
-                if artist.get("name", "").lower() == name.lower():
-                    return artist
-            # Return best match
-            return artists[0]
-
-        except requests.exceptions.RequestException as e:
-            logger.debug(f"MusicBrainz search error for {name}: {e}")
-            return None
-
-    def get_artist_urls(self, mbid: str):
-        """Get URL relations for an artist by their MusicBrainz ID."""
-        try:
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist/{mbid}",
-                params={"inc": "url-rels", "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            urls = {}
-            for rel in data.get("relations", []):
-                url_obj = rel.get("url", {})
-                url = url_obj.get("resource", "")
-                rel_type = rel.get("type", "").lower()
-
-                if not url:
-                    continue
-
-                if "instagram.com" in url.lower():
-                    urls["instagram_url"] = url
-                    urls["instagram_handle"] = self.extract_handle(url)
-                elif "twitter.com" in url.lower() or "x.com" in url.lower():
-                    urls["twitter_url"] = url
-                    urls["twitter_handle"] = self.extract_handle(url)
-                elif "facebook.com" in url.lower():
-                    urls["facebook_url"] = url
-                elif "tiktok.com" in url.lower():
-                    urls["tiktok_url"] = url
-                    urls["tiktok_handle"] = self.extract_handle(url)
-                elif "youtube.com" in url.lower():
-                    urls["youtube_url"] = url
-                    urls["youtube_channel_id"] = self.extract_youtube_id(url)
-                elif "soundcloud.com" in url.lower():
-                    urls["soundcloud_url"] = url
-                    urls["soundcloud_handle"] = self.extract_handle(url)
-                elif rel_type == "official homepage" or "official" in rel_type:
-                    urls["website_url"] = url
-
-            return urls
-
-        except requests.exceptions.RequestException as e:
-            logger.debug(f"MusicBrainz URL fetch error for {mbid}: {e}")
-            return {}
-
-    @staticmethod
-    def extract_handle(url: str):
-        """Extract handle/username from a social media URL."""
-        if not url:
-            return None
-        try:
-            clean = url.rstrip("/").split("?")[0]
-            parts = clean.split("/")
-            handle = parts[-1] if parts else None
-            if handle and handle.startswith("@"):
-                handle = handle[1:]
-            return handle
-        except:
-            return None
-
-    @staticmethod
-    def extract_youtube_id(url: str):
-        """Extract YouTube channel ID from URL."""
-        if not url:
-            return None
-        try:
-            if "/channel/" in url:
-                return url.split("/channel/")[1].split("/")[0].split("?")[0]
-            elif "/@" in url:
-                handle = url.split("/@")[1].split("/")[0].split("?")[0]
-                return f"@{handle}"
-            return None
-        except:
-            return None
-
-
 # ---------------------------------------------------------------------------
 # Main Pipeline
 # ---------------------------------------------------------------------------
@@ -175,12 +61,36 @@ def enrich_file(input_file: str, output_file: str, resume_from: int = 0):
     if "musicbrainz_id" not in df.columns:
         df["musicbrainz_id"] = None
 
-    client = MusicBrainzClient()
+    # Artists with no match (or no links) are skipped until the entry expires
+    negatives = NegativeCache("musicbrainz")
+    # Answered from the local dump replica when one has been ingested
+    client = MusicBrainzClient(USER_AGENT, negative_cache=negatives, replica=MBReplica.open_existing())
     processed = 0
     enriched = 0
     found_count = 0
     skipped = 0
 
+    # Rows with a Spotify ID get their MBID from batched URL lookups
+    # (100 per request) instead of a name search each
+    resolved = {}
+    if "spotify_id" in df.columns:
+        spotify_ids = df["spotify_id"].iloc[resume_from:].dropna().astype(str).str.strip()
+        spotify_ids = spotify_ids[~spotify_ids.isin(["", "nan", "None"])].unique()
+        logger.info(f"Resolving {len(spotify_ids)} Spotify IDs to MBIDs...")
+        resolved = client.resolve_spotify_ids(spotify_ids)
+        logger.info(f"Resolved {len(resolved)} MBIDs; the rest fall back to a name search")
+
+    # The rest are searched 20 names per request; names a batch can't place
+    # are searched one by one in the loop below
+    pending = df.iloc[resume_from:]
+    pending = pending[~pending["lookup_status"].astype(str).str.contains("musicbrainz", case=False)]
+    if resolved:
+        pending = pending[~pending["spotify_id"].astype(str).str.strip().isin(list(resolved))]
+    names = pending["Artist"].dropna().astype(str).str.strip().unique()
+    logger.info(f"Batch-searching {len(names)} artists...")
+    searched = {name: hit["id"] for name, hit in client.search_artists(names, fallback=False).items() if hit}
+    logger.info(f"Batch search matched {len(searched)} of {len(names)}")
+
     logger.info(f"\nStarting MusicBrainz enrichment from row {resume_from}...")
     logger.info(f"Estimated time: ~{(total - resume_from) * 2.2 / 3600:.1f} hours\n")
 
@@ -201,23 +111,26 @@ def enrich_file(input_file: str, output_file: str, resume_from: int = 0):
         if processed % 50 == 0:
             logger.info(f"[{idx}/{total}] Processed: {processed}, Found: {found_count}, Enriched: {enriched}")
 
-        # Search MusicBrainz
-        artist = client.search_artist(artist_name)
-        time.sleep(REQUEST_DELAY)
+        mbid = resolved.get(str(row.get("spotify_id")).strip()) or searched.get(artist_name)
+        if mbid is None:
+            # Search MusicBrainz
+            artist = client.search_artist(artist_name)
 
-        if not artist:
-            continue
+            if not artist:
+                continue
 
-        mbid = artist.get("id")
-        mb_name = artist.get("name", "")
+            mbid = artist.get("id")
 
-        # Get URL relations
-        urls = client.get_artist_urls(mbid)
-        time.sleep(REQUEST_DELAY)
+        # Get URL relations, already mapped to our columns
+        urls = client.get_links(mbid)
+        if urls is None:
+            # Request failed; not evidence that the artist has no links
+            continue
 
         if not urls:
             found_count += 1
             df.at[idx, "musicbrainz_id"] = mbid
+            negatives.record(artist_name, NO_LINKS, mbid)
             continue
 
         # Update DataFrame with REAL verified URLs
@@ -255,6 +168,7 @@ def enrich_file(input_file: str, output_file: str, resume_from: int = 0):
     logger.info(f"Enriched with social links: {enriched}")
     logger.info(f"Success rate:               {(found_count/processed*100 if processed > 0 else 0):.1f}%")
     logger.info(f"Output: {output_file}")
+    logger.info(negatives.stats())
     logger.info("=" * 80)
 
     return enriched
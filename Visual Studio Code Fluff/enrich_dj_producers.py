@@ -2,7 +2,8 @@
 DJ/Producers Enrichment Pipeline
 
 Processes artists from dj_producers_input.csv using Spotify + YouTube + SoundCloud.
-Outputs to dj_producers_enriched.csv.
+Results are merged into the dj_producers partition of the artist store
+(social_links.store), so columns other scripts filled in are kept.
 
 Usage:
     python enrich_dj_producers.py
@@ -10,30 +11,41 @@ Usage:
 """
 
 import os
-import re
 import sys
-import time
 import argparse
 import logging
 from typing import Optional
 
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.checkpoint import CheckpointLog
+from social_links.negative_cache import NegativeCache
+from social_links.soundcloud import search_soundcloud
+from social_links.spotify import SpotifyClient
+from social_links.store import ArtistStore
+from social_links.youtube import YouTubeClient
+
 load_dotenv()
 
 INPUT_CSV = "dj_producers_input.csv"
-OUTPUT_CSV = "dj_producers_enriched.csv"
+# Results are merged into this partition of the canonical artist store; the
+# old output CSV seeds it on first run
+CATEGORY = "dj_producers"
+SEED_CSV = "dj_producers_enriched.csv"
+
+# Each finished artist is appended here (fsynced every SAVE_INTERVAL rows);
+# an interrupted run resumes from it, and it is deleted once merged
+CHECKPOINT_LOG = "dj_producers_checkpoint.jsonl"
 SAVE_INTERVAL = 25
 
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-SPOTIFY_DELAY = 0.3
-YOUTUBE_DELAY = 0.5
-SOUNDCLOUD_DELAY = 1.0
 
 COLUMNS = [
     "artist_name", "soundcharts_uuid", "spotify_id",
@@ -57,142 +69,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class SpotifyClient:
-    TOKEN_URL = "https://accounts.spotify.com/api/token"
-    API_BASE = "https://api.spotify.com/v1"
-
-    def __init__(self, client_id: str, client_secret: str):
-        if not client_id or not client_secret:
-            raise ValueError("SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET required")
-        self.client_id = client_id
-        self.client_secret = client_secret
-        self.session = requests.Session()
-        self.token_expires_at = 0
-        self._refresh_token()
-
-    def _refresh_token(self):
-        resp = requests.post(
-            self.TOKEN_URL,
-            data={"grant_type": "client_credentials"},
-            auth=(self.client_id, self.client_secret),
-            timeout=15,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        self.session.headers["Authorization"] = f"Bearer {data['access_token']}"
-        self.token_expires_at = time.time() + data.get("expires_in", 3600) - 300
-        logger.info("Spotify token refreshed")
-
-    def _ensure_token(self):
-        if time.time() >= self.token_expires_at:
-            self._refresh_token()
-
-    def search_artist(self, name: str) -> Optional[dict]:
-        self._ensure_token()
-        try:
-            resp = self.session.get(
-                f"{self.API_BASE}/search",
-                params={"q": name, "type": "artist", "limit": 5},
-                timeout=15,
-            )
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError:
-            if resp.status_code == 429:
-                retry_after = int(resp.headers.get("Retry-After", 30))
-                logger.warning(f"Spotify rate limit, sleeping {retry_after}s")
-                time.sleep(retry_after)
-                return self.search_artist(name)
-            return None
-
-        items = resp.json().get("artists", {}).get("items", [])
-        if not items:
-            return None
-
-        for item in items:
-            if item.get("name", "").lower() == name.lower():
-                return item
-        return items[0]
-
-
-class YouTubeClient:
-    API_BASE = "https://www.googleapis.com/youtube/v3"
-
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.quota_exhausted = False
-
-    def search_channel(self, artist_name: str) -> Optional[dict]:
-        if self.quota_exhausted:
-            return None
-        try:
-            resp = requests.get(
-                f"{self.API_BASE}/search",
-                params={
-                    "part": "snippet",
-                    "q": f"{artist_name} official artist",
-                    "type": "channel",
-                    "maxResults": 3,
-                    "key": self.api_key,
-                },
-                timeout=15,
-            )
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError:
-            if resp.status_code == 403:
-                logger.warning("YouTube API quota exhausted")
-                self.quota_exhausted = True
-                return None
-            return None
-
-        items = resp.json().get("items", [])
-        if not items:
-            return None
-
-        name_lower = artist_name.lower()
-        for item in items:
-            title = item["snippet"]["title"].lower()
-            channel_id = item["snippet"]["channelId"]
-            if " - topic" in title:
-                continue
-            if name_lower in title or title in name_lower:
-                return {"url": f"https://www.youtube.com/channel/{channel_id}", "channel_id": channel_id}
-
-        for item in items:
-            title = item["snippet"]["title"].lower()
-            if " - topic" not in title:
-                channel_id = item["snippet"]["channelId"]
-                return {"url": f"https://www.youtube.com/channel/{channel_id}", "channel_id": channel_id}
-        return None
-
-
-def search_soundcloud(artist_name: str) -> Optional[dict]:
-    try:
-        resp = requests.get(
-            "https://soundcloud.com/search/people",
-            params={"q": artist_name},
-            headers={"User-Agent": "Mozilla/5.0 (research pipeline)"},
-            timeout=15,
-        )
-        resp.raise_for_status()
-    except requests.exceptions.RequestException:
-        return None
-
-    matches = re.findall(r'href="/([\w\-]+)"', resp.text)
-    skip_paths = {
-        "discover", "search", "stream", "upload", "you", "pages",
-        "settings", "charts", "stations", "people", "tracks", "sets",
-        "groups", "tags", "popular", "pro", "go", "creators", "feed",
-        "library", "messages", "notifications", "legal", "jobs",
-        "imprint", "privacy", "cookies", "terms-of-use",
-    }
-    for match in matches:
-        if match.lower() not in skip_paths and len(match) > 1:
-            return {"url": f"https://soundcloud.com/{match}", "handle": match}
-    return None
-
-
 def enrich_artist(artist_name: str, soundcharts_uuid: str,
-                  spotify: SpotifyClient, youtube: Optional[YouTubeClient]) -> dict:
+                  spotify: SpotifyClient, youtube: Optional[YouTubeClient],
+                  soundcloud_negatives: Optional[NegativeCache] = None) -> dict:
     row = {col: None for col in COLUMNS}
     row["artist_name"] = artist_name
     row["soundcharts_uuid"] = soundcharts_uuid
@@ -200,7 +79,6 @@ def enrich_artist(artist_name: str, soundcharts_uuid: str,
 
     try:
         result = spotify.search_artist(artist_name)
-        time.sleep(SPOTIFY_DELAY)
         if result:
             row["spotify_id"] = result.get("id")
             sources.append("spotify")
@@ -210,7 +88,6 @@ def enrich_artist(artist_name: str, soundcharts_uuid: str,
     if youtube:
         try:
             yt = youtube.search_channel(artist_name)
-            time.sleep(YOUTUBE_DELAY)
             if yt:
                 row["youtube_url"] = yt["url"]
                 row["youtube_channel_id"] = yt["channel_id"]
@@ -219,8 +96,7 @@ def enrich_artist(artist_name: str, soundcharts_uuid: str,
             logger.debug(f"YouTube error: {e}")
 
     try:
-        sc = search_soundcloud(artist_name)
-        time.sleep(SOUNDCLOUD_DELAY)
+        sc = search_soundcloud(artist_name, soundcloud_negatives)
         if sc:
             row["soundcloud_url"] = sc["url"]
             row["soundcloud_handle"] = sc["handle"]
@@ -238,22 +114,29 @@ def run(resume_from: int = 0):
     total = len(input_df)
     logger.info(f"{total} artists to process (resuming from {resume_from})")
 
-    spotify = SpotifyClient(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
+    spotify = SpotifyClient(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, negative_cache=NegativeCache("spotify"))
+    # Artists Spotify/SoundCloud had no match for are skipped until the entry expires
+    soundcloud_negatives = NegativeCache("soundcloud")
 
     youtube = None
     if YOUTUBE_API_KEY and YOUTUBE_API_KEY != "your_youtube_api_key_here":
         youtube = YouTubeClient(YOUTUBE_API_KEY)
         logger.info("YouTube API initialized")
 
-    rows = []
-    if resume_from > 0 and os.path.exists(OUTPUT_CSV):
-        existing = pd.read_csv(OUTPUT_CSV, low_memory=False)
-        rows = existing.to_dict("records")
-        logger.info(f"Loaded {len(rows)} existing rows")
+    store = ArtistStore()
+    if store.import_csv(CATEGORY, SEED_CSV):
+        logger.info(f"Seeded artist store '{CATEGORY}' from {SEED_CSV}")
+
+    # Rows finished by earlier runs are in the checkpoint log; the partition
+    # itself is only written once, at the end
+    checkpoint = CheckpointLog(CHECKPOINT_LOG, sync_every=SAVE_INTERVAL)
+    done = checkpoint.keys("idx")
+    if done:
+        logger.info(f"Resuming: {len(done)} artists already in {CHECKPOINT_LOG}")
 
     processed = 0
     for idx, row in input_df.iterrows():
-        if processed < resume_from:
+        if processed < resume_from or idx in done:
             processed += 1
             continue
 
@@ -265,19 +148,17 @@ def run(resume_from: int = 0):
         processed += 1
         logger.info(f"[{processed}/{total}] {artist_name}")
 
-        enriched = enrich_artist(artist_name, sc_uuid, spotify, youtube)
-        rows.append(enriched)
-
-        if processed % SAVE_INTERVAL == 0:
-            pd.DataFrame(rows, columns=COLUMNS).to_csv(OUTPUT_CSV, index=False)
-            logger.info(f"Saved progress ({processed}/{total})")
+        enriched = enrich_artist(artist_name, sc_uuid, spotify, youtube, soundcloud_negatives)
+        checkpoint.append({"idx": idx, **enriched})
 
-    pd.DataFrame(rows, columns=COLUMNS).to_csv(OUTPUT_CSV, index=False)
+    # Final save; the log is only needed until the store holds every row
+    updated, added = store.merge(CATEGORY, checkpoint.to_frame(COLUMNS))
+    checkpoint.remove()
 
     logger.info("=" * 50)
     logger.info("ENRICHMENT COMPLETE")
-    logger.info(f"Artists processed: {len(rows)}")
-    logger.info(f"Output: {OUTPUT_CSV}")
+    logger.info(f"Artists processed: {len(checkpoint)} ({updated} updated, {added} added)")
+    logger.info(f"Output: {store.path(CATEGORY)}")
     logger.info("=" * 50)
 
 
@@ -4,92 +4,19 @@ Script to enrich social media data for DJ Producers.
 Constructs social media URLs based on artist names and patterns.
 """
 
-import pandas as pd
-import re
-import time
-
-def clean_artist_name_for_handle(artist_name):
-    """Clean artist name to create a likely social media handle"""
-    if pd.isna(artist_name):
-        return None
-    
-    # Convert to lowercase and remove special characters
-    clean = str(artist_name).lower()
-    # Remove common DJ prefixes
-    clean = re.sub(r'^dj\s+', '', clean)
-    # Remove special characters but keep letters, numbers, underscores
-    clean = re.sub(r'[^a-z0-9_]', '', clean)
-    return clean
-
-def construct_instagram_url(artist_name):
-    """Construct likely Instagram URL from artist name"""
-    handle = clean_artist_name_for_handle(artist_name)
-    if handle:
-        return f"https://www.instagram.com/{handle}", handle
-    return None, None
+import os
+import sys
 
-def construct_tiktok_url(artist_name, instagram_handle=None):
-    """Construct likely TikTok URL from artist name or Instagram handle"""
-    if instagram_handle and not pd.isna(instagram_handle):
-        return f"https://www.tiktok.com/@{instagram_handle}", instagram_handle
-    
-    handle = clean_artist_name_for_handle(artist_name)
-    if handle:
-        return f"https://www.tiktok.com/@{handle}", handle
-    return None, None
-
-def construct_youtube_url(artist_name, instagram_handle=None):
-    """Construct likely YouTube URL from artist name or Instagram handle"""
-    if instagram_handle and not pd.isna(instagram_handle):
-        return f"https://www.youtube.com/@{instagram_handle}"
-    
-    handle = clean_artist_name_for_handle(artist_name)
-    if handle:
-        return f"https://www.youtube.com/@{handle}"
-    return None
+import pandas as pd
 
-def construct_twitter_url(artist_name, instagram_handle=None):
-    """Construct likely Twitter/X URL from artist name or Instagram handle"""
-    if instagram_handle and not pd.isna(instagram_handle):
-        return f"https://twitter.com/{instagram_handle}", instagram_handle
-    
-    handle = clean_artist_name_for_handle(artist_name)
-    if handle:
-        return f"https://twitter.com/{handle}", handle
-    return None, None
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-def construct_soundcloud_url(artist_name):
-    """Construct likely SoundCloud URL from artist name"""
-    handle = clean_artist_name_for_handle(artist_name)
-    if handle:
-        return f"https://soundcloud.com/{handle}", handle
-    return None, None
+from social_links.handles import guess_social_links
 
-def construct_facebook_url(artist_name):
-    """Construct likely Facebook URL from artist name"""
-    handle = clean_artist_name_for_handle(artist_name)
-    if handle:
-        return f"https://www.facebook.com/{handle}"
-    return None
+# Common DJ prefix dropped before guessing a handle
+HANDLE_PREFIX = r'^dj\s+'
 
-def extract_youtube_channel_id(youtube_url):
-    """Extract YouTube channel ID from URL"""
-    if pd.isna(youtube_url) or not youtube_url:
-        return None
-    
-    url_str = str(youtube_url).strip()
-    
-    # Pattern for /channel/ URLs
-    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', url_str)
-    if channel_match:
-        return channel_match.group(1)
-    
-    # Pattern for @handle URLs
-    handle_match = re.search(r'/@([a-zA-Z0-9_.-]+)', url_str)
-    if handle_match:
-        return f"@{handle_match.group(1)}"
-    
-    return None
 
 def main():
     # Read the DJ Producers file
@@ -103,104 +30,12 @@ def main():
     print(f"Total artists: {len(df)}")
     print(f"Total columns: {len(df.columns)}")
     
-    # Track changes
-    stats = {
-        'instagram_url': 0,
-        'instagram_handle': 0,
-        'tiktok_url': 0,
-        'tiktok_handle': 0,
-        'youtube_url': 0,
-        'youtube_channel_id': 0,
-        'twitter_url': 0,
-        'twitter_handle': 0,
-        'soundcloud_url': 0,
-        'soundcloud_handle': 0,
-        'facebook_url': 0
-    }
-    
+    # Guess every missing link column-wise; stats are counted from the fill masks
     print("\nEnriching social media links...")
-    print("This may take a few minutes for 50,000 artists...\n")
-    
-    # Process each row
-    for idx, row in df.iterrows():
-        artist = row['Artist']
-        
-        # Progress indicator
-        if (idx + 1) % 5000 == 0:
-            print(f"  Processed {idx + 1:,} / {len(df):,} artists...")
-        
-        # Instagram
-        if pd.isna(row['instagram_url']):
-            insta_url, insta_handle = construct_instagram_url(artist)
-            if insta_url:
-                df.at[idx, 'instagram_url'] = insta_url
-                stats['instagram_url'] += 1
-            if insta_handle:
-                df.at[idx, 'instagram_handle'] = insta_handle
-                stats['instagram_handle'] += 1
-        
-        # Get Instagram handle for other platforms
-        instagram_handle = df.at[idx, 'instagram_handle']
-        
-        # TikTok
-        if pd.isna(row['tiktok_url']):
-            tiktok_url, tiktok_handle = construct_tiktok_url(artist, instagram_handle)
-            if tiktok_url:
-                df.at[idx, 'tiktok_url'] = tiktok_url
-                stats['tiktok_url'] += 1
-            if tiktok_handle and pd.isna(row['tiktok_handle']):
-                df.at[idx, 'tiktok_handle'] = tiktok_handle
-                stats['tiktok_handle'] += 1
-        
-        # YouTube
-        if pd.isna(row['youtube_url']):
-            youtube_url = construct_youtube_url(artist, instagram_handle)
-            if youtube_url:
-                df.at[idx, 'youtube_url'] = youtube_url
-                stats['youtube_url'] += 1
-                
-                # Extract channel ID
-                channel_id = extract_youtube_channel_id(youtube_url)
-                if channel_id and pd.isna(row['youtube_channel_id']):
-                    df.at[idx, 'youtube_channel_id'] = channel_id
-                    stats['youtube_channel_id'] += 1
-        
-        # Twitter/X
-        if pd.isna(row['twitter_url']):
-            twitter_url, twitter_handle = construct_twitter_url(artist, instagram_handle)
-            if twitter_url:
-                df.at[idx, 'twitter_url'] = twitter_url
-                stats['twitter_url'] += 1
-            if twitter_handle and pd.isna(row['twitter_handle']):
-                df.at[idx, 'twitter_handle'] = twitter_handle
-                stats['twitter_handle'] += 1
-        
-        # SoundCloud
-        if pd.isna(row['soundcloud_url']):
-            soundcloud_url, soundcloud_handle = construct_soundcloud_url(artist)
-            if soundcloud_url:
-                df.at[idx, 'soundcloud_url'] = soundcloud_url
-                stats['soundcloud_url'] += 1
-            if soundcloud_handle and pd.isna(row['soundcloud_handle']):
-                df.at[idx, 'soundcloud_handle'] = soundcloud_handle
-                stats['soundcloud_handle'] += 1
-        
-        # Facebook
-        if pd.isna(row['facebook_url']):
-            facebook_url = construct_facebook_url(artist)
-            if facebook_url:
-                df.at[idx, 'facebook_url'] = facebook_url
-                stats['facebook_url'] += 1
-        
-        # Set lookup status
-        if pd.isna(row['lookup_status']):
-            df.at[idx, 'lookup_status'] = 'auto_generated'
-        
-        # Set Artist_Type
-        if pd.isna(row['Artist_Type']):
-            df.at[idx, 'Artist_Type'] = 'DJ/Producer'
-    
-    print(f"  Processed {len(df):,} / {len(df):,} artists... Done!\n")
+    stats = guess_social_links(df, name_col='Artist', strip_prefix=HANDLE_PREFIX)
+    df['lookup_status'] = df['lookup_status'].fillna('auto_generated')
+    df['Artist_Type'] = df['Artist_Type'].fillna('DJ/Producer')
+    print(f"  Processed {len(df):,} artists... Done!\n")
     
     # Save the updated file
     print(f"Saving to {output_file}...")
@@ -0,0 +1,83 @@
+"""
+Sharded DJ/Producers Enrichment
+
+Runs the whole dj_producers_input.csv through enrich_dj_parallel.enrich_artist
+in a process pool, replacing hand-launched enrich_dj_parallel.py /
+dj_chunk_runner.py chunks. The input is read once and split into shards;
+shard status lives in <work-dir>/manifest.json, so rerunning the same
+command skips finished shards and retries failed ones. The Spotify and
+SoundCloud rate budgets are divided across the workers. The result is
+merged into the dj_producers partition of the artist store
+(social_links.store), so columns other scripts filled in are kept.
+
+Usage:
+    python enrich_dj_sharded.py
+    python enrich_dj_sharded.py --workers 6 --shard-size 2000
+"""
+
+import os
+import sys
+import argparse
+import logging
+import pandas as pd
+
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.sharding import run_sharded
+from social_links.store import ArtistStore
+
+from enrich_dj_parallel import COLUMNS, enrich_records
+
+INPUT_CSV = "dj_producers_input.csv"
+CATEGORY = "dj_producers"
+WORK_DIR = "dj_shards"
+
+# Hosts whose rate budget is shared by all workers
+HOSTS = ["api.spotify.com", "soundcloud.com"]
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler("enrich_dj_sharded.log"),
+    ],
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=INPUT_CSV)
+    parser.add_argument("--output", default=None, help="Also write the merged rows to this CSV")
+    parser.add_argument("--work-dir", default=WORK_DIR)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args()
+
+    input_df = pd.read_csv(args.input, dtype=str)
+    records = input_df.to_dict("records")
+    logger.info(f"Loaded {len(records)} artists from {args.input}")
+
+    merged = run_sharded(
+        records,
+        enrich_records,
+        COLUMNS,
+        output_path=args.output,
+        work_dir=args.work_dir,
+        source=os.path.abspath(args.input),
+        shard_size=args.shard_size,
+        workers=args.workers,
+        max_attempts=args.max_attempts,
+        hosts=HOSTS,
+    )
+
+    store = ArtistStore()
+    updated, added = store.merge(CATEGORY, merged)
+    logger.info(f"Merged {len(merged)} rows into {store.path(CATEGORY)} ({updated} updated, {added} added)")
+
+
+if __name__ == "__main__":
+    main()
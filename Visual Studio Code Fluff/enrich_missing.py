@@ -3,28 +3,35 @@ Enrich Missing Artists Pipeline
 
 Processes artists from rappers_missing.csv that were never in rappers_enriched.csv.
 Uses Spotify + YouTube + SoundCloud to fill social links, then appends rows to
-the existing rappers_enriched.csv using the exact same column schema.
+the rappers partition of the artist store using the exact same column schema.
 
 Usage:
     python enrich_missing.py
     python enrich_missing.py --resume-from 500
 
 Requirements:
-    pip install requests pandas python-dotenv
+    pip install requests pandas python-dotenv pyarrow
 """
 
 import os
-import re
 import sys
-import time
 import argparse
 import logging
 from typing import Optional
 
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.negative_cache import NegativeCache
+from social_links.soundcloud import search_soundcloud
+from social_links.spotify import SpotifyClient
+from social_links.store import ArtistStore
+from social_links.youtube import YouTubeClient
+from social_links.youtube_quota import QuotaLedger, YouTubeScheduler
+
 load_dotenv()
 
 # ---------------------------------------------------------------------------
@@ -32,18 +39,23 @@ load_dotenv()
 # ---------------------------------------------------------------------------
 
 MISSING_CSV = "rappers_missing.csv"
-OUTPUT_CSV = "rappers_enriched.csv"
+# New rows are appended to this partition of the canonical artist store;
+# the old CSV seeds it on first run
+CATEGORY = "rappers"
+SEED_CSV = "rappers_enriched.csv"
 SAVE_INTERVAL = 25
 
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-SPOTIFY_DELAY = 0.3
-YOUTUBE_DELAY = 0.5
-SOUNDCLOUD_DELAY = 1.0
+# YouTube searches are queued and spent most-followed first within the daily
+# quota; what is left stays queued for `python -m social_links.youtube_quota
+# run rappers`, or set this to sleep until the quota resets (midnight Pacific)
+YOUTUBE_WAIT_FOR_RESET = False
+
 
-# Column schema — must match rappers_enriched.csv exactly
+# Column schema — must match the rappers partition exactly
 COLUMNS = [
     "artist_name", "soundcharts_uuid", "spotify_id",
     "instagram_url", "instagram_handle",
@@ -66,165 +78,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# ---------------------------------------------------------------------------
-# Spotify Client (same as enrich_remaining.py)
-# ---------------------------------------------------------------------------
-
-class SpotifyClient:
-    TOKEN_URL = "https://accounts.spotify.com/api/token"
-    API_BASE = "https://api.spotify.com/v1"
-
-    def __init__(self, client_id: str, client_secret: str):
-        if not client_id or not client_secret:
-            raise ValueError("SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET required in .env")
-        self.client_id = client_id
-        self.client_secret = client_secret
-        self.session = requests.Session()
-        self.token_expires_at = 0
-        self._refresh_token()
-
-    def _refresh_token(self):
-        resp = requests.post(
-            self.TOKEN_URL,
-            data={"grant_type": "client_credentials"},
-            auth=(self.client_id, self.client_secret),
-            timeout=15,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        self.session.headers["Authorization"] = f"Bearer {data['access_token']}"
-        self.token_expires_at = time.time() + data.get("expires_in", 3600) - 300
-        logger.info("Spotify token refreshed")
-
-    def _ensure_token(self):
-        if time.time() >= self.token_expires_at:
-            self._refresh_token()
-
-    def search_artist(self, name: str) -> Optional[dict]:
-        self._ensure_token()
-        try:
-            resp = self.session.get(
-                f"{self.API_BASE}/search",
-                params={"q": name, "type": "artist", "limit": 5},
-                timeout=15,
-            )
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError:
-            if resp.status_code == 429:
-                retry_after = int(resp.headers.get("Retry-After", 30))
-                logger.warning(f"Spotify rate limit, sleeping {retry_after}s")
-                time.sleep(retry_after)
-                return self.search_artist(name)
-            return None
-
-        items = resp.json().get("artists", {}).get("items", [])
-        if not items:
-            return None
-
-        # Prefer exact name match
-        for item in items:
-            if item.get("name", "").lower() == name.lower():
-                return item
-        return items[0]
-
-
-# ---------------------------------------------------------------------------
-# YouTube Client
-# ---------------------------------------------------------------------------
-
-class YouTubeClient:
-    API_BASE = "https://www.googleapis.com/youtube/v3"
-
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.quota_exhausted = False
-
-    def search_channel(self, artist_name: str) -> Optional[dict]:
-        if self.quota_exhausted:
-            return None
-        try:
-            resp = requests.get(
-                f"{self.API_BASE}/search",
-                params={
-                    "part": "snippet",
-                    "q": f"{artist_name} official artist",
-                    "type": "channel",
-                    "maxResults": 3,
-                    "key": self.api_key,
-                },
-                timeout=15,
-            )
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError:
-            if resp.status_code == 403:
-                logger.warning("YouTube API quota exhausted — skipping YouTube for this run")
-                self.quota_exhausted = True
-                return None
-            return None
-
-        items = resp.json().get("items", [])
-        if not items:
-            return None
-
-        name_lower = artist_name.lower()
-        for item in items:
-            title = item["snippet"]["title"].lower()
-            channel_id = item["snippet"]["channelId"]
-            if " - topic" in title:
-                continue
-            if name_lower in title or title in name_lower:
-                return {
-                    "url": f"https://www.youtube.com/channel/{channel_id}",
-                    "channel_id": channel_id,
-                }
-
-        for item in items:
-            title = item["snippet"]["title"].lower()
-            if " - topic" not in title:
-                channel_id = item["snippet"]["channelId"]
-                return {
-                    "url": f"https://www.youtube.com/channel/{channel_id}",
-                    "channel_id": channel_id,
-                }
-        return None
-
-
-# ---------------------------------------------------------------------------
-# SoundCloud Search
-# ---------------------------------------------------------------------------
-
-def search_soundcloud(artist_name: str) -> Optional[dict]:
-    try:
-        resp = requests.get(
-            "https://soundcloud.com/search/people",
-            params={"q": artist_name},
-            headers={"User-Agent": "Mozilla/5.0 (research pipeline)"},
-            timeout=15,
-        )
-        resp.raise_for_status()
-    except requests.exceptions.RequestException:
-        return None
-
-    matches = re.findall(r'href="/([\w\-]+)"', resp.text)
-    skip_paths = {
-        "discover", "search", "stream", "upload", "you", "pages",
-        "settings", "charts", "stations", "people", "tracks", "sets",
-        "groups", "tags", "popular", "pro", "go", "creators", "feed",
-        "library", "messages", "notifications", "legal", "jobs",
-        "imprint", "privacy", "cookies", "terms-of-use",
-    }
-    for match in matches:
-        if match.lower() not in skip_paths and len(match) > 1:
-            return {"url": f"https://soundcloud.com/{match}", "handle": match}
-    return None
-
-
 # ---------------------------------------------------------------------------
 # Enrich a single artist
 # ---------------------------------------------------------------------------
 
 def enrich_artist(artist_name: str, soundcharts_uuid: str,
-                  spotify: SpotifyClient, youtube: Optional[YouTubeClient]) -> dict:
+                  spotify: SpotifyClient, youtube: Optional[YouTubeScheduler],
+                  soundcloud_negatives: Optional[NegativeCache] = None) -> dict:
     """Build a full row dict for a single artist using available APIs."""
     row = {col: None for col in COLUMNS}
     row["artist_name"] = artist_name
@@ -232,31 +92,23 @@ def enrich_artist(artist_name: str, soundcharts_uuid: str,
     sources = []
 
     # Spotify
+    followers = 0
     try:
         result = spotify.search_artist(artist_name)
-        time.sleep(SPOTIFY_DELAY)
         if result:
             row["spotify_id"] = result.get("id")
+            followers = (result.get("followers") or {}).get("total") or 0
             sources.append("spotify")
     except Exception as e:
         logger.debug(f"Spotify error for {artist_name}: {e}")
 
-    # YouTube
+    # YouTube: queued, most-followed artists get the daily quota first
     if youtube:
-        try:
-            yt = youtube.search_channel(artist_name)
-            time.sleep(YOUTUBE_DELAY)
-            if yt:
-                row["youtube_url"] = yt["url"]
-                row["youtube_channel_id"] = yt["channel_id"]
-                sources.append("youtube_api")
-        except Exception as e:
-            logger.debug(f"YouTube error for {artist_name}: {e}")
+        youtube.enqueue(artist_name, soundcharts_uuid, value=followers)
 
     # SoundCloud
     try:
-        sc = search_soundcloud(artist_name)
-        time.sleep(SOUNDCLOUD_DELAY)
+        sc = search_soundcloud(artist_name, soundcloud_negatives)
         if sc:
             row["soundcloud_url"] = sc["url"]
             row["soundcloud_handle"] = sc["handle"]
@@ -278,17 +130,23 @@ def run(resume_from: int = 0):
     total = len(missing_df)
     logger.info(f"{total} missing artists to process (resuming from {resume_from})")
 
-    # Load existing enriched data
-    existing_df = pd.read_csv(OUTPUT_CSV)
-    logger.info(f"Existing enriched CSV has {len(existing_df)} rows")
+    store = ArtistStore()
+    if store.import_csv(CATEGORY, SEED_CSV):
+        logger.info(f"Seeded artist store '{CATEGORY}' from {SEED_CSV}")
+    existing_rows = len(store.read(CATEGORY, columns=["artist_name"]))
+    logger.info(f"Artist store '{CATEGORY}' has {existing_rows} rows")
 
     # Initialize API clients
-    spotify = SpotifyClient(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
+    spotify = SpotifyClient(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, negative_cache=NegativeCache("spotify"))
+    # Artists Spotify/SoundCloud had no match for are skipped until the entry expires
+    soundcloud_negatives = NegativeCache("soundcloud")
 
     youtube = None
     if YOUTUBE_API_KEY and YOUTUBE_API_KEY != "your_youtube_api_key_here":
-        youtube = YouTubeClient(YOUTUBE_API_KEY)
-        logger.info("YouTube API client initialized")
+        ledger = QuotaLedger()
+        youtube = YouTubeScheduler(YouTubeClient(YOUTUBE_API_KEY, ledger=ledger), CATEGORY,
+                                   wait=YOUTUBE_WAIT_FOR_RESET)
+        logger.info(f"YouTube API client initialized ({ledger.stats(YOUTUBE_API_KEY)})")
     else:
         logger.warning("No YouTube API key — skipping YouTube")
 
@@ -316,23 +174,26 @@ def run(resume_from: int = 0):
         processed += 1
         logger.info(f"[{processed}/{total}] {artist_name}")
 
-        enriched = enrich_artist(artist_name, sc_uuid, spotify, youtube)
+        enriched = enrich_artist(artist_name, sc_uuid, spotify, youtube, soundcloud_negatives)
         new_rows.append(enriched)
 
         # Save progress periodically
         if processed % SAVE_INTERVAL == 0:
-            # Save temp progress file (just new rows)
+            # Save temp progress file (just new rows); the store is appended once at the end
             pd.DataFrame(new_rows, columns=COLUMNS).to_csv(temp_file, index=False)
-            # Also append to main CSV
-            combined = pd.concat([existing_df, pd.DataFrame(new_rows, columns=COLUMNS)],
-                                 ignore_index=True)
-            combined.to_csv(OUTPUT_CSV, index=False)
-            logger.info(f"Saved progress ({processed}/{total}, total CSV: {len(combined)} rows)")
+            logger.info(f"Saved progress ({processed}/{total}, {len(new_rows)} new rows)")
+
+    new_df = pd.DataFrame(new_rows, columns=COLUMNS)
+
+    # Spend today's YouTube quota on the queue, most-followed artists first
+    if youtube:
+        searched = youtube.run()
+        filled = youtube.apply(new_df)
+        logger.info(f"YouTube: {searched} searches, {filled} rows filled; {youtube.stats()}")
+        youtube.close()
 
     # Final save
-    combined = pd.concat([existing_df, pd.DataFrame(new_rows, columns=COLUMNS)],
-                         ignore_index=True)
-    combined.to_csv(OUTPUT_CSV, index=False)
+    store.append(CATEGORY, new_df)
 
     # Clean up temp file
     if os.path.exists(temp_file):
@@ -341,8 +202,8 @@ def run(resume_from: int = 0):
     logger.info("=" * 50)
     logger.info("ENRICHMENT COMPLETE")
     logger.info(f"New artists processed: {len(new_rows)}")
-    logger.info(f"Total rows in CSV:     {len(combined)}")
-    logger.info(f"Output: {OUTPUT_CSV}")
+    logger.info(f"Total rows in store:   {existing_rows + len(new_rows)}")
+    logger.info(f"Output: {store.path(CATEGORY)}")
     logger.info("=" * 50)
 
 
@@ -14,26 +14,47 @@ Usage:
 
 import os
 import sys
-import time
 import argparse
 import logging
-import requests
 import pandas as pd
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.checkpoint import CheckpointLog
+from social_links.mb_replica import MBReplica
+from social_links.musicbrainz import MusicBrainzClient
+from social_links.negative_cache import NO_LINKS, NegativeCache
+from social_links.store import ArtistStore
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 
-INPUT_CSV = "rappers_enriched.csv"
-OUTPUT_CSV = "rappers_enriched.csv"
+# Partition of the canonical artist store; the old CSV seeds it on first run
+CATEGORY = "rappers"
+SEED_CSV = "rappers_enriched.csv"
+# Only the columns this script reads or fills are loaded from the store
+STORE_COLUMNS = [
+    "artist_name", "instagram_url", "instagram_handle", "tiktok_url", "tiktok_handle",
+    "twitter_url", "twitter_handle", "facebook_url", "website_url", "lookup_status",
+]
+# (URL column, handle column) pairs filled from MusicBrainz
+LINK_COLUMNS = [
+    ("instagram_url", "instagram_handle"),
+    ("twitter_url", "twitter_handle"),
+    ("facebook_url", None),
+    ("tiktok_url", "tiktok_handle"),
+    ("website_url", None),
+]
+
+# Finished rows are appended here (fsynced every SAVE_INTERVAL rows) and
+# replayed on restart; the store is only written once, at the end
+CHECKPOINT_LOG = "enrich_musicbrainz_checkpoint.jsonl"
 SAVE_INTERVAL = 50
 
 # MusicBrainz requires a descriptive User-Agent
 USER_AGENT = "ArtistEnrichmentPipeline/1.0 (research project)"
-MB_API_BASE = "https://musicbrainz.org/ws/2"
-
-# Rate limit: 1 request per second
-REQUEST_DELAY = 1.1
 
 logging.basicConfig(
     level=logging.INFO,
@@ -47,113 +68,49 @@ logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# MusicBrainz API Client
+# Pipeline
 # ---------------------------------------------------------------------------
 
-class MusicBrainzClient:
-    """Client for MusicBrainz API lookups."""
-
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": USER_AGENT,
-            "Accept": "application/json",
-        })
-
-    def search_artist(self, name: str) -> dict | None:
-        """Search for an artist by name, return best match with URL relations."""
-        try:
-            # Search for artist
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist",
-                params={"query": f'artist:"{name}"', "limit": 5, "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            artists = data.get("artists", [])
-            if not artists:
-                return None
-
-            # Find best match (exact name match preferred)
-            best_match = None
-            for artist in artists:
-                if artist.get("name", "").lower() == name.lower():
-                    best_match = artist
-                    break
-            if not best_match:
-                best_match = artists[0]
-
-            return best_match
-
-        except requests.exceptions.RequestException as e:
-            logger.debug(f"MusicBrainz search error for {name}: {e}")
-            return None
-
-    def get_artist_urls(self, mbid: str) -> dict:
-        """Get URL relations for an artist by their MusicBrainz ID."""
-        try:
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist/{mbid}",
-                params={"inc": "url-rels", "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            # Extract URLs by type
-            urls = {}
-            for rel in data.get("relations", []):
-                if rel.get("type") == "url":
-                    continue
-                url_obj = rel.get("url", {})
-                url = url_obj.get("resource", "")
-                rel_type = rel.get("type", "").lower()
-
-                # Map relation types to our columns
-                if "instagram" in url.lower() or rel_type == "social network" and "instagram" in url.lower():
-                    urls["instagram"] = url
-                elif "twitter.com" in url.lower() or "x.com" in url.lower():
-                    urls["twitter"] = url
-                elif "facebook.com" in url.lower():
-                    urls["facebook"] = url
-                elif "tiktok.com" in url.lower():
-                    urls["tiktok"] = url
-                elif rel_type == "official homepage":
-                    urls["website"] = url
-
-            return urls
-
-        except requests.exceptions.RequestException as e:
-            logger.debug(f"MusicBrainz URL fetch error for {mbid}: {e}")
-            return {}
-
-
-def extract_handle(url: str, platform: str) -> str | None:
-    """Extract handle/username from a social media URL."""
-    if not url:
-        return None
-    try:
-        # Remove trailing slashes and query params
-        clean = url.rstrip("/").split("?")[0]
-        parts = clean.split("/")
-        handle = parts[-1] if parts else None
-        # Remove @ prefix if present
-        if handle and handle.startswith("@"):
-            handle = handle[1:]
-        return handle
-    except:
-        return None
+def enrich_row(client: MusicBrainzClient, row: pd.Series, artist_name: str) -> dict:
+    """Look up one artist and return the cells to fill as {column: value}."""
+    # Search MusicBrainz
+    artist = client.search_artist(artist_name)
+    if not artist or not artist.get("id"):
+        return {}
+
+    # Get URL relations, already mapped to our columns
+    urls = client.get_links(artist["id"])
+    if urls is None:
+        # Request failed; not evidence that the artist has no links
+        return {}
+    if not urls:
+        if client.negative_cache is not None:
+            client.negative_cache.record(artist_name, NO_LINKS)
+        return {}
+
+    # Fill in missing values
+    changes = {}
+    for url_col, handle_col in LINK_COLUMNS:
+        if urls.get(url_col) and pd.isna(row[url_col]):
+            changes[url_col] = urls[url_col]
+            if handle_col and urls.get(handle_col):
+                changes[handle_col] = urls[handle_col]
+
+    if changes:
+        # Update lookup_status
+        existing = str(row["lookup_status"]) if pd.notna(row["lookup_status"]) else ""
+        if "musicbrainz" not in existing.lower():
+            changes["lookup_status"] = f"{existing}+musicbrainz" if existing else "musicbrainz"
+        logger.info(f"Enriched: {artist_name} -> {list(urls.keys())}")
+    return changes
 
 
-# ---------------------------------------------------------------------------
-# Pipeline
-# ---------------------------------------------------------------------------
-
 def run(resume_from: int = 0):
-    logger.info(f"Loading {INPUT_CSV}...")
-    df = pd.read_csv(INPUT_CSV, low_memory=False)
+    store = ArtistStore()
+    if store.import_csv(CATEGORY, SEED_CSV):
+        logger.info(f"Seeded artist store '{CATEGORY}' from {SEED_CSV}")
+    logger.info(f"Loading {CATEGORY} from the artist store...")
+    df = store.read(CATEGORY, columns=STORE_COLUMNS)
     total = len(df)
     logger.info(f"Loaded {total} rows")
 
@@ -166,12 +123,24 @@ def run(resume_from: int = 0):
     missing_count = missing_mask.sum()
     logger.info(f"Rows missing all social data: {missing_count}")
 
-    client = MusicBrainzClient()
+    # Replay rows finished by an interrupted run
+    checkpoint = CheckpointLog(CHECKPOINT_LOG, sync_every=SAVE_INTERVAL)
+    for record in checkpoint.records:
+        for col, value in record["set"].items():
+            df.at[record["idx"], col] = value
+    done = checkpoint.keys("idx")
+    if done:
+        logger.info(f"Resuming: {len(done)} rows already checked in {CHECKPOINT_LOG}")
+
+    # Artists with no match (or no links) are skipped until the entry expires
+    negatives = NegativeCache("musicbrainz")
+    # Answered from the local dump replica when one has been ingested
+    client = MusicBrainzClient(USER_AGENT, negative_cache=negatives, replica=MBReplica.open_existing())
     processed = 0
     enriched = 0
 
     for idx in range(total):
-        if idx < resume_from:
+        if idx < resume_from or idx in done:
             continue
 
         # Skip if row already has social data
@@ -186,70 +155,23 @@ def run(resume_from: int = 0):
         if processed % 100 == 0:
             logger.info(f"[{processed} processed, {enriched} enriched] Checking: {artist_name}")
 
-        # Search MusicBrainz
-        artist = client.search_artist(artist_name)
-        time.sleep(REQUEST_DELAY)
-
-        if not artist:
-            continue
-
-        mbid = artist.get("id")
-        if not mbid:
-            continue
-
-        # Get URL relations
-        urls = client.get_artist_urls(mbid)
-        time.sleep(REQUEST_DELAY)
-
-        if not urls:
-            continue
-
-        # Fill in missing values
-        updated = False
-        if urls.get("instagram") and pd.isna(df.at[idx, "instagram_url"]):
-            df.at[idx, "instagram_url"] = urls["instagram"]
-            df.at[idx, "instagram_handle"] = extract_handle(urls["instagram"], "instagram")
-            updated = True
-
-        if urls.get("twitter") and pd.isna(df.at[idx, "twitter_url"]):
-            df.at[idx, "twitter_url"] = urls["twitter"]
-            df.at[idx, "twitter_handle"] = extract_handle(urls["twitter"], "twitter")
-            updated = True
-
-        if urls.get("facebook") and pd.isna(df.at[idx, "facebook_url"]):
-            df.at[idx, "facebook_url"] = urls["facebook"]
-            updated = True
-
-        if urls.get("tiktok") and pd.isna(df.at[idx, "tiktok_url"]):
-            df.at[idx, "tiktok_url"] = urls["tiktok"]
-            df.at[idx, "tiktok_handle"] = extract_handle(urls["tiktok"], "tiktok")
-            updated = True
-
-        if urls.get("website") and pd.isna(df.at[idx, "website_url"]):
-            df.at[idx, "website_url"] = urls["website"]
-            updated = True
-
-        if updated:
+        changes = enrich_row(client, row, artist_name)
+        checkpoint.append({"idx": idx, "set": changes})
+        for col, value in changes.items():
+            df.at[idx, col] = value
+        if changes:
             enriched += 1
-            # Update lookup_status
-            existing = str(df.at[idx, "lookup_status"]) if pd.notna(df.at[idx, "lookup_status"]) else ""
-            if "musicbrainz" not in existing.lower():
-                df.at[idx, "lookup_status"] = f"{existing}+musicbrainz" if existing else "musicbrainz"
-            logger.info(f"Enriched: {artist_name} -> {list(urls.keys())}")
-
-        # Save periodically
-        if processed % SAVE_INTERVAL == 0:
-            df.to_csv(OUTPUT_CSV, index=False)
-            logger.info(f"Saved progress ({processed} processed, {enriched} enriched)")
 
-    # Final save
-    df.to_csv(OUTPUT_CSV, index=False)
+    # Final save; the log is only needed until the store holds every row
+    store.write_columns(CATEGORY, df)
+    checkpoint.remove()
 
     logger.info("=" * 50)
     logger.info("MUSICBRAINZ ENRICHMENT COMPLETE")
     logger.info(f"Rows checked:   {processed}")
     logger.info(f"Rows enriched:  {enriched}")
-    logger.info(f"Output: {OUTPUT_CSV}")
+    logger.info(negatives.stats())
+    logger.info(f"Output: {store.path(CATEGORY)}")
     logger.info("=" * 50)
 
 
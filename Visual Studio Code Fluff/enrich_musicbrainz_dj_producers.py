@@ -11,19 +11,37 @@ Usage:
 
 import os
 import sys
-import time
 import argparse
 import logging
-import requests
 import pandas as pd
 
-INPUT_CSV = "dj_producers_enriched.csv"
-OUTPUT_CSV = "dj_producers_enriched.csv"
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.mb_replica import MBReplica
+from social_links.musicbrainz import MusicBrainzClient
+from social_links.negative_cache import NO_LINKS, NegativeCache
+from social_links.store import ArtistStore
+
+# Partition of the canonical artist store; the old CSV seeds it on first run
+CATEGORY = "dj_producers"
+SEED_CSV = "dj_producers_enriched.csv"
+# Only the columns this script reads or fills are loaded from the store
+STORE_COLUMNS = [
+    "artist_name", "instagram_url", "instagram_handle", "tiktok_url", "tiktok_handle",
+    "twitter_url", "twitter_handle", "facebook_url", "website_url", "lookup_status",
+]
+# (URL column, handle column) pairs filled from MusicBrainz
+LINK_COLUMNS = [
+    ("instagram_url", "instagram_handle"),
+    ("twitter_url", "twitter_handle"),
+    ("facebook_url", None),
+    ("tiktok_url", "tiktok_handle"),
+    ("website_url", None),
+]
 SAVE_INTERVAL = 50
 
 USER_AGENT = "ArtistEnrichmentPipeline/1.0 (research project)"
-MB_API_BASE = "https://musicbrainz.org/ws/2"
-REQUEST_DELAY = 1.1
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,78 +54,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class MusicBrainzClient:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": USER_AGENT,
-            "Accept": "application/json",
-        })
-
-    def search_artist(self, name: str):
-        try:
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist",
-                params={"query": f'artist:"{name}"', "limit": 5, "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            artists = resp.json().get("artists", [])
-            if not artists:
-                return None
-            for artist in artists:
-                if artist.get("name", "").lower() == name.lower():
-                    return artist
-            return artists[0]
-        except:
-            return None
-
-    def get_artist_urls(self, mbid: str) -> dict:
-        try:
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist/{mbid}",
-                params={"inc": "url-rels", "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            urls = {}
-            for rel in resp.json().get("relations", []):
-                url = rel.get("url", {}).get("resource", "")
-                rel_type = rel.get("type", "").lower()
-                if "instagram" in url.lower():
-                    urls["instagram"] = url
-                elif "twitter.com" in url.lower() or "x.com" in url.lower():
-                    urls["twitter"] = url
-                elif "facebook.com" in url.lower():
-                    urls["facebook"] = url
-                elif "tiktok.com" in url.lower():
-                    urls["tiktok"] = url
-                elif rel_type == "official homepage":
-                    urls["website"] = url
-            return urls
-        except:
-            return {}
-
-
-def extract_handle(url: str) -> str:
-    if not url:
-        return None
-    try:
-        clean = url.rstrip("/").split("?")[0]
-        handle = clean.split("/")[-1]
-        return handle.lstrip("@") if handle else None
-    except:
-        return None
-
-
 def run(resume_from: int = 0):
-    logger.info(f"Loading {INPUT_CSV}...")
-    df = pd.read_csv(INPUT_CSV, low_memory=False)
+    store = ArtistStore()
+    if store.import_csv(CATEGORY, SEED_CSV):
+        logger.info(f"Seeded artist store '{CATEGORY}' from {SEED_CSV}")
+    logger.info(f"Loading {CATEGORY} from the artist store...")
+    df = store.read(CATEGORY, columns=STORE_COLUMNS)
     total = len(df)
     logger.info(f"Loaded {total} rows")
 
     social_cols = ["instagram_url", "twitter_url", "facebook_url", "website_url", "tiktok_url"]
-    client = MusicBrainzClient()
+    # Artists with no match (or no links) are skipped until the entry expires
+    negatives = NegativeCache("musicbrainz")
+    # Answered from the local dump replica when one has been ingested
+    client = MusicBrainzClient(USER_AGENT, negative_cache=negatives, replica=MBReplica.open_existing())
     processed = 0
     enriched = 0
 
@@ -127,34 +87,24 @@ def run(resume_from: int = 0):
             logger.info(f"[{processed} processed, {enriched} enriched] Checking: {artist_name}")
 
         artist = client.search_artist(artist_name)
-        time.sleep(REQUEST_DELAY)
         if not artist or not artist.get("id"):
             continue
 
-        urls = client.get_artist_urls(artist["id"])
-        time.sleep(REQUEST_DELAY)
+        urls = client.get_links(artist["id"])
+        if urls is None:
+            # Request failed; not evidence that the artist has no links
+            continue
         if not urls:
+            negatives.record(artist_name, NO_LINKS)
             continue
 
         updated = False
-        if urls.get("instagram") and pd.isna(df.at[idx, "instagram_url"]):
-            df.at[idx, "instagram_url"] = urls["instagram"]
-            df.at[idx, "instagram_handle"] = extract_handle(urls["instagram"])
-            updated = True
-        if urls.get("twitter") and pd.isna(df.at[idx, "twitter_url"]):
-            df.at[idx, "twitter_url"] = urls["twitter"]
-            df.at[idx, "twitter_handle"] = extract_handle(urls["twitter"])
-            updated = True
-        if urls.get("facebook") and pd.isna(df.at[idx, "facebook_url"]):
-            df.at[idx, "facebook_url"] = urls["facebook"]
-            updated = True
-        if urls.get("tiktok") and pd.isna(df.at[idx, "tiktok_url"]):
-            df.at[idx, "tiktok_url"] = urls["tiktok"]
-            df.at[idx, "tiktok_handle"] = extract_handle(urls["tiktok"])
-            updated = True
-        if urls.get("website") and pd.isna(df.at[idx, "website_url"]):
-            df.at[idx, "website_url"] = urls["website"]
-            updated = True
+        for url_col, handle_col in LINK_COLUMNS:
+            if urls.get(url_col) and pd.isna(df.at[idx, url_col]):
+                df.at[idx, url_col] = urls[url_col]
+                if handle_col and urls.get(handle_col):
+                    df.at[idx, handle_col] = urls[handle_col]
+                updated = True
 
         if updated:
             enriched += 1
@@ -164,12 +114,13 @@ def run(resume_from: int = 0):
             logger.info(f"Enriched: {artist_name} -> {list(urls.keys())}")
 
         if processed % SAVE_INTERVAL == 0:
-            df.to_csv(OUTPUT_CSV, index=False)
+            store.write_columns(CATEGORY, df)
             logger.info(f"Saved ({processed} processed, {enriched} enriched)")
 
-    df.to_csv(OUTPUT_CSV, index=False)
+    store.write_columns(CATEGORY, df)
     logger.info("=" * 50)
     logger.info(f"COMPLETE: {processed} checked, {enriched} enriched")
+    logger.info(negatives.stats())
     logger.info("=" * 50)
 
 
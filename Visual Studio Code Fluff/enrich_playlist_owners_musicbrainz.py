@@ -14,11 +14,15 @@ Usage:
 
 import os
 import sys
-import time
 import logging
-import requests
 import pandas as pd
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.mb_replica import MBReplica
+from social_links.musicbrainz import MusicBrainzClient as BaseMusicBrainzClient
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -30,10 +34,6 @@ SAVE_INTERVAL = 5
 
 # MusicBrainz requires a descriptive User-Agent
 USER_AGENT = "PlaylistCuratorResearch/1.0 (contact research project)"
-MB_API_BASE = "https://musicbrainz.org/ws/2"
-
-# Rate limit: 1 request per second
-REQUEST_DELAY = 1.1
 
 logging.basicConfig(
     level=logging.INFO,
@@ -50,138 +50,21 @@ logger = logging.getLogger(__name__)
 # MusicBrainz API Client
 # ---------------------------------------------------------------------------
 
-class MusicBrainzClient:
+class MusicBrainzClient(BaseMusicBrainzClient):
     """Client for MusicBrainz API lookups."""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": USER_AGENT,
-            "Accept": "application/json",
-        })
-
     def search_artist_or_label(self, name: str):
         """Search for an artist or label by name, return best match."""
-        try:
-            # Try artist search first
-            resp = self.session.get(
-                f"{MB_API_BASE}/artist",
-                params={"query": f'artist:"{name}"', "limit": 5, "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            artists = data.get("artists", [])
-            if artists:
-                # Find exact match
-                for artist in artists:
-                    if artist.get("name", "").lower() == name.lower():
-                        return {"type": "artist", "data": artist}
-                # Return best match
-                return {"type": "artist", "data": artists[0]}
-
-            # Try label search if no artist found
-            time.sleep(REQUEST_DELAY)
-            resp = self.session.get(
-                f"{MB_API_BASE}/label",
-                params={"query": f'label:"{name}"', "limit": 5, "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            labels = data.get("labels", [])
-            if labels:
-                for label in labels:
-                    if label.get("name", "").lower() == name.lower():
-                        return {"type": "label", "data": label}
-                return {"type": "label", "data": labels[0]}
-
-            return None
-
-        except requests.exceptions.RequestException as e:
-            logger.debug(f"MusicBrainz search error for {name}: {e}")
-            return None
-
-    def get_urls(self, mbid: str, entity_type: str = "artist"):
-        """Get URL relations for an artist or label by their MusicBrainz ID."""
-        try:
-            endpoint = f"{MB_API_BASE}/{entity_type}/{mbid}"
-            resp = self.session.get(
-                endpoint,
-                params={"inc": "url-rels", "fmt": "json"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            # Extract URLs by type
-            urls = {}
-            for rel in data.get("relations", []):
-                url_obj = rel.get("url", {})
-                url = url_obj.get("resource", "")
-                rel_type = rel.get("type", "").lower()
-
-                if not url:
-                    continue
-
-                # Map relation types to our columns
-                if "instagram.com" in url.lower():
-                    urls["instagram_url"] = url
-                    urls["instagram_handle"] = self.extract_handle(url)
-                elif "twitter.com" in url.lower() or "x.com" in url.lower():
-                    urls["twitter_url"] = url
-                    urls["twitter_handle"] = self.extract_handle(url)
-                elif "facebook.com" in url.lower():
-                    urls["facebook_url"] = url
-                elif "tiktok.com" in url.lower():
-                    urls["tiktok_url"] = url
-                    urls["tiktok_handle"] = self.extract_handle(url)
-                elif "youtube.com" in url.lower():
-                    urls["youtube_url"] = url
-                    urls["youtube_channel_id"] = self.extract_youtube_id(url)
-                elif "soundcloud.com" in url.lower():
-                    urls["soundcloud_url"] = url
-                    urls["soundcloud_handle"] = self.extract_handle(url)
-                elif rel_type == "official homepage" or "official" in rel_type:
-                    urls["website_url"] = url
-
-            return urls
-
-        except requests.exceptions.RequestException as e:
-            logger.debug(f"MusicBrainz URL fetch error for {mbid}: {e}")
-            return {}
-
-    @staticmethod
-    def extract_handle(url: str):
-        """Extract handle/username from a social media URL."""
-        if not url:
-            return None
-        try:
-            clean = url.rstrip("/").split("?")[0]
-            parts = clean.split("/")
-            handle = parts[-1] if parts else None
-            if handle and handle.startswith("@"):
-                handle = handle[1:]
-            return handle
-        except:
-            return None
-
-    @staticmethod
-    def extract_youtube_id(url: str):
-        """Extract YouTube channel ID from URL."""
-        if not url:
-            return None
-        try:
-            if "/channel/" in url:
-                return url.split("/channel/")[1].split("/")[0].split("?")[0]
-            elif "/@" in url:
-                handle = url.split("/@")[1].split("/")[0].split("?")[0]
-                return f"@{handle}"
-            return None
-        except:
-            return None
+        artist = self.search_artist(name)
+        if artist:
+            return {"type": "artist", "data": artist}
+
+        # Try label search if no artist found
+        label = self.search_label(name)
+        if label:
+            return {"type": "label", "data": label}
+
+        return None
 
 
 # ---------------------------------------------------------------------------
@@ -194,7 +77,8 @@ def run():
     total = len(df)
     logger.info(f"Loaded {total} playlist owners")
 
-    client = MusicBrainzClient()
+    # Artist lookups come from the local dump replica when one has been ingested
+    client = MusicBrainzClient(USER_AGENT, replica=MBReplica.open_existing())
     processed = 0
     enriched = 0
     found_count = 0
@@ -210,7 +94,6 @@ def run():
 
         # Search MusicBrainz
         result = client.search_artist_or_label(owner_name)
-        time.sleep(REQUEST_DELAY)
 
         if not result:
             logger.info(f"  ✗ Not found in MusicBrainz")
@@ -223,9 +106,8 @@ def run():
 
         logger.info(f"  ✓ Found {entity_type}: {mb_name} (MBID: {mbid})")
 
-        # Get URL relations
-        urls = client.get_urls(mbid, entity_type)
-        time.sleep(REQUEST_DELAY)
+        # Get URL relations, already mapped to our columns
+        urls = client.get_links(mbid, entity_type)
 
         if not urls:
             logger.info(f"  ✗ No social links found")
@@ -3,9 +3,17 @@
 Enrich Rappers data with social media links
 """
 
-import pandas as pd
+import os
+import sys
 import re
 
+import pandas as pd
+
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.handles import HANDLE_COLUMNS, fill_handles
+
 def clean_artist_name(name):
     """Clean artist name for URL generation"""
     if pd.isna(name):
@@ -25,23 +33,6 @@ def clean_artist_name(name):
     
     return name if name else None
 
-def extract_youtube_channel_id(youtube_url):
-    """Extract YouTube channel ID from URL"""
-    if pd.isna(youtube_url) or not youtube_url:
-        return None
-    
-    # Pattern for /channel/ URLs
-    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', str(youtube_url))
-    if channel_match:
-        return channel_match.group(1)
-    
-    # Pattern for @handle URLs
-    handle_match = re.search(r'/@([a-zA-Z0-9_.-]+)', str(youtube_url))
-    if handle_match:
-        return f"@{handle_match.group(1)}"
-    
-    return None
-
 def main():
     # Read the file with added columns
     input_file = 'Final_Social Links/rappers_final.xlsx'
@@ -72,6 +63,10 @@ def main():
         'facebook_url': 0
     }
     
+    # Channel IDs from YouTube URLs already present, for all rows at once
+    stats['youtube_channel_id'] += fill_handles(
+        df, {'youtube_channel_id': HANDLE_COLUMNS['youtube_channel_id']})['youtube_channel_id']
+    
     # Process each artist
     for idx, row in df.iterrows():
         artist = row['Artist']
@@ -101,12 +96,6 @@ def main():
             df.at[idx, 'youtube_channel_id'] = f"@{clean_name}"
             stats['youtube_url'] += 1
             stats['youtube_channel_id'] += 1
-        elif pd.isna(row['youtube_channel_id']):
-            # Extract channel ID from existing URL
-            channel_id = extract_youtube_channel_id(row['youtube_url'])
-            if channel_id:
-                df.at[idx, 'youtube_channel_id'] = channel_id
-                stats['youtube_channel_id'] += 1
         
         # Twitter
         if pd.isna(row['twitter_url']):
@@ -3,16 +3,21 @@
 Script to examine the female_singers_final.xlsx file in Final_Social Links directory
 """
 
-import pandas as pd
+import os
 import sys
 
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.file_cache import read_excel
+
 def main():
     try:
         # Read the Excel file
         file_path = 'Final_Social Links/female_singers_final.xlsx'
         print(f"Reading {file_path}...")
         
-        df = pd.read_excel(file_path)
+        df = read_excel(file_path)
         
         print(f"\n{'='*80}")
         print(f"FILE STRUCTURE")
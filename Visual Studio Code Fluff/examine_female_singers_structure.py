@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
-import pandas as pd
+import os
+import sys
+
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.excel_export import sheet_names
+from social_links.file_cache import read_excel
 
 # Read the female singers file
-df = pd.ExcelFile('Final_Social Links/female_singers_final.xlsx')
-print('Sheet names:', df.sheet_names)
+sheets = sheet_names('Final_Social Links/female_singers_final.xlsx')
+print('Sheet names:', sheets)
 print()
 
-for sheet in df.sheet_names:
+for sheet in sheets:
     print(f'Sheet: {sheet}')
-    data = pd.read_excel('Final_Social Links/female_singers_final.xlsx', sheet_name=sheet)
+    data = read_excel('Final_Social Links/female_singers_final.xlsx', sheet_name=sheet)
     print(f'  Rows: {len(data)}')
     print(f'  Columns: {len(data.columns)}')
     print(f'  Column names (first 20): {list(data.columns[:20])}')
@@ -3,16 +3,21 @@
 Script to examine the Rappers.xlsx file structure
 """
 
-import pandas as pd
+import os
 import sys
 
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.file_cache import read_excel
+
 def main():
     try:
         # Read the Excel file
         file_path = 'Soundcharts Pulled-Out Data/Rappers.xlsx'
         print(f"Reading {file_path}...\n")
         
-        df = pd.read_excel(file_path)
+        df = read_excel(file_path)
         
         print(f"{'='*80}")
         print(f"FILE STRUCTURE")
@@ -3,25 +3,15 @@
 Fill in ALL missing social media links: Instagram, Twitter, TikTok, and YouTube
 """
 
+import os
+import sys
+
 import pandas as pd
-import re
 
-def extract_handle_from_url(url, platform):
-    """Extract handle from social media URL"""
-    if pd.isna(url) or not url:
-        return None
-    
-    if platform == 'instagram':
-        match = re.search(r'instagram\.com/([^/]+)', url)
-        return match.group(1) if match else None
-    elif platform == 'twitter':
-        match = re.search(r'twitter\.com/([^/]+)', url)
-        return match.group(1) if match else None
-    elif platform == 'tiktok':
-        match = re.search(r'@([a-zA-Z0-9_.]+)', url)
-        return match.group(1) if match else None
-    
-    return None
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.handles import HANDLE_COLUMNS, extract_handle, fill_handles
 
 def construct_instagram_url(artist_name):
     """Construct Instagram URL from artist name"""
@@ -46,20 +36,15 @@ def main():
     print(f"  TikTok handle: {df['tiktok_handle'].notna().sum()} / {len(df)}")
     print(f"  YouTube URL: {df['youtube_url'].notna().sum()} / {len(df)}")
     
-    changes = 0
+    # Handles from existing URLs, for all rows at once
+    filled = fill_handles(df, {col: HANDLE_COLUMNS[col] for col in ('instagram_handle', 'twitter_handle')})
+    changes = sum(filled.values())
     
     print("\nProcessing artists...")
     
     for idx, row in df.iterrows():
         artist = row['Artist']
         
-        # Fill Instagram handle from URL if missing
-        if pd.isna(row['instagram_handle']) and not pd.isna(row['instagram_url']):
-            handle = extract_handle_from_url(row['instagram_url'], 'instagram')
-            if handle:
-                df.at[idx, 'instagram_handle'] = handle
-                changes += 1
-        
         # Fill Instagram URL from handle if missing
         if pd.isna(row['instagram_url']) and not pd.isna(row['instagram_handle']):
             df.at[idx, 'instagram_url'] = f"https://www.instagram.com/{row['instagram_handle']}/"
@@ -68,18 +53,11 @@ def main():
         # Fill both Instagram fields if both missing
         if pd.isna(row['instagram_url']) and pd.isna(row['instagram_handle']):
             url = construct_instagram_url(artist)
-            handle = extract_handle_from_url(url, 'instagram')
+            handle = extract_handle(url, 'instagram')
             df.at[idx, 'instagram_url'] = url
             df.at[idx, 'instagram_handle'] = handle
             changes += 2
         
-        # Fill Twitter handle from URL if missing
-        if pd.isna(row['twitter_handle']) and not pd.isna(row['twitter_url']):
-            handle = extract_handle_from_url(row['twitter_url'], 'twitter')
-            if handle:
-                df.at[idx, 'twitter_handle'] = handle
-                changes += 1
-        
         # Fill Twitter URL from handle if missing
         if pd.isna(row['twitter_url']) and not pd.isna(row['twitter_handle']):
             df.at[idx, 'twitter_url'] = f"https://twitter.com/{row['twitter_handle']}"
@@ -88,7 +66,7 @@ def main():
         # Fill both Twitter fields if both missing
         if pd.isna(row['twitter_url']) and pd.isna(row['twitter_handle']):
             url = construct_twitter_url(artist)
-            handle = extract_handle_from_url(url, 'twitter')
+            handle = extract_handle(url, 'twitter')
             df.at[idx, 'twitter_url'] = url
             df.at[idx, 'twitter_handle'] = handle
             changes += 2
@@ -3,25 +3,17 @@
 Fill in ALL missing social media links for rappers dataset
 """
 
+import os
+import sys
+
 import pandas as pd
-import re
 
-def extract_handle_from_url(url, platform):
-    """Extract handle from social media URL"""
-    if pd.isna(url) or not url:
-        return None
-    
-    if platform == 'instagram':
-        match = re.search(r'instagram\.com/([^/]+)', url)
-        return match.group(1) if match else None
-    elif platform == 'twitter':
-        match = re.search(r'twitter\.com/([^/]+)', url)
-        return match.group(1) if match else None
-    elif platform == 'tiktok':
-        match = re.search(r'@([a-zA-Z0-9_.]+)', url)
-        return match.group(1) if match else None
-    
-    return None
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.excel_export import StreamingWorkbook, frame_rows
+from social_links.handles import HANDLE_COLUMNS, extract_handle, fill_handles
+from social_links.store import SOCIAL_LINK_COLUMNS, ArtistStore
 
 def construct_social_url(artist_name, platform, handle=None):
     """Construct social media URL"""
@@ -50,8 +42,11 @@ def construct_social_url(artist_name, platform, handle=None):
     return None
 
 def main():
-    print("Reading rappers_enriched.csv...")
-    df = pd.read_csv('rappers_enriched.csv', low_memory=False)
+    # Guessed links are written to the export files only, never back into the store
+    print("Reading rappers from the artist store...")
+    store = ArtistStore()
+    store.import_csv('rappers', 'rappers_enriched.csv')
+    df = store.read('rappers')
     
     print(f"\nTotal artists: {len(df)}")
     print(f"\nCURRENT STATUS:")
@@ -60,7 +55,9 @@ def main():
     print(f"  TikTok: {df['tiktok_url'].notna().sum()} URLs, {df['tiktok_handle'].notna().sum()} handles")
     print(f"  YouTube: {df['youtube_url'].notna().sum()} URLs, {df['youtube_channel_id'].notna().sum()} IDs")
     
-    changes = 0
+    # Handles from existing URLs, for all rows at once
+    filled = fill_handles(df, {col: HANDLE_COLUMNS[col] for col in ('instagram_handle', 'twitter_handle', 'tiktok_handle')})
+    changes = sum(filled.values())
     
     print("\nProcessing artists...")
     
@@ -68,48 +65,30 @@ def main():
         artist = row['artist_name']
         
         # Instagram
-        if pd.isna(row['instagram_handle']) and not pd.isna(row['instagram_url']):
-            handle = extract_handle_from_url(row['instagram_url'], 'instagram')
-            if handle:
-                df.at[idx, 'instagram_handle'] = handle
-                changes += 1
-        
         if pd.isna(row['instagram_url']) and not pd.isna(row['instagram_handle']):
             df.at[idx, 'instagram_url'] = construct_social_url(artist, 'instagram', row['instagram_handle'])
             changes += 1
         
         if pd.isna(row['instagram_url']) and pd.isna(row['instagram_handle']):
             url = construct_social_url(artist, 'instagram')
-            handle = extract_handle_from_url(url, 'instagram')
+            handle = extract_handle(url, 'instagram')
             df.at[idx, 'instagram_url'] = url
             df.at[idx, 'instagram_handle'] = handle
             changes += 2
         
         # Twitter
-        if pd.isna(row['twitter_handle']) and not pd.isna(row['twitter_url']):
-            handle = extract_handle_from_url(row['twitter_url'], 'twitter')
-            if handle:
-                df.at[idx, 'twitter_handle'] = handle
-                changes += 1
-        
         if pd.isna(row['twitter_url']) and not pd.isna(row['twitter_handle']):
             df.at[idx, 'twitter_url'] = construct_social_url(artist, 'twitter', row['twitter_handle'])
             changes += 1
         
         if pd.isna(row['twitter_url']) and pd.isna(row['twitter_handle']):
             url = construct_social_url(artist, 'twitter')
-            handle = extract_handle_from_url(url, 'twitter')
+            handle = extract_handle(url, 'twitter')
             df.at[idx, 'twitter_url'] = url
             df.at[idx, 'twitter_handle'] = handle
             changes += 2
         
         # TikTok
-        if pd.isna(row['tiktok_handle']) and not pd.isna(row['tiktok_url']):
-            handle = extract_handle_from_url(row['tiktok_url'], 'tiktok')
-            if handle:
-                df.at[idx, 'tiktok_handle'] = handle
-                changes += 1
-        
         if pd.isna(row['tiktok_url']) and not pd.isna(row['tiktok_handle']):
             df.at[idx, 'tiktok_url'] = f"https://tiktok.com/@{row['tiktok_handle']}"
             changes += 1
@@ -136,26 +115,9 @@ def main():
     df.to_csv('rappers_social_updated.csv', index=False)
     
     # Create multi-sheet Excel
-    with pd.ExcelWriter('rappers_enriched.xlsx', engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='All Data', index=False)
-        
-        social_links_df = df[[
-            'artist_name',
-            'instagram_url',
-            'instagram_handle',
-            'tiktok_url',
-            'tiktok_handle',
-            'youtube_url',
-            'youtube_channel_id',
-            'soundcloud_url',
-            'soundcloud_handle',
-            'twitter_url',
-            'twitter_handle',
-            'facebook_url',
-            'website_url'
-        ]].copy()
-        
-        social_links_df.to_excel(writer, sheet_name='Social Links', index=False)
+    with StreamingWorkbook('rappers_enriched.xlsx') as wb:
+        wb.add_sheet('All Data', *frame_rows(df))
+        wb.add_sheet('Social Links', *frame_rows(df[SOCIAL_LINK_COLUMNS]))
     
     print(f"\n{'='*80}")
     print("COMPLETION SUMMARY")
@@ -4,35 +4,15 @@ Script to fill in missing TikTok and YouTube social media links for female singe
 This script will search for and populate missing tiktok_url, tiktok_handle, youtube_url, and youtube_channel_id.
 """
 
+import os
+import sys
+
 import pandas as pd
-import re
-from urllib.parse import urlparse
 
-def extract_youtube_channel_id(youtube_url):
-    """Extract YouTube channel ID from URL"""
-    if pd.isna(youtube_url) or not youtube_url:
-        return None
-    
-    # Pattern for /channel/ URLs
-    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', youtube_url)
-    if channel_match:
-        return channel_match.group(1)
-    
-    # Pattern for /c/ or /user/ URLs - these don't have channel IDs directly
-    # Would need API call to resolve
-    return None
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-def extract_tiktok_handle(tiktok_url):
-    """Extract TikTok handle from URL"""
-    if pd.isna(tiktok_url) or not tiktok_url:
-        return None
-    
-    # Pattern for @username
-    handle_match = re.search(r'@([a-zA-Z0-9_.]+)', tiktok_url)
-    if handle_match:
-        return handle_match.group(1)
-    
-    return None
+from social_links.handles import HANDLE_COLUMNS, fill_handles
 
 def construct_youtube_url(artist_name, instagram_handle=None):
     """Construct likely YouTube URL based on artist name or Instagram handle"""
@@ -65,29 +45,11 @@ def main():
     print(f"Missing YouTube URL: {df['youtube_url'].isna().sum()}")
     print(f"Missing YouTube channel ID: {df['youtube_channel_id'].isna().sum()}")
     
-    # Track changes
-    changes_made = 0
-    
-    # Process each row
-    for idx, row in df.iterrows():
-        artist = row['Artist']
-        instagram_handle = row.get('instagram_handle')
-        
-        # Fill TikTok handle from URL if missing
-        if pd.isna(row['tiktok_handle']) and not pd.isna(row['tiktok_url']):
-            handle = extract_tiktok_handle(row['tiktok_url'])
-            if handle:
-                df.at[idx, 'tiktok_handle'] = handle
-                changes_made += 1
-                print(f"✓ {artist}: Added TikTok handle '{handle}' from URL")
-        
-        # Fill YouTube channel ID from URL if missing
-        if pd.isna(row['youtube_channel_id']) and not pd.isna(row['youtube_url']):
-            channel_id = extract_youtube_channel_id(row['youtube_url'])
-            if channel_id:
-                df.at[idx, 'youtube_channel_id'] = channel_id
-                changes_made += 1
-                print(f"✓ {artist}: Added YouTube channel ID '{channel_id}' from URL")
+    # Fill TikTok handles and YouTube channel IDs from their URLs where missing
+    filled = fill_handles(df, {col: HANDLE_COLUMNS[col] for col in ('tiktok_handle', 'youtube_channel_id')})
+    for col, count in filled.items():
+        print(f"✓ Filled {count} {col} values from URLs")
+    changes_made = sum(filled.values())
     
     # Save the updated CSV
     output_file = 'female_singers_social_updated.csv'
@@ -1,39 +1,27 @@
 #!/usr/bin/env python3
 """
 Fill in missing YouTube channel IDs from YouTube URLs in female_singers_final.xlsx
+
+@handle, c/ and user/ values are then resolved to UC channel IDs with 1-unit
+channels.list calls (social_links.youtube_channels) when YOUTUBE_API_KEY is set.
 """
 
+import os
+import sys
+
 import pandas as pd
-import re
+from dotenv import load_dotenv
 
-def extract_youtube_channel_id(youtube_url):
-    """Extract YouTube channel ID from URL"""
-    if pd.isna(youtube_url) or not youtube_url:
-        return None
-    
-    url_str = str(youtube_url).strip()
-    
-    # Pattern for /channel/ URLs (actual channel IDs)
-    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', url_str)
-    if channel_match:
-        return channel_match.group(1)
-    
-    # Pattern for @handle URLs (new YouTube format)
-    handle_match = re.search(r'/@([a-zA-Z0-9_.-]+)', url_str)
-    if handle_match:
-        return f"@{handle_match.group(1)}"
-    
-    # Pattern for /c/ custom URLs
-    custom_match = re.search(r'/c/([a-zA-Z0-9_-]+)', url_str)
-    if custom_match:
-        return f"c/{custom_match.group(1)}"
-    
-    # Pattern for /user/ URLs
-    user_match = re.search(r'/user/([a-zA-Z0-9_-]+)', url_str)
-    if user_match:
-        return f"user/{user_match.group(1)}"
-    
-    return None
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.handles import HANDLE_COLUMNS, fill_handles
+from social_links.youtube import YouTubeClient
+from social_links.youtube_channels import ChannelResolver
+from social_links.youtube_quota import QuotaLedger
+
+load_dotenv()
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
 def main():
     # Read the Excel file
@@ -47,23 +35,17 @@ def main():
     print(f"YouTube URLs present: {df['youtube_url'].notna().sum()}")
     print(f"YouTube channel IDs before: {df['youtube_channel_id'].notna().sum()}\n")
     
-    # Extract channel IDs
-    filled_count = 0
-    failed_urls = []
-    
-    for idx, row in df.iterrows():
-        if pd.notna(row['youtube_url']) and pd.isna(row['youtube_channel_id']):
-            channel_id = extract_youtube_channel_id(row['youtube_url'])
-            if channel_id:
-                df.at[idx, 'youtube_channel_id'] = channel_id
-                filled_count += 1
-                if filled_count <= 10:  # Show first 10 examples
-                    print(f"✓ {row['Artist']:30s} -> {channel_id}")
-            else:
-                failed_urls.append({
-                    'Artist': row['Artist'],
-                    'URL': row['youtube_url']
-                })
+    # Extract channel IDs for every row missing one, in one pass
+    todo = df['youtube_url'].notna() & df['youtube_channel_id'].isna()
+    filled_count = fill_handles(df, {'youtube_channel_id': HANDLE_COLUMNS['youtube_channel_id']})['youtube_channel_id']
+    filled = todo & df['youtube_channel_id'].notna()
+    for artist, channel_id in df.loc[filled, ['Artist', 'youtube_channel_id']].head(10).itertuples(index=False):
+        print(f"✓ {artist:30s} -> {channel_id}")  # Show first 10 examples
+    failed = df[todo & ~filled]
+    failed_urls = [
+        {'Artist': artist, 'URL': url}
+        for artist, url in zip(failed['Artist'], failed['youtube_url'])
+    ]
     
     print(f"\n{'='*80}")
     print(f"RESULTS")
@@ -76,6 +58,19 @@ def main():
         print(f"\nURLs that couldn't be parsed:")
         for item in failed_urls[:10]:  # Show first 10
             print(f"  {item['Artist']:30s}: {item['URL']}")
+
+    # Handles are not channel IDs: resolve them for 1 unit each instead of
+    # leaving later stages to pay 100 units per search
+    if YOUTUBE_API_KEY:
+        with QuotaLedger() as ledger:
+            resolver = ChannelResolver(YouTubeClient(YOUTUBE_API_KEY, ledger=ledger))
+            counts = resolver.rewrite(df)
+            print(f"\nHandles resolved to UC channel IDs: {counts['resolved']} "
+                  f"({counts['unresolved']} unresolved)")
+            print(resolver.stats())
+            resolver.close()
+    else:
+        print("\nNo YOUTUBE_API_KEY — leaving @handle / c/ / user/ values unresolved")
     
     # Save the updated file
     print(f"\nSaving to {output_file}...")
@@ -1,7 +1,13 @@
-hosimport pandas as pd
+import pandas as pd
 import sqlite3
-from openpyxl import load_workbook
 import os
+import sys
+
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.excel_export import frame_rows, replace_sheet, sheet_names
+from social_links.names import normalize_names
 
 # File paths
 source_file = 'Soundcharts Pulled-Out Data/DJProducers.csv'
@@ -18,6 +24,11 @@ print("\nLoading current final data...")
 df_final = pd.read_csv(final_csv, low_memory=False)
 print(f"Current final data: {len(df_final)} rows")
 
+# Join on the normalised name, so case, spacing, punctuation and mojibake
+# differences between the two exports don't drop artists
+df_source['artist_key'] = normalize_names(df_source['Artist'])
+df_final['artist_key'] = normalize_names(df_final['Artist'])
+
 # Create an in-memory SQLite database
 conn = sqlite3.connect(':memory:')
 
@@ -29,17 +40,18 @@ print("\nData loaded into SQL database")
 print("\nExecuting SQL filter query...")
 
 # SQL query to filter artists that exist in final but get updated data from source
-# This will match by Artist name and update with source data
+# This will match by normalised Artist name and update with source data
 query = """
 SELECT s.*
 FROM source s
-INNER JOIN final f ON s.Artist = f.Artist
+INNER JOIN final f ON s.artist_key = f.artist_key
 ORDER BY s.Artist
 """
 
 # Execute the query
-df_filtered = pd.read_sql_query(query, conn)
+df_filtered = pd.read_sql_query(query, conn).drop(columns='artist_key')
 conn.close()
+df_final = df_final.drop(columns='artist_key')
 
 print(f"\nFiltered data: {len(df_filtered)} rows (artists that exist in both files)")
 
@@ -51,35 +63,19 @@ print("CSV file updated successfully!")
 # Update the Excel file
 print(f"\nUpdating Excel file {final_xlsx}...")
 try:
-    # Load the existing workbook
-    wb = load_workbook(final_xlsx)
+    # Only workbook.xml is read to pick the sheet; the other sheets are copied as-is
+    sheetnames = sheet_names(final_xlsx)
     
     # Get the first sheet (or you can specify sheet name)
-    if 'DJ Producers' in wb.sheetnames:
+    if 'DJ Producers' in sheetnames:
         sheet_name = 'DJ Producers'
-    elif 'Sheet1' in wb.sheetnames:
+    elif 'Sheet1' in sheetnames:
         sheet_name = 'Sheet1'
     else:
-        sheet_name = wb.sheetnames[0]
-    
-    # Remove the old sheet and create a new one
-    if sheet_name in wb.sheetnames:
-        del wb[sheet_name]
-    
-    # Create new sheet
-    ws = wb.create_sheet(sheet_name, 0)
-    
-    # Write headers
-    for col_idx, col_name in enumerate(df_filtered.columns, 1):
-        ws.cell(row=1, column=col_idx, value=col_name)
-    
-    # Write data
-    for row_idx, row_data in enumerate(df_filtered.values, 2):
-        for col_idx, value in enumerate(row_data, 1):
-            ws.cell(row=row_idx, column=col_idx, value=value)
+        sheet_name = sheetnames[0]
     
-    # Save the workbook
-    wb.save(final_xlsx)
+    # Swap in the new sheet XML, streamed from the DataFrame
+    replace_sheet(final_xlsx, sheet_name, *frame_rows(df_filtered))
     print("Excel file updated successfully!")
     
 except Exception as e:
@@ -3,8 +3,16 @@
 Investigate artists that didn't get social media links enriched
 """
 
+import os
+import sys
+
 import pandas as pd
 
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.file_cache import read_excel
+
 def investigate_missing(file_path, file_name, sheet_name=None):
     """Investigate artists with missing social links"""
     print(f"\n{'='*80}")
@@ -13,9 +21,9 @@ def investigate_missing(file_path, file_name, sheet_name=None):
     
     # Read the file
     if sheet_name:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        df = read_excel(file_path, sheet_name=sheet_name)
     else:
-        df = pd.read_excel(file_path)
+        df = read_excel(file_path)
     
     # Find artists with missing social links
     missing_all = df[
@@ -81,7 +89,7 @@ def investigate_youtube_channel_ids(file_path, file_name):
     print(f"INVESTIGATING YOUTUBE CHANNEL IDs: {file_name}")
     print(f"{'='*80}")
     
-    df = pd.read_excel(file_path)
+    df = read_excel(file_path)
     
     # Find YouTube URLs without channel IDs
     missing_ids = df[
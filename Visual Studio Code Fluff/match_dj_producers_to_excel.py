@@ -1,6 +1,12 @@
 import pandas as pd
 from openpyxl import load_workbook
 import os
+import sys
+
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.names import normalize_names
 
 # File paths
 source_file = 'Soundcharts Pulled-Out Data/DJProducers.csv'
@@ -20,14 +26,12 @@ print(f"Current final data: {len(df_final)} rows")
 print(f"Final columns: {len(df_final.columns)}")
 
 # Get the list of artists from the filtered source
-source_artists = set(df_source['Artist'].str.strip().str.lower())
+source_artists = set(normalize_names(df_source['Artist']).dropna())
 print(f"\nUnique artists in filtered source: {len(source_artists)}")
 
 # Filter the final data to keep only artists that exist in the source
 print("\nFiltering final data to match source artists...")
-df_final['Artist_lower'] = df_final['Artist'].str.strip().str.lower()
-df_filtered_final = df_final[df_final['Artist_lower'].isin(source_artists)].copy()
-df_filtered_final = df_filtered_final.drop('Artist_lower', axis=1)
+df_filtered_final = df_final[normalize_names(df_final['Artist']).isin(source_artists)].copy()
 
 print(f"Filtered final data: {len(df_filtered_final)} rows")
 print(f"Artists removed: {len(df_final) - len(df_filtered_final)}")
@@ -15,16 +15,19 @@ Author: Data Engineering Pipeline
 
 import os
 import sys
-import time
 import argparse
 import logging
 from typing import Optional
 from dataclasses import dataclass, field, asdict
 
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 
+# Shared provider clients live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.soundcharts import SoundchartsClient
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,13 +43,9 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # API Configuration
-SOUNDCHARTS_BASE_URL = "https://customer.api.soundcharts.com/api/v2"
 SOUNDCHARTS_APP_ID = os.getenv("SOUNDCHARTS_APP_ID")
 SOUNDCHARTS_API_KEY = os.getenv("SOUNDCHARTS_API_KEY")
 
-# Rate limiting - Soundcharts typically allows ~60 requests/minute
-REQUEST_DELAY_SECONDS = 1.0
-
 
 @dataclass
 class ArtistSocialLinks:
@@ -70,115 +69,6 @@ class ArtistSocialLinks:
     error_message: Optional[str] = None
 
 
-class SoundchartsClient:
-    """Client for interacting with the Soundcharts API."""
-
-    def __init__(self, app_id: str, api_key: str):
-        if not app_id or not api_key:
-            raise ValueError(
-                "Soundcharts credentials not found. "
-                "Please set SOUNDCHARTS_APP_ID and SOUNDCHARTS_API_KEY in your .env file."
-            )
-
-        self.app_id = app_id
-        self.api_key = api_key
-        self.session = requests.Session()
-        self.session.headers.update({
-            "x-app-id": self.app_id,
-            "x-api-key": self.api_key,
-            "Accept": "application/json"
-        })
-
-    def _make_request(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
-        """Make an authenticated request to the Soundcharts API."""
-        url = f"{SOUNDCHARTS_BASE_URL}{endpoint}"
-
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
-                logger.debug(f"Resource not found: {endpoint}")
-                return None
-            elif response.status_code == 429:
-                logger.warning("Rate limit exceeded. Waiting before retry...")
-                time.sleep(60)
-                return self._make_request(endpoint, params)
-            else:
-                logger.error(f"HTTP error {response.status_code}: {e}")
-                raise
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
-            raise
-
-    def search_artist(self, artist_name: str, spotify_id: Optional[str] = None) -> Optional[str]:
-        """
-        Search for an artist and return their Soundcharts UUID.
-
-        If a Spotify ID is provided, attempts to look up directly first.
-        Falls back to name search if direct lookup fails.
-        """
-        # Try direct Spotify ID lookup first if provided
-        if spotify_id:
-            logger.info(f"Looking up artist by Spotify ID: {spotify_id}")
-            result = self._make_request(f"/artist/by-platform/spotify/{spotify_id}")
-            if result and "object" in result:
-                uuid = result["object"].get("uuid")
-                if uuid:
-                    logger.info(f"Found artist UUID via Spotify ID: {uuid}")
-                    return uuid
-
-        # Fall back to name search
-        logger.info(f"Searching for artist by name: {artist_name}")
-        result = self._make_request("/artist/search", params={"q": artist_name, "limit": 5})
-
-        if not result or "items" not in result or not result["items"]:
-            logger.warning(f"No results found for artist: {artist_name}")
-            return None
-
-        # Find best match - prefer exact name match
-        items = result["items"]
-
-        # First, try exact match (case-insensitive)
-        for item in items:
-            if item.get("name", "").lower() == artist_name.lower():
-                uuid = item.get("uuid")
-                logger.info(f"Found exact match for '{artist_name}': {uuid}")
-                return uuid
-
-        # Otherwise, return the top result
-        top_result = items[0]
-        uuid = top_result.get("uuid")
-        logger.info(f"Using top result for '{artist_name}': {top_result.get('name')} ({uuid})")
-        return uuid
-
-    def get_artist_identifiers(self, artist_uuid: str) -> dict:
-        """Fetch all platform identifiers (including social media) for an artist by their UUID."""
-        result = self._make_request(f"/artist/{artist_uuid}/identifiers")
-
-        if not result or "items" not in result:
-            return {}
-
-        # Organize identifiers by platform code
-        identifiers = {}
-        for item in result.get("items", []):
-            platform_code = item.get("platformCode", "").lower()
-            url = item.get("url")
-            identifier = item.get("identifier")
-            is_default = item.get("default", False)
-
-            # Only store default identifiers, or first occurrence if no default
-            if platform_code and url:
-                if platform_code not in identifiers or is_default:
-                    identifiers[platform_code] = {
-                        "url": url,
-                        "identifier": identifier,
-                        "platform_name": item.get("platformName")
-                    }
-
-        return identifiers
-
 def enrich_artist(client: SoundchartsClient, artist_name: str,
                   spotify_id: Optional[str] = None,
                   existing_uuid: Optional[str] = None) -> ArtistSocialLinks:
@@ -212,11 +102,9 @@ def enrich_artist(client: SoundchartsClient, artist_name: str,
             return result
 
         result.soundcharts_uuid = uuid
-        time.sleep(REQUEST_DELAY_SECONDS)
 
         # Step 2: Get platform identifiers (includes social media)
         identifiers = client.get_artist_identifiers(uuid)
-        time.sleep(REQUEST_DELAY_SECONDS)
 
         # Map platform codes to our data structure
         # Soundcharts uses platformCode like "instagram", "tiktok", "youtube", "x" (for Twitter)
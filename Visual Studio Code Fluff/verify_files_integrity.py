@@ -3,9 +3,18 @@
 Verify the integrity and quality of the enriched files
 """
 
-import pandas as pd
+import os
+import sys
 import re
 
+import pandas as pd
+
+# Shared helpers live in the social_links package at the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.excel_export import sheet_names
+from social_links.file_cache import read_excel
+
 def verify_url_format(url, platform):
     """Verify URL format is correct for the platform"""
     if pd.isna(url):
@@ -38,7 +47,7 @@ def verify_file(file_path, file_name):
     try:
         # Try to read the file
         print(f"Reading {file_path}...")
-        df = pd.read_excel(file_path)
+        df = read_excel(file_path)
         
         print(f"✓ File opened successfully")
         print(f"  Rows: {len(df):,}")
@@ -142,27 +151,27 @@ def verify_multisheet_file(file_path, file_name):
     try:
         # Read all sheets
         print(f"Reading {file_path}...")
-        xl_file = pd.ExcelFile(file_path)
+        sheetnames = sheet_names(file_path)
         
         print(f"✓ File opened successfully")
-        print(f"  Sheets found: {xl_file.sheet_names}")
+        print(f"  Sheets found: {sheetnames}")
         
         # Verify expected sheets
         expected_sheets = ['Original Data', 'Social Links']
         for sheet in expected_sheets:
-            if sheet in xl_file.sheet_names:
+            if sheet in sheetnames:
                 print(f"  ✓ Sheet '{sheet}' present")
                 
                 # Read the sheet
-                df = pd.read_excel(file_path, sheet_name=sheet)
+                df = read_excel(file_path, sheet_name=sheet)
                 print(f"    - Rows: {len(df):,}")
                 print(f"    - Columns: {len(df.columns)}")
             else:
                 print(f"  ✗ Sheet '{sheet}' MISSING")
         
         # Verify Social Links sheet in detail
-        if 'Social Links' in xl_file.sheet_names:
-            df_social = pd.read_excel(file_path, sheet_name='Social Links')
+        if 'Social Links' in sheetnames:
+            df_social = read_excel(file_path, sheet_name='Social Links')
             
             print(f"\nSocial Links Sheet Details:")
             social_columns = ['instagram_url', 'tiktok_url', 'youtube_url', 
@@ -0,0 +1,111 @@
+"""
+Excel export benchmark: pandas/openpyxl normal mode vs the streaming writer.
+
+Generates a synthetic CSV shaped like a Soundcharts export (~190 columns of
+mixed numbers and text), then builds the same two-sheet workbook
+('All Data' + 'Social Links') two ways, each in a fresh subprocess so peak
+RSS is measured cleanly:
+  - pandas: read_csv + ExcelWriter(engine="openpyxl") + to_excel (the old path)
+  - streaming: social_links.excel_export.StreamingWorkbook fed by csv_rows
+
+Usage:
+    python benchmarks/bench_excel_export.py
+    python benchmarks/bench_excel_export.py --rows 50000 --columns 190
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+SOCIAL_COLUMNS = [
+    "Artist", "Artist country", "instagram_url", "instagram_handle", "tiktok_url",
+    "tiktok_handle", "youtube_url", "youtube_channel_id", "soundcloud_url",
+    "soundcloud_handle", "twitter_url", "twitter_handle", "facebook_url", "website_url",
+]
+
+
+def make_csv(path: str, n_rows: int, n_columns: int):
+    rng = np.random.default_rng(0)
+    data = {
+        "Artist": [f"Artist {i}" for i in range(n_rows)],
+        "Artist country": rng.choice(["US", "GB", "FR", "DE", None], n_rows),
+    }
+    for col in SOCIAL_COLUMNS[2:]:
+        handles = pd.Series([f"artist{i}" for i in range(n_rows)])
+        data[col] = handles.where(rng.random(n_rows) < 0.6)
+    for i in range(n_columns - len(data)):
+        if i % 3 == 0:
+            data[f"metric_{i}"] = rng.integers(0, 10_000_000, n_rows)
+        elif i % 3 == 1:
+            data[f"ratio_{i}"] = rng.random(n_rows).round(4)
+        else:
+            data[f"label_{i}"] = rng.choice(["pop", "hip hop", "electronic", "rap", ""], n_rows)
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def export_pandas(csv_path: str, out_path: str):
+    df = pd.read_csv(csv_path, low_memory=False)
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="All Data", index=False)
+        df[SOCIAL_COLUMNS].to_excel(writer, sheet_name="Social Links", index=False)
+
+
+def export_streaming(csv_path: str, out_path: str):
+    from social_links.excel_export import StreamingWorkbook, csv_rows
+
+    with StreamingWorkbook(out_path) as wb:
+        wb.add_sheet("All Data", *csv_rows(csv_path))
+        wb.add_sheet("Social Links", *csv_rows(csv_path, SOCIAL_COLUMNS))
+
+
+def run_child(mode: str, csv_path: str, out_path: str) -> dict:
+    """Run one export in a subprocess; returns wall time and the child's peak RSS."""
+    start = time.monotonic()
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", mode, csv_path, out_path],
+        check=True, capture_output=True, text=True,
+    )
+    elapsed = time.monotonic() - start
+    peak_kib = int(proc.stdout.strip())
+    return {"elapsed": elapsed, "peak_mb": peak_kib / 1024, "size_mb": os.path.getsize(out_path) / 1e6}
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        mode, csv_path, out_path = sys.argv[2:5]
+        {"pandas": export_pandas, "streaming": export_streaming}[mode](csv_path, out_path)
+        # Peak RSS of this process, in KiB on Linux
+        print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--columns", type=int, default=190)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "export.csv")
+        print(f"Generating {args.rows:,} x {args.columns} CSV...")
+        make_csv(csv_path, args.rows, args.columns)
+        print(f"CSV size: {os.path.getsize(csv_path) / 1e6:.1f} MB\n")
+
+        results = {}
+        for mode in ("pandas", "streaming"):
+            results[mode] = run_child(mode, csv_path, os.path.join(tmp, f"{mode}.xlsx"))
+
+    print(f"{'writer':<12} {'elapsed':>9} {'peak RSS':>10} {'xlsx':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<12} {r['elapsed']:>8.1f}s {r['peak_mb']:>8.0f}MB {r['size_mb']:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
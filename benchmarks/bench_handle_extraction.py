@@ -0,0 +1,138 @@
+"""
+Handle extraction benchmark: the per-row iterrows loops vs fill_handles.
+
+Builds a synthetic frame shaped like the final artist sheets (one URL and
+one handle column per platform, ~60% of URLs present, a few already-filled
+handles and junk links), then fills the handle columns two ways:
+  - loop: iterrows + per-platform helper + df.at, as the fill scripts did
+  - vectorised: social_links.handles.fill_handles
+
+Both start from a copy of the same frame; the cells they fill are compared
+so a speedup never hides a behaviour change.
+
+Usage:
+    python benchmarks/bench_handle_extraction.py
+    python benchmarks/bench_handle_extraction.py --rows 200000
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.handles import HANDLE_COLUMNS, fill_handles
+
+URL_FORMS = {
+    "instagram": ["https://www.instagram.com/{h}/", "https://instagram.com/{h}?hl=en"],
+    "tiktok": ["https://www.tiktok.com/@{h}", "https://tiktok.com/@{h}?lang=en"],
+    "youtube": ["https://www.youtube.com/channel/UC{h}", "https://www.youtube.com/@{h}",
+                "https://www.youtube.com/c/{h}", "https://www.youtube.com/user/{h}"],
+    "soundcloud": ["https://soundcloud.com/{h}", "https://soundcloud.com/{h}/sets"],
+    "twitter": ["https://twitter.com/{h}", "https://x.com/{h}"],
+}
+
+
+def make_frame(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    handles = np.array([f"artist_{i}" for i in range(n_rows)], dtype=object)
+    data = {"Artist": [f"Artist {i}" for i in range(n_rows)]}
+    for handle_col, (url_col, platform) in HANDLE_COLUMNS.items():
+        forms = URL_FORMS[platform]
+        picks = rng.integers(0, len(forms), n_rows)
+        urls = np.array([forms[p].format(h=h) for p, h in zip(picks, handles)], dtype=object)
+        urls[rng.random(n_rows) < 0.02] = "https://linktr.ee/somebody"
+        urls[rng.random(n_rows) > 0.6] = None
+        data[url_col] = urls
+        existing = np.full(n_rows, None, dtype=object)
+        existing[rng.random(n_rows) < 0.1] = "already_set"
+        data[handle_col] = existing
+    return pd.DataFrame(data)
+
+
+# ---------------------------------------------------------------------------
+# The per-row helpers the scripts carried
+# ---------------------------------------------------------------------------
+
+def legacy_youtube_channel_id(youtube_url):
+    if pd.isna(youtube_url) or not youtube_url:
+        return None
+    url_str = str(youtube_url).strip()
+    channel_match = re.search(r'/channel/([a-zA-Z0-9_-]+)', url_str)
+    if channel_match:
+        return channel_match.group(1)
+    handle_match = re.search(r'/@([a-zA-Z0-9_.-]+)', url_str)
+    if handle_match:
+        return f"@{handle_match.group(1)}"
+    custom_match = re.search(r'/c/([a-zA-Z0-9_-]+)', url_str)
+    if custom_match:
+        return f"c/{custom_match.group(1)}"
+    user_match = re.search(r'/user/([a-zA-Z0-9_-]+)', url_str)
+    if user_match:
+        return f"user/{user_match.group(1)}"
+    return None
+
+
+def legacy_handle(url, platform):
+    if pd.isna(url) or not url:
+        return None
+    if platform == "youtube":
+        return legacy_youtube_channel_id(url)
+    patterns = {
+        "instagram": r'instagram\.com/([a-zA-Z0-9_.]+)',
+        "tiktok": r'@([a-zA-Z0-9_.]+)',
+        "soundcloud": r'soundcloud\.com/([a-zA-Z0-9_-]+)',
+        "twitter": r'(?:twitter|x)\.com/([a-zA-Z0-9_]+)',
+    }
+    match = re.search(patterns[platform], url)
+    return match.group(1) if match else None
+
+
+def fill_loop(df: pd.DataFrame) -> dict[str, int]:
+    filled = dict.fromkeys(HANDLE_COLUMNS, 0)
+    for idx, row in df.iterrows():
+        for handle_col, (url_col, platform) in HANDLE_COLUMNS.items():
+            if pd.notna(row[url_col]) and pd.isna(row[handle_col]):
+                handle = legacy_handle(row[url_col], platform)
+                if handle:
+                    df.at[idx, handle_col] = handle
+                    filled[handle_col] += 1
+    return filled
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} rows...")
+    base = make_frame(args.rows)
+
+    results = {}
+    for name, fn in (("loop", fill_loop), ("vectorised", fill_handles)):
+        df = base.copy()
+        start = time.perf_counter()
+        filled = fn(df)
+        results[name] = (time.perf_counter() - start, filled, df)
+
+    print(f"\n{'method':<12} {'elapsed':>9} {'cells filled':>13}")
+    for name, (elapsed, filled, _) in results.items():
+        print(f"{name:<12} {elapsed:>8.2f}s {sum(filled.values()):>13,}")
+    loop_s, vec_s = results["loop"][0], results["vectorised"][0]
+    print(f"\nspeedup: {loop_s / vec_s:.0f}x")
+
+    loop_df, vec_df = results["loop"][2], results["vectorised"][2]
+    for handle_col in HANDLE_COLUMNS:
+        a = loop_df[handle_col].fillna("")
+        b = vec_df[handle_col].fillna("")
+        diff = int((a != b).sum())
+        print(f"  {handle_col:<20} differing cells: {diff}")
+
+
+if __name__ == "__main__":
+    main()
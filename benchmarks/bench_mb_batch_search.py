@@ -0,0 +1,140 @@
+"""
+MusicBrainz batch search benchmark: one query per name vs OR'd batches.
+
+Replays the fixture set in benchmarks/fixtures/mb_search_fixture.json (300
+artist names sampled from the rappers and DJ/producer sheets, and a catalogue
+of search hits for them: exact names, accent/case/punctuation variants,
+names only listed as an alias, homonyms and longer names that also match
+the phrase, and ~15% of names with no entry at all) through a local mock of
+/ws/2/artist. The mock evaluates artist:"..." phrases, OR'd or not, against
+the catalogue roughly as the MusicBrainz search server does. Compares:
+  - single: MusicBrainzClient.search_artist per name, as the scripts did
+  - batch:  MusicBrainzClient.search_artists (SEARCH_BATCH names per query,
+            single queries only for the names a batch left unresolved)
+
+and reports requests per resolved artist, which is what the 1 req/s limit
+makes expensive. The MBIDs both modes resolve are compared so a saving
+never hides a different answer.
+
+Usage:
+    python benchmarks/bench_mb_batch_search.py
+    python benchmarks/bench_mb_batch_search.py --batch-size 40
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links import musicbrainz
+from social_links.musicbrainz import SEARCH_BATCH, MusicBrainzClient
+from social_links.rate_limit import configure as configure_rate_limit
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "mb_search_fixture.json")
+
+PHRASE = re.compile(r'artist:"((?:[^"\\]|\\.)*)"')
+
+
+def tokens(text: str) -> list[str]:
+    # Close enough to the search server's analyser: accents folded, lowercased words
+    folded = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return re.findall(r"\w+", folded.lower())
+
+
+def phrase_score(phrase: list[str], field: list[str]) -> float:
+    n = len(phrase)
+    if not n or not any(field[i:i + n] == phrase for i in range(len(field) - n + 1)):
+        return 0.0
+    return 100.0 * n / len(field)
+
+
+class MockSearch(BaseHTTPRequestHandler):
+    """Answers /ws/2/artist?query= from the fixture catalogue and counts requests."""
+
+    artists: list[dict] = []
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            MockSearch.requests += 1
+        params = parse_qs(urlparse(self.path).query)
+        phrases = [tokens(re.sub(r"\\(.)", r"\1", p)) for p in PHRASE.findall(params["query"][0])]
+        limit = int(params.get("limit", ["25"])[0])
+
+        scored = []
+        for artist in self.artists:
+            fields = [tokens(artist["name"])] + [tokens(a["name"]) for a in artist["aliases"]]
+            score = max(phrase_score(p, f) for p in phrases for f in fields)
+            if score:
+                scored.append((score, artist))
+        scored.sort(key=lambda s: -s[0])
+        hits = [{**artist, "score": round(score)} for score, artist in scored[:limit]]
+
+        body = json.dumps({"count": len(scored), "artists": hits}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(client: MusicBrainzClient, queries: list[str], batch_size: int = 0) -> dict:
+    MockSearch.requests = 0
+    if batch_size:
+        found = client.search_artists(queries, batch_size=batch_size)
+    else:
+        found = {name: client.search_artist(name) for name in queries}
+    mbids = {name: hit["id"] for name, hit in found.items() if hit}
+    return {"requests": MockSearch.requests, "mbids": mbids}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--batch-size", type=int, default=SEARCH_BATCH)
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding="utf-8") as f:
+        fixture = json.load(f)
+    MockSearch.artists = fixture["artists"]
+    queries = fixture["queries"]
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockSearch)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    musicbrainz.MB_API_BASE = f"http://127.0.0.1:{server.server_address[1]}/ws/2"
+    # Only requests are being counted here, so the mock is not rate limited
+    configure_rate_limit(musicbrainz.MB_API_BASE, 10_000.0)
+
+    client = MusicBrainzClient()
+    results = {
+        "single": run(client, queries),
+        f"batch of {args.batch_size}": run(client, queries, args.batch_size),
+    }
+    server.shutdown()
+
+    single, batch = results.values()
+    differing = sum(single["mbids"].get(n) != batch["mbids"].get(n) for n in queries)
+
+    print(f"Fixture: {len(queries)} names, {len(fixture['artists'])} catalogue entries\n")
+    print(f"{'mode':<14} {'requests':>9} {'resolved':>9} {'req/resolved':>13}")
+    for name, r in results.items():
+        resolved = len(r["mbids"])
+        print(f"{name:<14} {r['requests']:>9} {resolved:>9} {r['requests'] / max(resolved, 1):>13.3f}")
+    print(f"\nRequests per resolved artist: {batch['requests'] / single['requests']:.1%} of single mode "
+          f"({single['requests'] / max(batch['requests'], 1):.1f}x fewer); "
+          f"{differing} names resolved differently")
+
+
+if __name__ == "__main__":
+    main()
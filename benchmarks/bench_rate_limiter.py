@@ -0,0 +1,120 @@
+"""
+Rate limiter benchmark against a local mock server.
+
+Starts a throwaway HTTP server on localhost that answers every request
+instantly, then drives it with a thread pool the same shape as
+social_links_pipeline.py. Compares:
+  - the old pacing (each worker sleeps 1.1s before each request)
+  - the shared token bucket from social_links.rate_limit
+
+and reports the achieved requests/second against the configured budget.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py
+    python benchmarks/bench_rate_limiter.py --rate 5 --workers 8 --requests 100
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.rate_limit import TokenBucket
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a tiny JSON body and records its arrival time."""
+
+    arrivals: list[float] = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.arrivals.append(time.monotonic())
+        body = b'{"artists": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/ws/2/artist/"
+
+
+def run(url: str, workers: int, n_requests: int, before_request) -> dict:
+    MockHandler.arrivals = []
+    session_local = threading.local()
+
+    def one(_):
+        session = getattr(session_local, "session", None)
+        if session is None:
+            session = session_local.session = requests.Session()
+        before_request()
+        session.get(url, timeout=10)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(n_requests)))
+    elapsed = time.monotonic() - start
+
+    arrivals = sorted(MockHandler.arrivals)
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    # Worst burst: the most requests that landed inside any 1-second window
+    peak = 0
+    j = 0
+    for i in range(len(arrivals)):
+        while arrivals[i] - arrivals[j] >= 1.0:
+            j += 1
+        peak = max(peak, i - j + 1)
+
+    return {
+        "elapsed": elapsed,
+        "rps": n_requests / elapsed,
+        "min_gap": min(gaps) if gaps else 0.0,
+        "peak_1s": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=1.0, help="Budget in req/s")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = start_server()
+
+    results = {}
+    results["fixed sleep 1.1s"] = run(
+        url, args.workers, args.requests, lambda: time.sleep(1.1)
+    )
+    bucket = TokenBucket(args.rate)
+    results["token bucket"] = run(url, args.workers, args.requests, bucket.acquire)
+
+    server.shutdown()
+
+    print(f"Budget: {args.rate:.2f} req/s, {args.workers} workers, {args.requests} requests\n")
+    print(f"{'strategy':<18} {'elapsed':>9} {'req/s':>8} {'min gap':>9} {'peak/1s':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<18} {r['elapsed']:>8.2f}s {r['rps']:>8.2f} "
+            f"{r['min_gap']:>8.3f}s {r['peak_1s']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared building blocks for the social links enrichment scripts.
+
+The pipeline at the repo root imports this package directly. Scripts in
+"Visual Studio Code Fluff/" add the repo root to sys.path before importing.
+"""
@@ -0,0 +1,297 @@
+"""
+Asyncio enrichment engine.
+
+Runs hundreds of artist lookups concurrently on one event loop. Every request
+first takes a token from its host's shared bucket (social_links.rate_limit),
+so MusicBrainz, Spotify and Soundcharts are each driven at their own budget
+at the same time instead of one after another. Time that used to be spent in
+time.sleep() is now spent waiting on other hosts' responses. Lookups that
+request the same URL while it is already in flight share that one response
+(engine.flights.stats() reports how many did).
+
+Requires aiohttp:
+    pip install aiohttp
+
+Usage:
+    async with AsyncEngine() as engine:
+        async for artist, row in engine.map(lookup_musicbrainz, artists):
+            ...
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from social_links.http_client import _retry_after, backoff_delay
+from social_links.musicbrainz import (
+    MB_API_BASE, USER_AGENT, best_search_hit, links_from_artist, search_miss_reason,
+)
+from social_links.names import normalize_name
+from social_links.rate_limit import get_limiter
+from social_links.singleflight import AsyncSingleFlight, request_key
+from social_links.soundcharts import SOUNDCHARTS_BASE_URL
+from social_links.spotify import API_BASE as SPOTIFY_API_BASE, TOKEN_URL as SPOTIFY_TOKEN_URL
+
+logger = logging.getLogger(__name__)
+
+# Artist lookups allowed in flight at once. Requests are still paced per host
+# by the rate limiter; this only bounds memory and open sockets.
+MAX_IN_FLIGHT = 200
+
+# Retries for 429/5xx before giving up on a request
+MAX_RETRIES = 3
+
+
+class AsyncEngine:
+    """One aiohttp session shared by every lookup, with per-host pacing."""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, timeout: float = 15,
+                 spotify_credentials: Optional[tuple[str, str]] = None,
+                 soundcharts_credentials: Optional[tuple[str, str]] = None):
+        self.max_in_flight = max_in_flight
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.spotify_credentials = spotify_credentials
+        self.soundcharts_credentials = soundcharts_credentials
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._spotify_token: Optional[str] = None
+        self._spotify_token_expires_at = 0.0
+        self._spotify_token_lock = asyncio.Lock()
+        self.flights = AsyncSingleFlight("async GET single-flight")
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "AsyncEngine":
+        """Build an engine using whichever provider credentials are set in the environment."""
+        spotify = (os.getenv("SPOTIFY_CLIENT_ID"), os.getenv("SPOTIFY_CLIENT_SECRET"))
+        soundcharts = (os.getenv("SOUNDCHARTS_APP_ID"), os.getenv("SOUNDCHARTS_API_KEY"))
+        return cls(
+            spotify_credentials=spotify if all(spotify) else None,
+            soundcharts_credentials=soundcharts if all(soundcharts) else None,
+            **kwargs,
+        )
+
+    async def __aenter__(self):
+        # Keep-alive connections, a handful per host is plenty at these rates
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=8)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    # -----------------------------------------------------------------------
+    # HTTP
+    # -----------------------------------------------------------------------
+
+    async def get_json(self, url: str, params: Optional[dict] = None,
+                       headers: Optional[dict] = None) -> Optional[dict]:
+        """
+        Rate-limited GET returning parsed JSON, or None on any other non-2xx
+        answer or repeated failure.
+
+        429 and 5xx responses are retried up to MAX_RETRIES times, honouring
+        Retry-After when the server sends one. A request already in flight is
+        joined rather than sent again; the shared result must not be modified.
+        """
+        key = request_key("GET", url, params, headers)
+        return await self.flights.do(key, lambda: self._get_json(url, params, headers))
+
+    async def _get_json(self, url: str, params: Optional[dict],
+                        headers: Optional[dict]) -> Optional[dict]:
+        limiter = get_limiter(urlparse(url).netloc)
+        for attempt in range(MAX_RETRIES + 1):
+            await limiter.acquire_async()
+            try:
+                async with self.session.get(url, params=params, headers=headers) as resp:
+                    if resp.status == 429 or resp.status >= 500:
+                        # Seconds or an HTTP date, as in http_client
+                        delay = _retry_after(resp)
+                        if delay is None:
+                            delay = backoff_delay(attempt)
+                        logger.warning(f"{resp.status} from {url}, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    if not resp.ok:
+                        # 404 and other client errors are answers, not failures to retry
+                        logger.debug(f"{resp.status} from {url}")
+                        return None
+                    return await resp.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                logger.debug(f"Request failed ({url}): {e}")
+                await asyncio.sleep(backoff_delay(attempt))
+        return None
+
+    # -----------------------------------------------------------------------
+    # Scheduling
+    # -----------------------------------------------------------------------
+
+    async def map(self, lookup: Callable[["AsyncEngine", str], Awaitable[dict]],
+                  artists: Iterable[str]) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Run `lookup(engine, artist)` for every artist, at most max_in_flight at a
+        time, yielding (artist, result) in completion order.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def run_one(artist):
+            async with semaphore:
+                try:
+                    return artist, await lookup(self, artist)
+                except Exception as e:
+                    logger.error(f"Lookup failed for {artist}: {e}")
+                    return artist, {}
+
+        tasks = [asyncio.create_task(run_one(a)) for a in artists]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # -----------------------------------------------------------------------
+    # Spotify auth
+    # -----------------------------------------------------------------------
+
+    async def spotify_headers(self) -> Optional[dict]:
+        if not self.spotify_credentials:
+            return None
+        async with self._spotify_token_lock:
+            if time.time() >= self._spotify_token_expires_at:
+                client_id, client_secret = self.spotify_credentials
+                async with self.session.post(
+                    SPOTIFY_TOKEN_URL,
+                    data={"grant_type": "client_credentials"},
+                    auth=aiohttp.BasicAuth(client_id, client_secret),
+                ) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json()
+                self._spotify_token = data["access_token"]
+                # Tokens last 3600s; refresh 5 min early
+                self._spotify_token_expires_at = time.time() + data.get("expires_in", 3600) - 300
+        return {"Authorization": f"Bearer {self._spotify_token}"}
+
+
+# ---------------------------------------------------------------------------
+# Provider lookups
+# ---------------------------------------------------------------------------
+
+async def lookup_musicbrainz(engine: AsyncEngine, artist_name: str,
+                             artist_id: Optional[str] = None, response_cache=None,
+                             negative_cache=None, replica=None) -> dict:
+    """
+    Async equivalent of get_all_social_links: search (unless the MBID is known)
+    + url-rels. If `response_cache` (MBID -> url-rels JSON) holds the artist,
+    the url-rels request is skipped. Artists in `negative_cache` (a
+    NegativeCache) are not searched again, and searches without a match are
+    recorded there. A `replica` (MBReplica) is asked before any of these.
+
+    The replica and the caches are SQLite; their calls run in worker threads
+    (asyncio.to_thread) so a slow query or a busy cache file never stalls the
+    other lookups on the loop. Both are safe to use from several threads.
+    """
+    if artist_id is None:
+        hits = await asyncio.to_thread(replica.search, artist_name, limit=1) if replica is not None else []
+        if hits:
+            data = {"artists": hits}
+        elif (negative_cache is not None
+              and await asyncio.to_thread(negative_cache.__contains__, artist_name)):
+            return {}
+        else:
+            data = await engine.get_json(
+                f"{MB_API_BASE}/artist/",
+                params={"query": f'artist:"{artist_name}"', "fmt": "json", "limit": 1},
+            )
+        hit = best_search_hit(data or {})
+        if hit is None:
+            if data is not None and negative_cache is not None:
+                await asyncio.to_thread(negative_cache.record, artist_name, *search_miss_reason(data))
+            return {}
+        artist_id = hit["id"]
+
+    artist = await asyncio.to_thread(replica.lookup, artist_id) if replica is not None else None
+    if artist is None and response_cache is not None:
+        artist = await asyncio.to_thread(response_cache.get, artist_id)
+    if artist is None:
+        artist = await engine.get_json(
+            f"{MB_API_BASE}/artist/{artist_id}",
+            params={"inc": "url-rels", "fmt": "json"},
+        )
+        if artist is None:
+            return {}
+        if response_cache is not None:
+            await asyncio.to_thread(response_cache.put, artist_id, artist)
+    return {"mbid": artist_id, **links_from_artist(artist)}
+
+
+async def lookup_spotify(engine: AsyncEngine, artist_name: str) -> dict:
+    """Spotify artist search; prefers an exact match on the normalised name."""
+    headers = await engine.spotify_headers()
+    if headers is None:
+        return {}
+    data = await engine.get_json(
+        f"{SPOTIFY_API_BASE}/search",
+        params={"q": artist_name, "type": "artist", "limit": 5},
+        headers=headers,
+    )
+    items = (data or {}).get("artists", {}).get("items", [])
+    if not items:
+        return {}
+    key = normalize_name(artist_name)
+    match = next((i for i in items if normalize_name(i.get("name")) == key), items[0])
+    return {"spotify_id": match.get("id")}
+
+
+async def lookup_soundcharts(engine: AsyncEngine, artist_name: str) -> dict:
+    """Soundcharts search + identifiers, returning {platform_code: url}."""
+    if not engine.soundcharts_credentials:
+        return {}
+    app_id, api_key = engine.soundcharts_credentials
+    headers = {"x-app-id": app_id, "x-api-key": api_key}
+    data = await engine.get_json(
+        f"{SOUNDCHARTS_BASE_URL}/artist/search",
+        params={"q": artist_name, "limit": 5},
+        headers=headers,
+    )
+    items = (data or {}).get("items") or []
+    if not items:
+        return {}
+    key = normalize_name(artist_name)
+    match = next((i for i in items if normalize_name(i.get("name")) == key), items[0])
+    uuid = match.get("uuid")
+    ids = await engine.get_json(f"{SOUNDCHARTS_BASE_URL}/artist/{uuid}/identifiers", headers=headers)
+    result = {"soundcharts_uuid": uuid}
+    for item in (ids or {}).get("items", []):
+        code = item.get("platformCode", "").lower()
+        if code and item.get("url") and (code not in result or item.get("default")):
+            result[code] = item["url"]
+    return result
+
+
+async def lookup_all(engine: AsyncEngine, artist_name: str) -> dict:
+    """
+    Query every configured provider for one artist concurrently.
+
+    Each provider call waits only on its own host's limiter, so a slow
+    MusicBrainz slot never holds up the Spotify or Soundcharts requests.
+    """
+    lookups = [lookup_musicbrainz(engine, artist_name)]
+    if engine.spotify_credentials:
+        lookups.append(lookup_spotify(engine, artist_name))
+    if engine.soundcharts_credentials:
+        lookups.append(lookup_soundcharts(engine, artist_name))
+
+    merged = {}
+    for result in await asyncio.gather(*lookups, return_exceptions=True):
+        if isinstance(result, dict):
+            for key, value in result.items():
+                merged.setdefault(key, value)
+    return merged
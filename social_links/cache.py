@@ -0,0 +1,339 @@
+"""
+Persistent key/value cache backed by SQLite.
+
+Replaces rewriting a whole JSON file on every insert. Puts are buffered in
+memory and written as one batch per commit, and the database runs in WAL
+mode so several threads (or several pipeline processes) can write to the
+same file without corrupting it. A crash loses at most the last uncommitted
+batch.
+
+Values are stored as JSON, so anything json.dump could write before can be
+cached here.
+
+No write transaction stays open between calls: a batch is written and
+committed in one go, so another process on the same file only ever waits
+for that commit, never for a batch to fill up. Caches opened on the same
+file in one process share a single connection.
+
+Usage:
+    cache = SQLiteCache("musicbrainz_cache.sqlite", table="mb_ids")
+    if name in cache:
+        mbid = cache[name]
+    cache[name] = mbid
+    cache.close()
+
+    # Entries that expire after a week, keeping at most 100k of them
+    responses = TTLCache("musicbrainz_cache.sqlite", table="mb_url_rels",
+                         ttl=7 * 86400, max_entries=100_000)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+_MISSING = object()
+
+# Absolute path -> [connection, lock, open caches]
+_connections: dict[str, list] = {}
+_connections_lock = threading.Lock()
+
+
+def _open(path: str) -> tuple[sqlite3.Connection, threading.Lock]:
+    key = os.path.abspath(path)
+    with _connections_lock:
+        entry = _connections.get(key)
+        if entry is None:
+            conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            entry = _connections[key] = [conn, threading.Lock(), 0]
+        entry[2] += 1
+        return entry[0], entry[1]
+
+
+def _release(path: str):
+    key = os.path.abspath(path)
+    with _connections_lock:
+        entry = _connections[key]
+        entry[2] -= 1
+        if entry[2] == 0:
+            entry[0].close()
+            del _connections[key]
+
+
+class SQLiteCache:
+    """Dict-like get/put cache stored in one SQLite table."""
+
+    def __init__(self, path: str, table: str = "cache", batch_size: int = 100,
+                 flush_interval: float = 5.0):
+        self.path = path
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # key -> row to write, or None for a delete, until the next commit
+        self._writes: dict[str, Optional[object]] = {}
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn, self._lock = _open(path)
+        with self._lock:
+            self._create_table()
+            self._conn.commit()
+
+    def _create_table(self):
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.table}" (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+
+    # -----------------------------------------------------------------------
+    # Mapping interface (what the pipeline used on the old dict)
+    # -----------------------------------------------------------------------
+
+    def _lookup(self, key: str):
+        with self._lock:
+            if key in self._writes:
+                value = self._writes[key]
+                return _MISSING if value is None else json.loads(value)
+            row = self._conn.execute(
+                f'SELECT value FROM "{self.table}" WHERE key = ?', (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else _MISSING
+
+    def get(self, key: str, default=None):
+        value = self._lookup(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return default if value is _MISSING else value
+
+    def peek(self, key: str, default=None):
+        """Like get(), but not counted in the hit/miss stats."""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._writes[key] = json.dumps(value)
+            self._pending += 1
+            if (self._pending >= self.batch_size
+                    or time.monotonic() - self._last_commit >= self.flush_interval):
+                self._commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._writes[key] = None
+            self._pending += 1
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        self.put(key, value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._commit()
+            return self._conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+
+    def update(self, items: dict):
+        """Insert many entries in one transaction."""
+        with self._lock:
+            self._writes.update((k, json.dumps(v)) for k, v in items.items())
+            self._commit()
+
+    def stats(self) -> str:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        rate = hits / total if total else 0.0
+        return f"{self.table}: {hits} hits, {misses} misses ({rate:.0%} hit rate)"
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    # -----------------------------------------------------------------------
+    # Durability
+    # -----------------------------------------------------------------------
+
+    def _write_buffered(self):
+        """Write the buffered puts and deletes; the caller commits."""
+        if not self._writes:
+            return
+        self._conn.executemany(
+            f'INSERT OR REPLACE INTO "{self.table}" (key, value) VALUES (?, ?)',
+            [(k, v) for k, v in self._writes.items() if v is not None],
+        )
+        self._conn.executemany(
+            f'DELETE FROM "{self.table}" WHERE key = ?',
+            [(k,) for k, v in self._writes.items() if v is None],
+        )
+        self._writes = {}
+
+    def _commit(self):
+        self._write_buffered()
+        self._conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        """Commit any batched writes."""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._commit()
+        self._conn = None
+        _release(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def import_json(self, json_path: str) -> int:
+        """
+        One-off migration from an old JSON dict file. Only runs when the table
+        is empty, so it is safe to call on every start. Returns rows imported.
+        """
+        if not os.path.exists(json_path) or len(self) > 0:
+            return 0
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        self.update(data)
+        return len(data)
+
+
+class TTLCache(SQLiteCache):
+    """
+    SQLiteCache whose entries expire after `ttl` seconds and which holds at
+    most `max_entries` rows, evicting the least recently used ones first.
+
+    Eviction runs in chunks when the table grows 10% past the limit, so the
+    cost is amortised rather than paid on every put. Hits only note their
+    time in memory; used_at is written with the next commit, so a read never
+    opens a write transaction.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: float = 30 * 86400,
+                 max_entries: int = 200_000, **kwargs):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.expired = 0
+        # key -> last hit time, written to used_at on the next commit
+        self._touched: dict[str, float] = {}
+        super().__init__(path, table, **kwargs)
+        self._size = len(self)
+
+    def _create_table(self):
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.table}" ('
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "{self.table}_used_at" ON "{self.table}" (used_at)'
+        )
+
+    def _lookup(self, key: str):
+        now = time.time()
+        with self._lock:
+            if key in self._writes:
+                row = self._writes[key]
+            else:
+                row = self._conn.execute(
+                    f'SELECT value, stored_at FROM "{self.table}" WHERE key = ?', (key,)
+                ).fetchone()
+            if row is None:
+                return _MISSING
+            if now - row[1] > self.ttl:
+                self._writes[key] = None
+                self._touched.pop(key, None)
+                self._size -= 1
+                self._pending += 1
+                self.expired += 1
+                return _MISSING
+            self._touched[key] = now
+        return json.loads(row[0])
+
+    def put(self, key: str, value):
+        now = time.time()
+        with self._lock:
+            self._writes[key] = (json.dumps(value), now)
+            self._touched.pop(key, None)
+            # Over-counts replacements; _evict() recounts before deleting anything
+            self._size += 1
+            self._pending += 1
+            if self._size > self.max_entries * 1.1:
+                self._evict()
+            if (self._pending >= self.batch_size
+                    or time.monotonic() - self._last_commit >= self.flush_interval):
+                self._commit()
+
+    def update(self, items: dict):
+        for key, value in items.items():
+            self.put(key, value)
+        self.flush()
+
+    def _write_buffered(self):
+        if self._writes:
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO "{self.table}" (key, value, stored_at, used_at) '
+                "VALUES (?, ?, ?, ?)",
+                [(k, v[0], v[1], v[1]) for k, v in self._writes.items() if v is not None],
+            )
+            self._conn.executemany(
+                f'DELETE FROM "{self.table}" WHERE key = ?',
+                [(k,) for k, v in self._writes.items() if v is None],
+            )
+            self._writes = {}
+        if self._touched:
+            self._conn.executemany(
+                f'UPDATE "{self.table}" SET used_at = ? WHERE key = ?',
+                [(t, k) for k, t in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _evict(self):
+        """Drop expired rows, then the least recently used down to max_entries."""
+        self._write_buffered()
+        self._conn.execute(
+            f'DELETE FROM "{self.table}" WHERE stored_at < ?', (time.time() - self.ttl,)
+        )
+        size = self._conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+        excess = size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f'DELETE FROM "{self.table}" WHERE key IN '
+                f'(SELECT key FROM "{self.table}" ORDER BY used_at LIMIT ?)',
+                (excess,),
+            )
+            size -= excess
+        self._size = size
+        self._commit()
+
+    def stats(self) -> str:
+        return f"{super().stats()}, {self.expired} expired"
+
+    def reset_stats(self):
+        super().reset_stats()
+        with self._lock:
+            self.expired = 0
@@ -0,0 +1,121 @@
+"""
+Append-only JSONL checkpoint log.
+
+Replaces re-writing the whole accumulated DataFrame with to_csv every N
+rows. Each processed row is one JSON line; only new lines are written, and
+they are fsynced in batches, so checkpoint cost is proportional to the rows
+added rather than to the size of the file so far.
+
+A crash can only ever leave a partial last line, never a corrupt file.
+Reopening the log drops that torn line and the rows before it are intact.
+
+Usage:
+    with CheckpointLog("rappers_CHECKPOINT.jsonl") as log:
+        done = log.keys("Artist")
+        for artist in artists:
+            if artist in done:
+                continue
+            log.append({"Artist": artist, ...})
+"""
+
+import json
+import os
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+class CheckpointLog:
+    """Append-only log of row dicts, fsynced every `sync_every` appends."""
+
+    def __init__(self, path: str, sync_every: int = 25):
+        self.path = path
+        self.sync_every = sync_every
+        self.records: list[dict] = self._load()
+        self._buffer: list[str] = []
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write at the end of the log
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                good_bytes += len(line)
+        if good_bytes < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_bytes)
+        return records
+
+    # -----------------------------------------------------------------------
+    # Writing
+    # -----------------------------------------------------------------------
+
+    def append(self, record: dict):
+        self.records.append(record)
+        # default=str covers numpy scalars and timestamps that sneak into rows
+        self._buffer.append(json.dumps(record, default=str) + "\n")
+        if len(self._buffer) >= self.sync_every:
+            self.flush()
+
+    def extend(self, records: Iterable[dict]):
+        for record in records:
+            self.append(record)
+        self.flush()
+
+    def flush(self):
+        """Write buffered rows in one call and fsync them."""
+        if not self._buffer:
+            return
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def remove(self):
+        """Close and delete the log once its rows are safely in the final output."""
+        self.close()
+        os.remove(self.path)
+
+    # -----------------------------------------------------------------------
+    # Resume
+    # -----------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def keys(self, field: str) -> set:
+        """Values of `field` across all logged rows, e.g. the processed artists."""
+        return {r[field] for r in self.records if field in r}
+
+    def to_frame(self, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        return pd.DataFrame(self.records, columns=columns)
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        One-off migration from an old whole-file CSV checkpoint. Only runs when
+        the log is empty. Returns rows imported.
+        """
+        if len(self) > 0 or not os.path.exists(csv_path):
+            return 0
+        df = pd.read_csv(csv_path, dtype=str)
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+        self.extend(records)
+        return len(records)
@@ -0,0 +1,67 @@
+"""
+Cross-file artist dedupe for enrichment runs.
+
+The category workbooks overlap: an artist can be both a rapper and a
+DJ/producer, or appear under two spellings. plan_lookups() unions the
+artist rows of every input, and gives each one a lookup key:
+
+    - the normalised name (social_links.names), so spelling variants share
+      one key
+    - rows carrying a Soundcharts uuid take the key of the first row seen
+      with that uuid, so one artist listed under different names is also
+      looked up once; the same name without a uuid joins that key too
+
+Each distinct key is enriched once, through the row chosen as its
+representative, and the result is fanned back out to every (source, name)
+that maps to it.
+
+Usage:
+    from social_links.dedup import plan_lookups
+
+    plan = plan_lookups({"rappers.xlsx": df_rappers, "dj.xlsx": df_dj}, uuid_col="Artist uuid")
+    todo = plan.drop_duplicates("lookup_key")["name"].tolist()
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+from social_links.names import normalize_names
+
+PLAN_COLUMNS = ["source", "name", "name_key", "lookup_key", "representative"]
+
+
+def plan_lookups(frames: dict[str, pd.DataFrame], name_col: str = "Artist",
+                 uuid_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    One row per distinct (source, name_key) across all `frames`.
+
+    `representative` is the name to look `lookup_key` up by: the first name
+    seen for that key, in the order of `frames`. Frames without `uuid_col`
+    are deduped on name alone.
+    """
+    parts = []
+    for source, df in frames.items():
+        uuids = df[uuid_col] if uuid_col and uuid_col in df.columns else pd.Series(None, index=df.index)
+        part = pd.DataFrame({"source": source, "name": df[name_col], "uuid": uuids.astype(object)})
+        parts.append(part[part["name"].notna()])
+    if not parts:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    plan = pd.concat(parts, ignore_index=True)
+
+    plan["name_key"] = normalize_names(plan["name"])
+    plan = plan.drop_duplicates(["source", "name_key"], ignore_index=True)
+
+    plan["lookup_key"] = plan["name_key"]
+    has_uuid = plan["uuid"].notna() & (plan["uuid"].astype(str).str.strip() != "")
+    if has_uuid.any():
+        plan.loc[has_uuid, "lookup_key"] = plan[has_uuid].groupby("uuid")["name_key"].transform("first")
+        # The same name without a uuid (another category's sheet) joins that artist
+        by_name = plan[has_uuid].drop_duplicates("name_key").set_index("name_key")["lookup_key"]
+        no_uuid = ~has_uuid
+        plan.loc[no_uuid, "lookup_key"] = (
+            plan.loc[no_uuid, "name_key"].map(by_name).fillna(plan.loc[no_uuid, "name_key"])
+        )
+
+    plan["representative"] = plan.groupby("lookup_key")["name"].transform("first")
+    return plan[PLAN_COLUMNS]
@@ -0,0 +1,465 @@
+"""
+Constant-memory Excel export.
+
+pandas' to_excel with openpyxl in normal mode builds a Cell object for every
+value in the workbook before saving, which on the ~190-column Soundcharts
+exports means minutes and several GB of RAM. StreamingWorkbook uses
+openpyxl's write-only mode instead: rows are serialised to the sheet XML as
+they are appended, so memory stays flat no matter how many rows go in.
+
+Rows can come from a DataFrame already in memory (frame_rows) or straight
+from a CSV read in chunks (csv_rows), so a sheet can be exported without
+ever loading the whole file.
+
+replace_sheet() refreshes one sheet of an existing workbook by swapping that
+sheet's XML part inside the .xlsx zip. Every other part is copied byte for
+byte, so the other sheets are never parsed or re-serialised. The number
+formats the new sheet's dates need are added to the workbook's styles.xml,
+and parts only the old sheet used (drawings, comments) are dropped with it.
+
+Usage:
+    with StreamingWorkbook("Final_Social Links/rappers_final.xlsx") as wb:
+        wb.add_sheet("All Data", *csv_rows("rappers_enriched.csv"))
+        wb.add_sheet("Social Links", *frame_rows(df_social))
+
+    replace_sheet("Final_Social Links/rappers_final.xlsx", "Social Links", *frame_rows(df))
+"""
+
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterable, Iterator, Optional, Sequence
+from xml.sax.saxutils import escape, unescape
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+# Rows read from a CSV per chunk in csv_rows()
+CHUNK_SIZE = 10_000
+
+# The header look pandas' to_excel gives by default
+_THIN = Side(style="thin")
+DEFAULT_HEADER_STYLE = {
+    "font": Font(bold=True),
+    "border": Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN),
+    "alignment": Alignment(horizontal="center", vertical="top"),
+}
+
+
+def _records(chunk: pd.DataFrame) -> Iterator[tuple]:
+    # Blank cells for NaN, as to_excel writes them
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def frame_rows(df: pd.DataFrame, chunk_size: int = CHUNK_SIZE) -> tuple[list[str], Iterator[tuple]]:
+    """(header, rows) for a DataFrame, converting one chunk at a time."""
+    def rows():
+        for start in range(0, len(df), chunk_size):
+            yield from _records(df.iloc[start:start + chunk_size])
+    return list(df.columns), rows()
+
+
+def csv_rows(path: str, columns: Optional[list[str]] = None,
+             chunk_size: int = CHUNK_SIZE) -> tuple[list[str], Iterator[tuple]]:
+    """(header, rows) streamed from a CSV, optionally keeping only `columns`."""
+    header = columns or list(pd.read_csv(path, nrows=0).columns)
+
+    def rows():
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_size, low_memory=False):
+            yield from _records(chunk[header])
+    return header, rows()
+
+
+def csv_column_widths(path: str, columns: list[str], cap: int = 50,
+                      chunk_size: int = CHUNK_SIZE) -> list[float]:
+    """
+    Auto-fit widths (longest value + 2, capped) for `columns` of a CSV.
+
+    Write-only sheets need widths before the first row is written, so this is
+    a separate pass over just those columns.
+    """
+    widths = [len(str(c)) for c in columns]
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_size, dtype=str):
+        lengths = chunk[columns].apply(lambda s: s.str.len().max()).fillna(0)
+        widths = [max(w, int(n)) for w, n in zip(widths, lengths)]
+    return [min(w + 2, cap) for w in widths]
+
+
+class StreamingWorkbook:
+    """An .xlsx written sheet by sheet in openpyxl write-only mode."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._wb = Workbook(write_only=True)
+
+    def add_sheet(self, name: str, header: Sequence[str], rows: Iterable[Sequence],
+                  header_style: Optional[dict] = None, widths: Optional[list[float]] = None,
+                  freeze_header: bool = False) -> int:
+        """
+        Append a sheet with a styled header row followed by `rows`.
+
+        `header_style` holds openpyxl style attributes (font, fill, border,
+        alignment) and defaults to the pandas look. Returns the number of
+        data rows written.
+        """
+        ws = self._wb.create_sheet(name)
+        if widths:
+            for i, width in enumerate(widths, start=1):
+                ws.column_dimensions[get_column_letter(i)].width = width
+        if freeze_header:
+            ws.freeze_panes = "A2"
+
+        style = DEFAULT_HEADER_STYLE if header_style is None else header_style
+        header_cells = []
+        for title in header:
+            cell = WriteOnlyCell(ws, value=title)
+            for attr, value in style.items():
+                setattr(cell, attr, value)
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        n_rows = 0
+        for row in rows:
+            ws.append(row)
+            n_rows += 1
+        return n_rows
+
+    def save(self):
+        self._wb.save(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # Don't leave a half-written workbook behind if a sheet failed
+        if exc_type is None:
+            self.save()
+
+
+# ---------------------------------------------------------------------------
+# In-place sheet replacement
+# ---------------------------------------------------------------------------
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_SHEET_TYPE = _REL_NS + "/worksheet"
+_SHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+
+
+def _sheet_parts(zf: zipfile.ZipFile) -> dict[str, str]:
+    """Sheet name -> worksheet part path (e.g. 'xl/worksheets/sheet2.xml')."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for rel in rels.iter(f"{{{_PKG_REL_NS}}}Relationship"):
+        target = rel.get("Target")
+        # Targets are relative to xl/ unless absolute
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+        targets[rel.get("Id")] = path
+    return {
+        sheet.get("name"): targets[sheet.get(f"{{{_REL_NS}}}id")]
+        for sheet in workbook.iter(f"{{{_MAIN_NS}}}sheet")
+    }
+
+
+def sheet_names(path: str) -> list[str]:
+    """Sheet names in workbook order, read from workbook.xml only."""
+    with zipfile.ZipFile(path) as zf:
+        return list(_sheet_parts(zf))
+
+
+def _render_sheet(header: Sequence[str], rows: Iterable[Sequence],
+                  tmp_dir: str) -> tuple[str, bytes, int]:
+    """
+    Write the sheet on its own through write-only openpyxl; returns (xml
+    path, that workbook's styles.xml, rows).
+    """
+    single = os.path.join(tmp_dir, "sheet.xlsx")
+    wb = StreamingWorkbook(single)
+    # Unstyled header, so the only styles used are the dates' number formats
+    n_rows = wb.add_sheet("Sheet", header, rows, header_style={})
+    wb.save()
+    with zipfile.ZipFile(single) as zf:
+        xml_path = os.path.join(tmp_dir, "sheet.xml")
+        with zf.open("xl/worksheets/sheet1.xml") as src, open(xml_path, "wb") as dst:
+            while chunk := src.read(1 << 20):
+                dst.write(chunk)
+        styles = zf.read("xl/styles.xml")
+    return xml_path, styles, n_rows
+
+
+# ---------------------------------------------------------------------------
+# Styles of the rendered sheet
+# ---------------------------------------------------------------------------
+
+# Cell style attribute of a <c> element; cell text never contains "<c "
+_CELL_STYLE = re.compile(rb'(<c r="[A-Z]+\d+") s="(\d+)"')
+
+# Number format ids below this are built into Excel
+_FIRST_CUSTOM_NUMFMT = 164
+
+
+def _cell_number_formats(styles: bytes) -> list[tuple[int, Optional[str]]]:
+    """(numFmtId, formatCode, None for built-ins) per cellXfs entry of a styles.xml."""
+    root = ET.fromstring(styles)
+    codes = {int(f.get("numFmtId")): f.get("formatCode") for f in root.iter(f"{{{_MAIN_NS}}}numFmt")}
+    cell_xfs = root.find(f"{{{_MAIN_NS}}}cellXfs")
+    formats = []
+    for xf in cell_xfs if cell_xfs is not None else []:
+        fmt_id = int(xf.get("numFmtId", 0))
+        formats.append((fmt_id, codes.get(fmt_id)))
+    return formats
+
+
+def _add_number_formats(styles: str, formats: list[tuple[int, Optional[str]]]) -> tuple[str, dict[int, int]]:
+    """
+    Give each rendered format (index 1 on; 0 is the default style) a cellXfs
+    entry in a workbook's styles.xml, reusing one added by an earlier call
+    and adding custom numFmts the workbook lacks. Returns the new styles.xml
+    and rendered style index -> workbook index.
+    """
+    prefix = re.search(r"<(\w+:)?cellXfs\b", styles).group(1) or ""
+    cell_xfs = re.search(rf"<{prefix}cellXfs\b[^>]*>(.*?)</{prefix}cellXfs>", styles, re.S)
+    xfs = [m.start() for m in re.finditer(rf"<{prefix}xf\b", cell_xfs.group(1))]
+    n_xfs = len(xfs)
+    existing = {
+        unescape(code, {"&quot;": '"'}): int(fmt_id)
+        for fmt_id, code in re.findall(r'<(?:\w+:)?numFmt numFmtId="(\d+)" formatCode="([^"]*)"', styles)
+    }
+    next_id = max([_FIRST_CUSTOM_NUMFMT - 1, *existing.values()]) + 1
+
+    new_fmts, new_xfs, mapping = [], [], {0: 0}
+    for index, (fmt_id, code) in enumerate(formats[1:], start=1):
+        if code is not None:
+            if code not in existing:
+                existing[code] = next_id
+                quoted = escape(code, {'"': "&quot;"})
+                new_fmts.append(f'<{prefix}numFmt numFmtId="{next_id}" formatCode="{quoted}"/>')
+                next_id += 1
+            fmt_id = existing[code]
+        xf = (f'<{prefix}xf numFmtId="{fmt_id}" fontId="0" fillId="0" borderId="0" '
+              f'xfId="0" applyNumberFormat="1"/>')
+        same = [i for i, start in enumerate(xfs) if cell_xfs.group(1).startswith(xf, start)]
+        if same:
+            mapping[index] = same[0]
+        elif xf in new_xfs:
+            mapping[index] = n_xfs + new_xfs.index(xf)
+        else:
+            new_xfs.append(xf)
+            mapping[index] = n_xfs + len(new_xfs) - 1
+
+    body = cell_xfs.group(1) + "".join(new_xfs)
+    styles = (styles[:cell_xfs.start()]
+              + f'<{prefix}cellXfs count="{n_xfs + len(new_xfs)}">{body}</{prefix}cellXfs>'
+              + styles[cell_xfs.end():])
+    if new_fmts:
+        numfmts = re.search(rf"<{prefix}numFmts\b[^>]*?(/>|>(.*?)</{prefix}numFmts>)", styles, re.S)
+        if numfmts is not None:
+            old = numfmts.group(2) or ""
+            n_fmts = len(re.findall(rf"<{prefix}numFmt\b", old)) + len(new_fmts)
+            styles = (styles[:numfmts.start()]
+                      + f'<{prefix}numFmts count="{n_fmts}">{old}{"".join(new_fmts)}</{prefix}numFmts>'
+                      + styles[numfmts.end():])
+        else:
+            # numFmts is the first child of styleSheet
+            head = re.search(rf"<{prefix}styleSheet\b[^>]*>", styles)
+            styles = (styles[:head.end()]
+                      + f'<{prefix}numFmts count="{len(new_fmts)}">{"".join(new_fmts)}</{prefix}numFmts>'
+                      + styles[head.end():])
+    return styles, mapping
+
+
+def _restyle_sheet(xml_path: str, mapping: dict[int, int]) -> str:
+    """Rewrite the s= of every cell through `mapping`, streaming; returns the new path."""
+    out_path = xml_path + ".restyled"
+
+    def remap(m):
+        return m.group(1) + b' s="%d"' % mapping[int(m.group(2))]
+
+    with open(xml_path, "rb") as src, open(out_path, "wb") as dst:
+        tail = b""
+        while chunk := src.read(1 << 20):
+            data = tail + chunk
+            # Only rewrite up to the last complete tag; the rest waits for more
+            cut = data.rfind(b">") + 1
+            dst.write(_CELL_STYLE.sub(remap, data[:cut]))
+            tail = data[cut:]
+        dst.write(_CELL_STYLE.sub(remap, tail))
+    return out_path
+
+
+# ---------------------------------------------------------------------------
+# Parts the replaced sheet leaves behind
+# ---------------------------------------------------------------------------
+
+def _rels_part(part: str) -> str:
+    return posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+
+
+def _rels_source(rels_part: str) -> str:
+    """The part a .rels part belongs to ('' for the package's own _rels/.rels)."""
+    rels_dir, name = posixpath.split(rels_part)
+    return posixpath.join(posixpath.dirname(rels_dir), name[:-len(".rels")]).lstrip("/")
+
+
+def _rel_targets(zf: zipfile.ZipFile, part: str) -> set[str]:
+    """Package parts `part` links to through its .rels; external links are skipped."""
+    rels_part = _rels_part(part)
+    if rels_part not in zf.namelist():
+        return set()
+    targets = set()
+    for rel in ET.fromstring(zf.read(rels_part)).iter(f"{{{_PKG_REL_NS}}}Relationship"):
+        target = rel.get("Target") or ""
+        if rel.get("TargetMode") == "External" or not target:
+            continue
+        targets.add(target.lstrip("/") if target.startswith("/")
+                    else posixpath.normpath(posixpath.join(posixpath.dirname(part), target)))
+    return targets
+
+
+def _orphaned_parts(zf: zipfile.ZipFile, part: str) -> set[str]:
+    """
+    Parts reachable only through `part`'s relationships (its drawings,
+    comments, VML, tables and what those link to), which go away with it.
+    """
+    def reachable(starts: set[str]) -> set[str]:
+        seen, todo = set(), list(starts)
+        while todo:
+            target = todo.pop()
+            if target not in seen:
+                seen.add(target)
+                todo.extend(_rel_targets(zf, target))
+        return seen
+
+    candidates = reachable(_rel_targets(zf, part)) - {part}
+    sources = {_rels_source(name) for name in zf.namelist() if name.endswith(".rels")}
+    while True:
+        # Anything still linked from a part that stays, stays too
+        kept = set()
+        for source in sources - candidates - {part}:
+            kept |= _rel_targets(zf, source) & candidates
+        if not kept:
+            return candidates
+        candidates -= reachable(kept)
+
+
+def _drop_overrides(replaced: dict[str, bytes], zf: zipfile.ZipFile, parts: set[str]):
+    xml = replaced.get("[Content_Types].xml") or zf.read("[Content_Types].xml")
+    for part in parts:
+        xml = re.sub(rb'<Override [^>]*PartName="/%s"[^>]*/>' % re.escape(part.encode()), b"", xml)
+    replaced["[Content_Types].xml"] = xml
+
+
+def _add_sheet_entries(zf: zipfile.ZipFile, sheet_name: str, part: str) -> dict[str, bytes]:
+    """Rewritten workbook.xml, workbook.xml.rels and [Content_Types].xml for a new sheet."""
+    workbook = zf.read("xl/workbook.xml").decode("utf-8")
+    rels = zf.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+    content_types = zf.read("[Content_Types].xml").decode("utf-8")
+
+    rel_ids = {int(n) for n in re.findall(r'Id="rId(\d+)"', rels)}
+    rel_id = f"rId{max(rel_ids, default=0) + 1}"
+    sheet_ids = [int(n) for n in re.findall(r'sheetId="(\d+)"', workbook)]
+    prefix = re.search(rf'xmlns:(\w+)="{re.escape(_REL_NS)}"', workbook).group(1)
+
+    name = sheet_name.replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;")
+    workbook = workbook.replace(
+        "</sheets>",
+        f'<sheet name="{name}" sheetId="{max(sheet_ids, default=0) + 1}" {prefix}:id="{rel_id}"/></sheets>',
+    )
+    rels = rels.replace(
+        "</Relationships>",
+        f'<Relationship Id="{rel_id}" Type="{_SHEET_TYPE}" '
+        f'Target="/{part}"/></Relationships>',
+    )
+    content_types = content_types.replace(
+        "</Types>",
+        f'<Override PartName="/{part}" ContentType="{_SHEET_CONTENT_TYPE}"/></Types>',
+    )
+    return {
+        "xl/workbook.xml": workbook.encode("utf-8"),
+        "xl/_rels/workbook.xml.rels": rels.encode("utf-8"),
+        "[Content_Types].xml": content_types.encode("utf-8"),
+    }
+
+
+def _drop_calc_chain(replaced: dict[str, bytes], zf: zipfile.ZipFile):
+    # calcChain.xml may list formula cells of the old sheet; Excel rebuilds it
+    for name, pattern in (
+        ("xl/_rels/workbook.xml.rels", r"<Relationship [^>]*calcChain[^>]*/>"),
+        ("[Content_Types].xml", r"<Override [^>]*calcChain[^>]*/>"),
+    ):
+        xml = replaced.get(name) or zf.read(name)
+        replaced[name] = re.sub(pattern.encode(), b"", xml)
+
+
+def replace_sheet(path: str, sheet_name: str, header: Sequence[str],
+                  rows: Iterable[Sequence]) -> int:
+    """
+    Replace (or add) one sheet of an existing .xlsx without loading the rest.
+
+    The new sheet is rendered on its own, then the package is copied into a
+    temp file with only that sheet's XML swapped, and moved over `path`.
+    The sheet keeps its position and tab; its header row is unstyled, and
+    its date cells use number formats added to the workbook's styles.xml.
+    Drawings, comments and other parts only the old sheet used are removed.
+    Returns the number of data rows written.
+    """
+    out_dir = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xml_path, rendered_styles, n_rows = _render_sheet(header, rows, tmp_dir)
+        formats = _cell_number_formats(rendered_styles)
+
+        with zipfile.ZipFile(path) as zf:
+            parts = _sheet_parts(zf)
+            replaced: dict[str, bytes] = {}
+            if sheet_name in parts:
+                part = parts[sheet_name]
+            else:
+                n = len(parts) + 1
+                while f"xl/worksheets/sheet{n}.xml" in zf.namelist():
+                    n += 1
+                part = f"xl/worksheets/sheet{n}.xml"
+                replaced.update(_add_sheet_entries(zf, sheet_name, part))
+            skip = {part, _rels_part(part), "xl/calcChain.xml"}
+            if "xl/calcChain.xml" in zf.namelist():
+                _drop_calc_chain(replaced, zf)
+            if sheet_name in parts:
+                orphans = _orphaned_parts(zf, part)
+                if orphans:
+                    skip |= orphans | {_rels_part(p) for p in orphans}
+                    _drop_overrides(replaced, zf, orphans)
+            if len(formats) > 1:
+                # Rendered date cells point at openpyxl's own styles.xml
+                styles, mapping = _add_number_formats(zf.read("xl/styles.xml").decode("utf-8"), formats)
+                replaced["xl/styles.xml"] = styles.encode("utf-8")
+                xml_path = _restyle_sheet(xml_path, mapping)
+
+            fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=out_dir)
+            os.close(fd)
+            try:
+                with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+                    for item in zf.infolist():
+                        if item.filename in skip:
+                            continue
+                        if item.filename in replaced:
+                            out.writestr(item, replaced.pop(item.filename))
+                        else:
+                            # Streamed through as-is; the XML is never parsed
+                            with zf.open(item) as src, out.open(item, "w") as dst:
+                                while chunk := src.read(1 << 20):
+                                    dst.write(chunk)
+                    out.write(xml_path, part)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    return n_rows
@@ -0,0 +1,160 @@
+"""
+Parsed-file cache for pd.read_excel / pd.read_csv.
+
+Drop-in replacements for the two pandas readers. The first read of a file
+parses it as usual and saves the DataFrame as an uncompressed Arrow IPC
+file; later reads memory-map that file, which takes milliseconds instead of
+re-parsing the workbook.
+
+Cache entries are keyed by the SHA-256 of the source file plus the reader
+arguments (sheet, dtype, usecols, ...), so editing the source simply misses
+and re-parses, and the stale entries for that file are deleted. To avoid
+hashing big files on every call, the hash is remembered against the file's
+size and mtime and only recomputed when those change.
+
+Frames Arrow can't hold (e.g. object columns mixing ints and strings) and
+non-DataFrame results (sheet_name=None / lists) are pickled instead.
+
+Usage:
+    from social_links.file_cache import read_csv, read_excel
+
+    df = read_excel("Final_Social Links/female_singers_final.xlsx", sheet_name="Social Links")
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+
+import pandas as pd
+import pyarrow as pa
+
+from social_links.cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+# Next to the social_links package, so every script shares one cache
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".parsed_cache")
+
+_index = None
+
+
+def _get_index() -> SQLiteCache:
+    # Absolute path -> {"size", "mtime_ns", "sha256", "entries"}
+    global _index
+    if _index is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _index = SQLiteCache(os.path.join(CACHE_DIR, "index.sqlite"), table="files", batch_size=1)
+    return _index
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file, reused while its size and mtime are unchanged."""
+    index = _get_index()
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    meta = index.get(key)
+    if meta and meta["size"] == st.st_size and meta["mtime_ns"] == st.st_mtime_ns:
+        return meta["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    sha = h.hexdigest()
+
+    # Content changed: drop the entries parsed from the old version
+    old_entries = meta.get("entries", []) if meta else []
+    if meta and meta["sha256"] != sha:
+        for entry in old_entries:
+            for ext in (".arrow", ".pkl"):
+                _remove(os.path.join(CACHE_DIR, entry + ext))
+        old_entries = []
+    index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha, "entries": old_entries}
+    return sha
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _entry_name(reader: str, path: str, kwargs: dict) -> str:
+    args = repr(sorted(kwargs.items()))
+    args_hash = hashlib.sha256(f"{reader}:{args}".encode()).hexdigest()[:16]
+    return f"{file_hash(path)[:32]}-{args_hash}"
+
+
+def _load(entry: str):
+    arrow_path = os.path.join(CACHE_DIR, entry + ".arrow")
+    if os.path.exists(arrow_path):
+        with pa.memory_map(arrow_path) as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    pkl_path = os.path.join(CACHE_DIR, entry + ".pkl")
+    if os.path.exists(pkl_path):
+        with open(pkl_path, "rb") as f:
+            return pickle.load(f)
+    return None
+
+
+def _store(entry: str, result):
+    if isinstance(result, pd.DataFrame):
+        try:
+            table = pa.Table.from_pandas(result)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.debug(f"Caching {entry} as pickle, Arrow can't hold it: {e}")
+            table = None
+        if table is not None:
+            tmp = os.path.join(CACHE_DIR, entry + ".arrow.tmp")
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, os.path.join(CACHE_DIR, entry + ".arrow"))
+            return
+    tmp = os.path.join(CACHE_DIR, entry + ".pkl.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, os.path.join(CACHE_DIR, entry + ".pkl"))
+
+
+def _cached(reader: str, path, **kwargs):
+    # Buffers and URLs can't be hashed up front; read them directly
+    if not isinstance(path, (str, os.PathLike)) or not os.path.isfile(path):
+        return getattr(pd, reader)(path, **kwargs)
+
+    entry = _entry_name(reader, path, kwargs)
+    result = _load(entry)
+    if result is not None:
+        return result
+
+    result = getattr(pd, reader)(path, **kwargs)
+    _store(entry, result)
+    index = _get_index()
+    key = os.path.abspath(path)
+    meta = index.get(key)
+    if entry not in meta["entries"]:
+        meta["entries"].append(entry)
+        index[key] = meta
+    return result
+
+
+def read_excel(path, sheet_name=0, **kwargs):
+    """pd.read_excel, served from the parsed-file cache when the file is unchanged."""
+    return _cached("read_excel", path, sheet_name=sheet_name, **kwargs)
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv, served from the parsed-file cache when the file is unchanged."""
+    return _cached("read_csv", path, **kwargs)
+
+
+def clear():
+    """Delete every cached entry (the sources are untouched)."""
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            _remove(os.path.join(CACHE_DIR, name))
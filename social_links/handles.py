@@ -0,0 +1,345 @@
+"""
+Social URL classification and column-wise URL -> handle extraction.
+
+classify_url() parses a link once, looks its host up in HOST_PLATFORMS
+(dropping subdomains such as www., m. or on. until one matches) and runs
+that platform's precompiled path pattern to get the handle. The result is
+(platform, canonical_url, handle); canonical_url is the platform's profile
+URL for the handle, or the link as given when it has no handle (posts,
+videos, short links). classify_urls() does the same for a whole Series with
+a handful of vectorised str operations, and every relation parser
+(links_from_relations in social_links.musicbrainz) goes through here, so
+coverage such as x.com or youtu.be is the same everywhere.
+
+fill_handles() derives each handle column from its URL column for just the
+rows that are missing a handle, then writes them back with one mask.
+
+YouTube keeps the identifiers the scripts have always stored:
+    /channel/UCxxxx -> UCxxxx      /@name   -> @name
+    /c/name         -> c/name      /user/name -> user/name
+
+guess_social_links() is the column-wise version of the construct_*_url
+helpers: it cleans each distinct artist name into a likely handle once,
+builds every platform URL from it with string ops and fills only the empty
+cells, returning the fill counts.
+
+Usage:
+    from social_links.handles import classify_url, fill_handles, guess_social_links
+
+    classify_url("https://mobile.twitter.com/@someone/")
+    # ClassifiedURL(platform='twitter', canonical_url='https://twitter.com/someone', handle='someone')
+    filled = fill_handles(df)   # {"instagram_handle": 812, ...}
+    guessed = guess_social_links(df, strip_prefix=r"^dj\\s+")
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+# Registered host -> platform. Subdomains are dropped one label at a time
+# until a host matches, so www./m./mobile./music. need no entries of their own.
+HOST_PLATFORMS = {
+    "instagram.com": "instagram",
+    "instagr.am": "instagram",
+    "tiktok.com": "tiktok",
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "soundcloud.com": "soundcloud",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "facebook.com": "facebook",
+    "fb.com": "facebook",
+}
+
+# Short-link hosts: the path is a redirect token, never a handle
+SHORT_LINK_HOSTS = {"on.soundcloud.com", "vm.tiktok.com", "vt.tiktok.com", "youtu.be", "fb.me"}
+
+# Longest chain of subdomains tried before giving up, e.g. m.web.facebook.com
+_MAX_SUBDOMAINS = 3
+
+# Scheme, credentials and port are skipped; query and fragment never reach the path
+URL_PARTS = re.compile(
+    r"^\s*(?:[A-Za-z][A-Za-z0-9+.-]*:)?(?://)?(?:[^@/?#\s]*@)?"
+    r"(?P<host>[^/:?#\s]+)(?::\d*)?(?P<path>/[^?#\s]*)?"
+)
+
+# Platform -> handle at the start of the URL path. One capture group each, except
+# YouTube whose four URL forms map to different stored identifiers.
+PATH_PATTERNS = {
+    "instagram": re.compile(
+        r"^/(?!(?:p|reels?|explore|stories|tv|accounts)(?:/|$))([A-Za-z0-9_.]+)", re.IGNORECASE),
+    "tiktok": re.compile(r"^/@([A-Za-z0-9_.]+)"),
+    "youtube": re.compile(
+        r"^/(?:channel/(?P<channel>[A-Za-z0-9_-]+)"
+        r"|@(?P<handle>[A-Za-z0-9_.-]+)"
+        r"|c/(?P<custom>[A-Za-z0-9_-]+)"
+        r"|user/(?P<user>[A-Za-z0-9_-]+))"
+    ),
+    "soundcloud": re.compile(
+        r"^/(?!(?:discover|search|stream|you|pages|tags|charts)(?:/|$))([A-Za-z0-9_-]+)", re.IGNORECASE),
+    "twitter": re.compile(
+        r"^/@?(?!(?:intent|share|home|i|search|hashtag)(?:/|$))([A-Za-z0-9_]+)", re.IGNORECASE),
+    "facebook": re.compile(
+        r"^/(?!(?:profile\.php|pages|groups|events|watch|sharer)(?:/|$))([A-Za-z0-9.]+)", re.IGNORECASE),
+}
+
+# Platform -> canonical profile URL prefix; the stored handle is appended
+PROFILE_URLS = {
+    "instagram": "https://www.instagram.com/",
+    "tiktok": "https://www.tiktok.com/@",
+    "youtube": "https://www.youtube.com/",
+    "soundcloud": "https://soundcloud.com/",
+    "twitter": "https://twitter.com/",
+    "facebook": "https://www.facebook.com/",
+}
+
+# Platform -> (URL column, handle column) in the social schema
+PLATFORM_COLUMNS = {
+    "instagram": ("instagram_url", "instagram_handle"),
+    "tiktok": ("tiktok_url", "tiktok_handle"),
+    "youtube": ("youtube_url", "youtube_channel_id"),
+    "soundcloud": ("soundcloud_url", "soundcloud_handle"),
+    "twitter": ("twitter_url", "twitter_handle"),
+    "facebook": ("facebook_url", None),
+}
+
+# handle column -> (URL column, platform)
+HANDLE_COLUMNS = {
+    "instagram_handle": ("instagram_url", "instagram"),
+    "tiktok_handle": ("tiktok_url", "tiktok"),
+    "youtube_channel_id": ("youtube_url", "youtube"),
+    "soundcloud_handle": ("soundcloud_url", "soundcloud"),
+    "twitter_handle": ("twitter_url", "twitter"),
+}
+
+
+class ClassifiedURL(NamedTuple):
+    platform: str
+    canonical_url: str
+    handle: Optional[str]
+
+
+# ---------------------------------------------------------------------------
+# Single URL
+# ---------------------------------------------------------------------------
+
+def _host_platform(host: str) -> Optional[str]:
+    host = host.lower()
+    for _ in range(_MAX_SUBDOMAINS + 1):
+        platform = HOST_PLATFORMS.get(host)
+        if platform or "." not in host:
+            return platform
+        host = host.partition(".")[2]
+    return None
+
+
+def _youtube_id(match: re.Match) -> str:
+    if match["channel"]:
+        return match["channel"]
+    if match["handle"]:
+        return f"@{match['handle']}"
+    if match["custom"]:
+        return f"c/{match['custom']}"
+    return f"user/{match['user']}"
+
+
+def _profile_url(platform: str, handle: str) -> str:
+    # Bare YouTube channel IDs live under /channel/
+    if platform == "youtube" and not handle.startswith(("@", "c/", "user/")):
+        handle = f"channel/{handle}"
+    return PROFILE_URLS[platform] + handle
+
+
+def classify_url(url) -> Optional[ClassifiedURL]:
+    """(platform, canonical_url, handle) for one link; None if not a known social host."""
+    if not isinstance(url, str):
+        return None
+    parts = URL_PARTS.match(url)
+    if not parts:
+        return None
+    platform = _host_platform(parts["host"])
+    if platform is None:
+        return None
+    match = None
+    if parts["host"].lower() not in SHORT_LINK_HOSTS:
+        match = PATH_PATTERNS[platform].match(parts["path"] or "/")
+    if not match:
+        return ClassifiedURL(platform, url.strip(), None)
+    handle = _youtube_id(match) if platform == "youtube" else match.group(1)
+    return ClassifiedURL(platform, _profile_url(platform, handle), handle)
+
+
+def extract_youtube_channel_id(url) -> Optional[str]:
+    """Channel ID (or @handle / c/name / user/name) from one YouTube URL."""
+    return extract_handle(url, "youtube")
+
+
+def extract_handle(url, platform: str) -> Optional[str]:
+    """Handle from one profile URL; None unless it is a `platform` profile link."""
+    classified = classify_url(url)
+    if classified is None or classified.platform != platform:
+        return None
+    return classified.handle
+
+
+# ---------------------------------------------------------------------------
+# Whole columns
+# ---------------------------------------------------------------------------
+
+def classify_urls(urls: pd.Series) -> pd.DataFrame:
+    """
+    classify_url over a Series: a frame with platform, canonical_url and
+    handle columns on the same index, NaN where nothing applies.
+
+    Hosts are matched with dict lookups and each platform's path pattern runs
+    once over that platform's rows.
+    """
+    text = urls.astype(object).where(urls.notna(), "").astype(str)
+    parts = text.str.extract(URL_PARTS)
+    host = parts["host"].str.lower()
+    platform = host.map(HOST_PLATFORMS)
+    for _ in range(_MAX_SUBDOMAINS):
+        unmatched = platform.isna() & host.str.contains(".", regex=False).fillna(False)
+        if not unmatched.any():
+            break
+        host = host.where(~unmatched, host.str.partition(".")[2])
+        platform = platform.fillna(host.where(unmatched).map(HOST_PLATFORMS))
+
+    out = pd.DataFrame({
+        "platform": platform.astype(object),
+        "canonical_url": text.str.strip().where(platform.notna()).astype(object),
+        "handle": pd.Series(None, index=urls.index, dtype=object),
+    })
+    paths = parts["path"].fillna("/").where(~parts["host"].str.lower().isin(SHORT_LINK_HOSTS), "")
+    for name in platform.dropna().unique():
+        rows = platform == name
+        found = paths[rows].str.extract(PATH_PATTERNS[name])
+        if name == "youtube":
+            # String + NaN stays NaN, so each form only fills rows none of the earlier ones matched
+            handle = (found["channel"]
+                      .fillna("@" + found["handle"])
+                      .fillna("c/" + found["custom"])
+                      .fillna("user/" + found["user"]))
+            canonical = PROFILE_URLS[name] + handle.where(
+                handle.str.startswith(("@", "c/", "user/")), "channel/" + handle)
+        else:
+            handle = found[0]
+            canonical = PROFILE_URLS[name] + handle
+        hit = handle.notna()
+        out.loc[handle.index[hit], "handle"] = handle[hit]
+        out.loc[handle.index[hit], "canonical_url"] = canonical[hit]
+    return out
+
+
+def youtube_channel_ids(urls: pd.Series) -> pd.Series:
+    """extract_youtube_channel_id over a Series; NaN where nothing matches."""
+    return extract_handles(urls, "youtube")
+
+
+def extract_handles(urls: pd.Series, platform: str) -> pd.Series:
+    """extract_handle over a Series; NaN where nothing matches."""
+    classified = classify_urls(urls)
+    return classified["handle"].where(classified["platform"] == platform)
+
+
+def fill_handles(df: pd.DataFrame, columns: Optional[dict] = None,
+                 overwrite: bool = False) -> dict[str, int]:
+    """
+    Fill each handle column from its URL column, in place.
+
+    `columns` maps handle column -> (URL column, platform) and defaults to
+    HANDLE_COLUMNS; pairs missing from `df` are skipped. Only empty handle
+    cells are filled unless `overwrite` is set. Returns cells filled per column.
+    """
+    filled = {}
+    for handle_col, (url_col, platform) in (columns or HANDLE_COLUMNS).items():
+        if url_col not in df.columns:
+            continue
+        if handle_col not in df.columns:
+            df[handle_col] = None
+        todo = df[url_col].notna()
+        if not overwrite:
+            todo &= df[handle_col].isna()
+        # Rows not to fill become empty strings, which never match
+        extracted = extract_handles(df[url_col].where(todo), platform)
+        hit = extracted.notna()
+        if hit.any():
+            # mask() upcasts all-NaN float columns instead of raising on strings
+            df[handle_col] = df[handle_col].mask(hit, extracted)
+        filled[handle_col] = int(hit.sum())
+    return filled
+
+
+# ---------------------------------------------------------------------------
+# Guessing from artist names
+# ---------------------------------------------------------------------------
+
+# Profile URL prefix per guessed column; the handle is appended as-is
+GUESS_URL_PREFIXES = {
+    "instagram_url": "https://www.instagram.com/",
+    "tiktok_url": "https://www.tiktok.com/@",
+    "youtube_url": "https://www.youtube.com/@",
+    "twitter_url": "https://twitter.com/",
+    "soundcloud_url": "https://soundcloud.com/",
+    "facebook_url": "https://www.facebook.com/",
+}
+
+
+def clean_handles(names: pd.Series, strip_prefix: Optional[str] = None) -> pd.Series:
+    """
+    Likely social handle per artist name: lowercased, `strip_prefix` (a regex
+    such as r"^dj\\s+") removed, then anything outside [a-z0-9_] dropped.
+
+    Each distinct name is cleaned once and the result mapped back, so a
+    frame full of repeated names costs one regex pass per unique name.
+    NaN where nothing is left.
+    """
+    unique = pd.Series(names.dropna().unique(), dtype=object)
+    clean = unique.astype(str).str.lower()
+    if strip_prefix:
+        clean = clean.str.replace(strip_prefix, "", regex=True)
+    clean = clean.str.replace(r"[^a-z0-9_]", "", regex=True)
+    clean = clean.where(clean != "")
+    return names.map(dict(zip(unique, clean))).astype(object)
+
+
+def guess_social_links(df: pd.DataFrame, name_col: str = "Artist",
+                       strip_prefix: Optional[str] = None) -> dict[str, int]:
+    """
+    Fill missing profile URLs (and their handle columns) with guesses built
+    from the artist name, in place.
+
+    Instagram is guessed from the cleaned name and its handle then seeds
+    TikTok, YouTube and Twitter; SoundCloud and Facebook always use the
+    cleaned name. Only empty URL cells are filled, and a handle is only set
+    where it was empty (Instagram's always follows its new URL). Returns
+    cells filled per column.
+    """
+    name_handle = clean_handles(df[name_col], strip_prefix)
+    stats = {}
+
+    def fill(col: str, todo: pd.Series, values: pd.Series):
+        todo = todo & values.notna()
+        df[col] = df[col].mask(todo, values)
+        stats[col] = int(todo.sum())
+
+    missing = {col: df[col].isna() for col in GUESS_URL_PREFIXES}
+
+    fill("instagram_url", missing["instagram_url"], GUESS_URL_PREFIXES["instagram_url"] + name_handle)
+    fill("instagram_handle", missing["instagram_url"], name_handle)
+
+    instagram = df["instagram_handle"]
+    seed = instagram.where(instagram.notna() & (instagram != ""), name_handle)
+    for url_col, handle_col, base, handle_prefix in (
+        ("tiktok_url", "tiktok_handle", seed, ""),
+        ("youtube_url", "youtube_channel_id", seed, "@"),
+        ("twitter_url", "twitter_handle", seed, ""),
+        ("soundcloud_url", "soundcloud_handle", name_handle, ""),
+    ):
+        handle_todo = missing[url_col] & df[handle_col].isna()
+        fill(url_col, missing[url_col], GUESS_URL_PREFIXES[url_col] + base)
+        fill(handle_col, handle_todo, handle_prefix + base)
+
+    fill("facebook_url", missing["facebook_url"], GUESS_URL_PREFIXES["facebook_url"] + name_handle)
+    return stats
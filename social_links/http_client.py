@@ -0,0 +1,147 @@
+"""
+Shared HTTP layer for every provider client.
+
+  - One requests.Session per host, reused by every client and thread in the
+    process, so connections stay alive between calls (HTTP keep-alive).
+  - Every request takes a token from the host's rate limiter first.
+  - 429, 5xx and connection errors are retried a bounded number of times with
+    jittered exponential backoff. Retry-After is honoured when present.
+  - Identical GETs that overlap in time (same URL, params and headers) are
+    sent once and the response is shared (social_links.singleflight); see
+    flights.stats() for how many were coalesced.
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from social_links.rate_limit import get_limiter
+from social_links.singleflight import SingleFlight, request_key
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Connections kept open per host; enough for a thread pool of this size
+POOL_SIZE = 16
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# In-flight GETs shared by every thread in the process
+flights = SingleFlight("http GET single-flight")
+
+
+def get_session(host: str) -> requests.Session:
+    """Return the process-wide keep-alive session for a host."""
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def _retry_after(resp) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+    Takes a requests or an aiohttp response. None if absent or unparseable.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, base * 2^attempt], capped."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def request(method: str, url: str, *, max_retries: int = MAX_RETRIES,
+            rate_limited: bool = True, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session for the URL's host.
+
+    Returns the final response, which may still be an error status once
+    retries are exhausted; callers decide what a 404 or 403 means for them.
+    Raises requests.RequestException if the connection itself keeps failing.
+    Concurrent identical GETs share one response, which must not be modified.
+    """
+    if method.upper() == "GET" and not kwargs.get("stream"):
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("headers"))
+        return flights.do(key, lambda: _send(method, url, max_retries, rate_limited, kwargs))
+    return _send(method, url, max_retries, rate_limited, kwargs)
+
+
+def _send(method: str, url: str, max_retries: int, rate_limited: bool,
+          kwargs: dict) -> requests.Response:
+    host = urlparse(url).netloc.lower()
+    session = get_session(host)
+    limiter = get_limiter(host) if rate_limited else None
+    kwargs.setdefault("timeout", 15)
+
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            resp = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.debug(f"{host}: {e}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if resp.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return resp
+
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        logger.warning(f"{host} returned {resp.status_code}, retrying in {delay:.1f}s "
+                       f"({attempt + 1}/{max_retries})")
+        time.sleep(delay)
+
+    return resp
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def get_json(url: str, **kwargs) -> Optional[dict]:
+    """GET and parse JSON. Returns None on any non-2xx response or network failure."""
+    try:
+        resp = request("GET", url, **kwargs)
+    except requests.RequestException as e:
+        logger.debug(f"Request failed ({url}): {e}")
+        return None
+    if not resp.ok:
+        logger.debug(f"{resp.status_code} from {url}")
+        return None
+    return resp.json()
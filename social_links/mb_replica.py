@@ -0,0 +1,257 @@
+"""
+Offline MusicBrainz replica built from the JSON data dump.
+
+At 1 request/second and two requests per artist, a full enrichment run takes
+days. The MusicBrainz JSON dumps (https://data.metabrainz.org/pub/musicbrainz/
+data/json-dumps/, artist.tar.xz) hold every artist with its aliases and URL
+relations, one JSON object per line. ingest() loads that file, or any subset
+of it, into a local SQLite file with just what the pipeline needs:
+
+    artists(mbid, name, country, n_links, relations)   url-rels only
+    names(key, mbid, kind)        key = normalize_name(name or alias)
+
+search() answers an artist-name search from the names index and returns hits
+shaped like /ws/2/artist?query= results; lookup() answers /ws/2/artist/{mbid}
+?inc=url-rels. Both run at in-process speed, so MusicBrainzClient, the
+pipeline and the async engine ask the replica first and only go to the live
+API when it has no answer (artists added after the dump).
+
+Search scores stand in for the live ones: 100 for a name match and 95 for an
+alias match, both above MIN_SCORE. Homonyms are ordered with the artist that
+has the most URL relations first, as a proxy for how well known it is.
+
+Ingest writes to a temp file and moves it into place, so a half-finished
+import never replaces a working replica.
+
+Usage:
+    python -m social_links.mb_replica ingest artist.tar.xz
+    python -m social_links.mb_replica ingest fixtures/mb_artists.jsonl
+    python -m social_links.mb_replica search "Lil Baby"
+
+    replica = MBReplica.open_existing()
+    if replica:
+        hits = replica.search("Lil Baby")
+        artist = replica.lookup(hits[0]["id"])
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import lzma
+import os
+import sqlite3
+import tarfile
+import threading
+import time
+from typing import Iterator, Optional
+
+from social_links.names import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Next to the social_links package, so every script shares one replica
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "musicbrainz_replica.sqlite")
+
+# Member holding the artist JSON lines inside the dump tarball
+DUMP_MEMBER = "mbdump/artist"
+
+NAME_SCORE = 100
+ALIAS_SCORE = 95
+
+INGEST_BATCH_SIZE = 10_000
+
+_OPENERS = {".xz": lzma.open, ".gz": gzip.open, ".bz2": bz2.open}
+
+
+def _open_lines(source: str) -> Iterator[bytes]:
+    """Lines of a dump: .tar(.xz/.gz/.bz2) tarball, compressed JSONL or plain JSONL."""
+    if ".tar" in os.path.basename(source):
+        with tarfile.open(source, "r|*") as tar:
+            for member in tar:
+                if member.name == DUMP_MEMBER or member.name.endswith("/" + DUMP_MEMBER):
+                    yield from tar.extractfile(member)
+                    return
+        raise ValueError(f"{source} has no {DUMP_MEMBER} member")
+    opener = _OPENERS.get(os.path.splitext(source)[1], open)
+    with opener(source, "rb") as f:
+        yield from f
+
+
+def _url_relations(artist: dict) -> list[dict]:
+    # Only what links_from_relations reads: type and url.resource
+    return [
+        {"type": rel.get("type"), "url": {"resource": rel["url"]["resource"]}}
+        for rel in artist.get("relations") or []
+        if (rel.get("url") or {}).get("resource")
+    ]
+
+
+def _name_rows(mbid: str, artist: dict) -> set[tuple[str, str, str]]:
+    rows = set()
+    key = normalize_name(artist.get("name"))
+    if key:
+        rows.add((key, mbid, "name"))
+    for alias in artist.get("aliases") or []:
+        alias_key = normalize_name(alias.get("name"))
+        if alias_key and alias_key != key:
+            rows.add((alias_key, mbid, "alias"))
+    return rows
+
+
+class MBReplica:
+    """Read side of the replica; safe to share between threads."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No MusicBrainz replica at {path}; run `python -m social_links.mb_replica ingest`")
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open_existing(cls, path: str = DEFAULT_PATH) -> Optional["MBReplica"]:
+        """The replica at `path`, or None if it has not been ingested."""
+        return cls(path) if os.path.exists(path) else None
+
+    def _count(self, found: bool):
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def search(self, name: str, limit: int = 5) -> list[dict]:
+        """Artists whose name or alias normalises like `name`, as search-API hits."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.mbid, a.name, n.kind FROM names n JOIN artists a ON a.mbid = n.mbid "
+                "WHERE n.key = ? ORDER BY n.kind = 'alias', a.n_links DESC LIMIT ?",
+                (normalize_name(name), limit),
+            ).fetchall()
+        self._count(bool(rows))
+        return [
+            {"id": mbid, "name": hit_name, "score": NAME_SCORE if kind == "name" else ALIAS_SCORE}
+            for mbid, hit_name, kind in rows
+        ]
+
+    def lookup(self, mbid: str) -> Optional[dict]:
+        """An artist in the /ws/2/artist/{mbid}?inc=url-rels shape, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, country, relations FROM artists WHERE mbid = ?", (mbid,)
+            ).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return None
+        name, country, relations = row
+        return {"id": mbid, "name": name, "country": country, "relations": json.loads(relations)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM artists").fetchone()[0]
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"mb_replica: {self.hits} answered, {self.misses} not in replica ({rate:.0%})"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ingest(source: str, path: str = DEFAULT_PATH, batch_size: int = INGEST_BATCH_SIZE) -> int:
+    """
+    Build the replica from a dump (or a JSONL subset of one), replacing any
+    existing replica at `path` once the import has finished. Returns artists
+    ingested.
+    """
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    # Throwaway file until the final rename, so durability is not needed
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        "CREATE TABLE artists (mbid TEXT PRIMARY KEY, name TEXT, country TEXT, "
+        "n_links INTEGER NOT NULL, relations TEXT NOT NULL)"
+    )
+    conn.execute("CREATE TABLE names (key TEXT NOT NULL, mbid TEXT NOT NULL, kind TEXT NOT NULL)")
+
+    artists, names = [], []
+    count = 0
+    started = time.monotonic()
+
+    def write_batch():
+        conn.executemany("INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?, ?)", artists)
+        conn.executemany("INSERT INTO names VALUES (?, ?, ?)", names)
+        conn.commit()
+        artists.clear()
+        names.clear()
+
+    try:
+        for line in _open_lines(source):
+            line = line.strip()
+            if not line:
+                continue
+            artist = json.loads(line)
+            mbid = artist.get("id")
+            if not mbid:
+                continue
+            relations = _url_relations(artist)
+            artists.append((mbid, artist.get("name"), artist.get("country"),
+                            len(relations), json.dumps(relations, separators=(",", ":"))))
+            names.extend(_name_rows(mbid, artist))
+            count += 1
+            if len(artists) >= batch_size:
+                write_batch()
+                logger.info(f"Ingested {count:,} artists ({time.monotonic() - started:.0f}s)")
+        write_batch()
+        # Indexed after the bulk load, which is much faster than maintaining it row by row
+        conn.execute("CREATE INDEX names_key ON names (key)")
+        conn.execute("CREATE INDEX names_mbid ON names (mbid)")
+        conn.execute("ANALYZE")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(tmp)
+        raise
+    conn.close()
+    os.replace(tmp, path)
+    return count
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Build or query the offline MusicBrainz replica")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ing = sub.add_parser("ingest", help="Load an artist dump (tarball or JSONL) into the replica")
+    ing.add_argument("source")
+    srch = sub.add_parser("search", help="Print the hits for an artist name")
+    srch.add_argument("name")
+    look = sub.add_parser("lookup", help="Print an artist's url-rels by MBID")
+    look.add_argument("mbid")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        n = ingest(args.source, args.path)
+        print(f"Ingested {n:,} artists into {args.path}")
+        return
+    with MBReplica(args.path) as replica:
+        result = replica.search(args.name) if args.command == "search" else replica.lookup(args.mbid)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+MusicBrainz client and response parsing shared by every MusicBrainz script
+and by the sync and async lookup paths of the pipeline.
+"""
+
+from social_links import http_client
+from social_links.handles import PLATFORM_COLUMNS, classify_url
+from social_links.mb_replica import MBReplica
+from social_links.names import normalize_name
+from social_links.negative_cache import LOW_SCORE, NO_RESULTS, NegativeCache
+
+MB_API_BASE = "https://musicbrainz.org/ws/2"
+
+# MusicBrainz requires a descriptive User-Agent
+USER_AGENT = "SocialLinkUpdater/1.0 (research)"
+
+# Search hits below this score are treated as "no match"
+MIN_SCORE = 90
+
+# Names packed into one OR'd artist search, and the hits asked for; the API
+# returns at most 100 per page
+SEARCH_BATCH = 20
+SEARCH_BATCH_LIMIT = 100
+
+# /ws/2/url?resource= takes up to this many resource parameters per request
+URL_LOOKUP_BATCH = 100
+SPOTIFY_ARTIST_URL = "https://open.spotify.com/artist/{}"
+
+
+def best_search_hit(data: dict) -> dict | None:
+    """Return the top artist from a /ws/2/artist search response, or None."""
+    artists = data.get("artists") or []
+    if not artists or artists[0].get("score", 0) < MIN_SCORE:
+        return None
+    return artists[0]
+
+
+def search_miss_reason(data: dict) -> tuple[str, str | None]:
+    """(reason code, detail) for a search response best_search_hit() rejected."""
+    artists = data.get("artists") or []
+    if not artists:
+        return NO_RESULTS, None
+    return LOW_SCORE, f"score {artists[0].get('score', 0)}"
+
+
+def _phrase(name: str) -> str:
+    # Inside a Lucene phrase only the quote and the escape character are special
+    return '"' + name.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def batch_query(names: list[str], entity: str = "artist") -> str:
+    """One Lucene query matching any of `names`: artist:"a" OR artist:"b" ..."""
+    return " OR ".join(f"{entity}:{_phrase(name)}" for name in names)
+
+
+def demux_hits(hits: list[dict], names: list[str]) -> dict[str, dict]:
+    """
+    Assign the hits of a batch_query() back to the names that asked for them.
+
+    A name gets the first hit (best score) whose name or one of whose aliases
+    normalises like it. Names without such a hit are left out; scores of an
+    OR'd query rank hits against each other, not against one name, so the
+    top hit alone is no evidence of a match.
+    """
+    wanted = {}
+    for name in names:
+        key = normalize_name(name)
+        if key:
+            wanted.setdefault(key, []).append(name)
+    matched = {}
+    for hit in hits:
+        keys = {normalize_name(hit.get("name"))}
+        keys.update(normalize_name(alias.get("name")) for alias in hit.get("aliases") or [])
+        for key in keys:
+            for name in wanted.pop(key, []):
+                matched[name] = hit
+    return matched
+
+
+def artists_from_url_lookup(data: dict) -> dict[str, list[dict]]:
+    """
+    Map a /ws/2/url?resource=...&inc=artist-rels response to {url: [artist, ...]}.
+
+    A lookup of one resource returns the URL entity itself, several return
+    {"urls": [...]}; URLs MusicBrainz doesn't know are simply absent.
+    """
+    entities = data.get("urls", []) if "urls" in data else [data]
+    linked = {}
+    for entity in entities:
+        artists = [rel["artist"] for rel in entity.get("relations", []) if rel.get("artist")]
+        if entity.get("resource") and artists:
+            linked[entity["resource"]] = artists
+    return linked
+
+
+def links_from_relations(relations: list[dict]) -> dict:
+    """
+    Map url-rels to our social columns through the shared URL classifier.
+
+    Links are stored in their canonical form. The first profile link found
+    for each platform wins (one with a handle beats one without), and the
+    official homepage fills website_url.
+    """
+    urls = {}
+    for rel in relations:
+        url = (rel.get("url") or {}).get("resource") or ""
+        classified = classify_url(url)
+        if classified is None:
+            if url and rel.get("type") == "official homepage" and "website_url" not in urls:
+                urls["website_url"] = url
+            continue
+        url_col, handle_col = PLATFORM_COLUMNS[classified.platform]
+        if url_col in urls and (handle_col is None or handle_col in urls or not classified.handle):
+            continue
+        urls[url_col] = classified.canonical_url
+        if handle_col and classified.handle:
+            urls[handle_col] = classified.handle
+    return urls
+
+
+def links_from_artist(artist: dict) -> dict:
+    """Map a /ws/2/artist/{id}?inc=url-rels response to our social columns."""
+    return {"artist_country": artist.get("country") or "", **links_from_relations(artist.get("relations", []))}
+
+
+class MusicBrainzClient:
+    """
+    MusicBrainz search and lookup on top of the shared HTTP layer.
+
+    get_links() maps an entity's URL relations to our social columns; scripts
+    subclass this only to add lookups of their own.
+
+    With a `negative_cache`, search_artist() skips artists cached as having
+    no match and records searches that come back empty. With a `replica`
+    (social_links.mb_replica), artist searches and url-rels lookups are
+    answered locally and only go to the API when the replica has no answer.
+
+    search_artists() searches many names at once with OR'd queries.
+    resolve_spotify_ids() skips the search entirely for artists whose Spotify
+    ID is known, resolving up to URL_LOOKUP_BATCH of them per request.
+    """
+
+    def __init__(self, user_agent: str = USER_AGENT, negative_cache: NegativeCache | None = None,
+                 replica: MBReplica | None = None):
+        self.headers = {"User-Agent": user_agent, "Accept": "application/json"}
+        self.negative_cache = negative_cache
+        self.replica = replica
+
+    def _search(self, entity: str, name: str, limit: int) -> list[dict] | None:
+        # None when the request failed, so it is not mistaken for "no hits"
+        data = http_client.get_json(
+            f"{MB_API_BASE}/{entity}",
+            params={"query": f'{entity}:"{name}"', "limit": limit, "fmt": "json"},
+            headers=self.headers,
+        )
+        return None if data is None else data.get(f"{entity}s", [])
+
+    def search(self, entity: str, name: str, limit: int = 5) -> list[dict]:
+        """Search artists or labels by exact-phrase name. Returns the raw hits."""
+        if entity == "artist" and self.replica is not None:
+            hits = self.replica.search(name, limit)
+            if hits:
+                return hits
+        return self._search(entity, name, limit) or []
+
+    def search_artist(self, name: str, limit: int = 5) -> dict | None:
+        """Best artist match: same normalised name if present, else the top hit."""
+        if self.replica is not None:
+            hits = self.replica.search(name, limit)
+            if hits:
+                return self._best_match(hits, name)
+        if self.negative_cache is not None and name in self.negative_cache:
+            return None
+        hits = self._search("artist", name, limit)
+        if hits == [] and self.negative_cache is not None:
+            self.negative_cache.record(name, NO_RESULTS)
+        return self._best_match(hits or [], name)
+
+    def search_artists(self, names, batch_size: int = SEARCH_BATCH,
+                       fallback: bool = True) -> dict[str, dict | None]:
+        """
+        Best artist match for many names, `batch_size` names per request.
+
+        Names are packed into one OR'd query and the hits matched back by
+        normalised name (demux_hits). Names still unmatched afterwards get a
+        search_artist() of their own, or are left out with fallback=False so
+        the caller can search them later. Names the replica answers or the
+        negative cache holds never reach a batch.
+        """
+        results = {}
+        batched = []
+        for name in dict.fromkeys(names):
+            hits = self.replica.search(name, 5) if self.replica is not None else []
+            if hits:
+                results[name] = self._best_match(hits, name)
+            elif self.negative_cache is not None and name in self.negative_cache:
+                results[name] = None
+            else:
+                batched.append(name)
+
+        for start in range(0, len(batched), batch_size):
+            chunk = batched[start:start + batch_size]
+            data = http_client.get_json(
+                f"{MB_API_BASE}/artist",
+                params={"query": batch_query(chunk), "limit": SEARCH_BATCH_LIMIT, "fmt": "json"},
+                headers=self.headers,
+            )
+            results.update(demux_hits((data or {}).get("artists", []), chunk))
+
+        if fallback:
+            for name in batched:
+                if name not in results:
+                    results[name] = self.search_artist(name)
+        return results
+
+    def search_label(self, name: str, limit: int = 5) -> dict | None:
+        return self._best_match(self.search("label", name, limit), name)
+
+    @staticmethod
+    def _best_match(hits: list[dict], name: str) -> dict | None:
+        if not hits:
+            return None
+        key = normalize_name(name)
+        for hit in hits:
+            if normalize_name(hit.get("name")) == key:
+                return hit
+        return hits[0]
+
+    def resolve_urls(self, urls: list[str]) -> dict[str, list[dict]]:
+        """
+        Artists linked to each URL, URL_LOOKUP_BATCH URLs per request.
+
+        Unknown URLs, and those of a failed request, are left out of the
+        result so callers fall back to a name search for them.
+        """
+        linked = {}
+        for start in range(0, len(urls), URL_LOOKUP_BATCH):
+            data = http_client.get_json(
+                f"{MB_API_BASE}/url",
+                params={"resource": urls[start:start + URL_LOOKUP_BATCH], "inc": "artist-rels", "fmt": "json"},
+                headers=self.headers,
+            )
+            if data is not None:
+                linked.update(artists_from_url_lookup(data))
+        return linked
+
+    def resolve_spotify_ids(self, spotify_ids) -> dict[str, str]:
+        """
+        {spotify_id: MBID} for artists whose MusicBrainz entry links their
+        Spotify page. A page linked to several artists is ambiguous and left
+        out, like an unknown one.
+        """
+        urls = {SPOTIFY_ARTIST_URL.format(sid): sid for sid in dict.fromkeys(spotify_ids)}
+        return {
+            urls[url]: artists[0]["id"]
+            for url, artists in self.resolve_urls(list(urls)).items()
+            if url in urls and len({a["id"] for a in artists}) == 1
+        }
+
+    def lookup(self, mbid: str, entity: str = "artist", inc: str = "url-rels") -> dict | None:
+        """Fetch one entity by MBID, e.g. /ws/2/artist/{mbid}?inc=url-rels."""
+        if entity == "artist" and inc == "url-rels" and self.replica is not None:
+            artist = self.replica.lookup(mbid)
+            if artist is not None:
+                return artist
+        return http_client.get_json(
+            f"{MB_API_BASE}/{entity}/{mbid}",
+            params={"inc": inc, "fmt": "json"},
+            headers=self.headers,
+        )
+
+    def get_relations(self, mbid: str, entity: str = "artist") -> list[dict] | None:
+        """URL relations of an artist or label; None if the lookup failed."""
+        data = self.lookup(mbid, entity)
+        return None if data is None else data.get("relations", [])
+
+    def get_links(self, mbid: str, entity: str = "artist") -> dict | None:
+        """
+        Social columns of an artist or label, via links_from_relations. None
+        if the lookup failed, which is not the same as an artist without links.
+        """
+        relations = self.get_relations(mbid, entity)
+        return None if relations is None else links_from_relations(relations)
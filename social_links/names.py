@@ -0,0 +1,118 @@
+"""
+Canonical artist-name keys for caches, dedupe and joins.
+
+normalize_name() turns the many spellings one artist arrives in ("Lil Baby",
+"lil baby ", "LIL BABY", "Lil Baby", a mojibake-damaged copy) into one
+key:
+
+    1. repair mojibake: UTF-8 text that was decoded as cp1252, Mac Roman or
+       Latin-1 somewhere upstream (see TESTING_RESULTS.md, e.g. "–ê–î–õ–ò–ù"
+       for "АДЛИН") is re-encoded and decoded as UTF-8 again
+    2. Unicode NFKC, so full-width, ligature and compatibility forms fold
+    3. casefold
+    4. apostrophes dropped, every other run of punctuation, symbols and
+       whitespace collapsed to one space, ends stripped
+
+Letters of every script and diacritics are kept, so "Beyoncé" and "Beyonce"
+stay distinct keys. A name made only of punctuation (e.g. "!!!") keeps its
+folded text rather than collapsing to an empty key.
+
+normalize_name() is memoised; normalize_names() does a whole Series at once,
+working on the distinct values only. Both give the same keys.
+
+Usage:
+    from social_links.names import normalize_name, normalize_names
+
+    mb_id_cache.get(normalize_name(artist))
+    df["artist_key"] = normalize_names(df["Artist"])
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+# Wrong decodings of UTF-8 bytes to undo, most common first
+MOJIBAKE_ENCODINGS = ("cp1252", "mac_roman", "latin-1")
+
+# Text damaged twice (decoded wrongly, saved, decoded wrongly again) needs
+# one round per layer
+MAX_REPAIR_ROUNDS = 2
+
+NAME_CACHE_SIZE = 500_000
+
+_APOSTROPHES = re.compile(r"['‘’ʼ`]")
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def repair_mojibake(text: str) -> str:
+    """
+    Undo UTF-8 that was decoded with a single-byte codec.
+
+    The text is re-encoded with each suspect codec and decoded as strict
+    UTF-8; real names almost never survive that round trip, so a successful
+    decode is taken as the repair. ASCII text is returned untouched.
+    """
+    for _ in range(MAX_REPAIR_ROUNDS):
+        if text.isascii():
+            break
+        for encoding in MOJIBAKE_ENCODINGS:
+            try:
+                repaired = text.encode(encoding).decode("utf-8")
+            except UnicodeError:
+                continue
+            if repaired != text:
+                text = repaired
+                break
+        else:
+            break
+    return text
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _normalize(name: str) -> str:
+    folded = _fold(repair_mojibake(name))
+    key = _SEPARATORS.sub(" ", _APOSTROPHES.sub("", folded)).strip()
+    return key or " ".join(folded.split())
+
+
+def normalize_name(name) -> str:
+    """Canonical key for an artist name; '' for missing values."""
+    if name is None or (not isinstance(name, str) and pd.isna(name)):
+        return ""
+    return _normalize(str(name))
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    normalize_name() for a Series; missing values stay missing.
+
+    Only distinct names are normalised: mojibake repair runs on the non-ASCII
+    ones, the folding and collapsing as vectorised str operations, and the
+    keys are mapped back by position.
+    """
+    codes, uniques = pd.factorize(names.astype(object).where(names.notna(), None))
+    text = pd.Series(uniques, dtype=object).astype(str)
+
+    suspect = ~text.map(str.isascii)
+    if suspect.any():
+        text[suspect] = text[suspect].map(repair_mojibake)
+
+    folded = text.str.normalize("NFKC").str.casefold()
+    keys = (
+        folded.str.replace(_APOSTROPHES, "", regex=True)
+        .str.replace(_SEPARATORS, " ", regex=True)
+        .str.strip()
+    )
+    empty = keys == ""
+    if empty.any():
+        keys[empty] = folded[empty].str.split().str.join(" ")
+
+    values = keys.to_numpy(dtype=object)[codes]
+    values[codes == -1] = None
+    return pd.Series(values, index=names.index, dtype=object)
@@ -0,0 +1,160 @@
+"""
+Negative-result cache: artists a provider could not match.
+
+An artist MusicBrainz, Spotify or SoundCloud has no match for costs the full
+rate-limited search again on every rerun, and thousands of them (see the
+non-Latin DJ/producers in TESTING_RESULTS.md) come back empty every time.
+NegativeCache remembers those misses per provider, keyed by normalised
+artist name (social_links.names), with a reason code:
+
+    no_results   the search returned nothing
+    low_score    the best hit scored below the provider's match threshold
+    no_links     the artist matched but has no social URL relations
+
+Lookups skip a cached artist until its entry is older than the provider's
+TTL, so catalogue additions are picked up eventually. Failed requests
+(network errors, 5xx) are never recorded; only real "nothing there" answers
+are.
+
+Entries live in one SQLite table per provider (TTLCache). Misses are
+committed as they are recorded and lookups never write (their used_at is
+kept in memory until the next commit), so several processes of a sharded
+run can share the file.
+
+Usage:
+    negatives = NegativeCache("musicbrainz")
+    if artist in negatives:
+        return None
+    negatives.record(artist, NO_RESULTS)
+
+    python -m social_links.negative_cache list musicbrainz --reason low_score
+    python -m social_links.negative_cache invalidate musicbrainz "Some Artist"
+    python -m social_links.negative_cache clear spotify
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Iterator, Optional
+
+from social_links.cache import TTLCache
+from social_links.names import normalize_name
+
+NO_RESULTS = "no_results"
+LOW_SCORE = "low_score"
+NO_LINKS = "no_links"
+REASONS = (NO_RESULTS, LOW_SCORE, NO_LINKS)
+
+# Next to the social_links package, so every script shares one file
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "negative_cache.sqlite")
+
+# How long a miss is trusted before the provider is asked again
+DEFAULT_TTL = 30 * 86400
+PROVIDER_TTLS = {
+    "musicbrainz": 60 * 86400,   # community-edited, changes slowly
+    "spotify": 14 * 86400,
+    "soundcloud": 14 * 86400,
+}
+MAX_ENTRIES = 1_000_000
+
+
+class NegativeCache(TTLCache):
+    """Per-provider misses with a reason code, expiring after `ttl` seconds."""
+
+    def __init__(self, provider: str, ttl: Optional[float] = None, path: str = DEFAULT_PATH):
+        self.provider = provider
+        super().__init__(
+            path,
+            table=f"negative_{provider}",
+            ttl=PROVIDER_TTLS.get(provider, DEFAULT_TTL) if ttl is None else ttl,
+            max_entries=MAX_ENTRIES,
+            batch_size=1,
+        )
+
+    def reason(self, artist_name) -> Optional[str]:
+        """The cached reason this artist has no match, or None if it should be looked up."""
+        entry = self.get(normalize_name(artist_name))
+        return entry["reason"] if entry else None
+
+    def __contains__(self, artist_name) -> bool:
+        return self.reason(artist_name) is not None
+
+    def record(self, artist_name, reason: str, detail: Optional[str] = None):
+        if reason not in REASONS:
+            raise ValueError(f"Unknown reason {reason!r}; expected one of {REASONS}")
+        self.put(normalize_name(artist_name), {"reason": reason, "detail": detail})
+
+    def invalidate(self, artist_name) -> bool:
+        """Forget one artist so the next run looks it up again. Returns whether it was cached."""
+        key = normalize_name(artist_name)
+        with self._lock:
+            self._commit()
+            deleted = self._conn.execute(
+                f'DELETE FROM "{self.table}" WHERE key = ?', (key,)
+            ).rowcount
+            self._commit()
+        return deleted > 0
+
+    def clear(self, reason: Optional[str] = None) -> int:
+        """Drop every entry, or only those with `reason`. Returns rows deleted."""
+        with self._lock:
+            self._commit()
+            if reason is None:
+                deleted = self._conn.execute(f'DELETE FROM "{self.table}"').rowcount
+            else:
+                deleted = self._conn.execute(
+                    f'DELETE FROM "{self.table}" WHERE json_extract(value, \'$.reason\') = ?',
+                    (reason,),
+                ).rowcount
+            self._commit()
+        self._size = len(self)
+        return deleted
+
+    def entries(self, reason: Optional[str] = None) -> Iterator[tuple[str, dict, float]]:
+        """(normalised name, {"reason", "detail"}, stored_at) for unexpired entries."""
+        sql = f'SELECT key, value, stored_at FROM "{self.table}" WHERE stored_at >= ?'
+        params: list = [time.time() - self.ttl]
+        if reason is not None:
+            sql += " AND json_extract(value, '$.reason') = ?"
+            params.append(reason)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY stored_at", params).fetchall()
+        for key, value, stored_at in rows:
+            yield key, json.loads(value), stored_at
+
+    def stats(self) -> str:
+        return f"{self.provider} negatives: {self.hits} skipped, {self.misses} looked up, {self.expired} expired"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or invalidate cached provider misses")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ls = sub.add_parser("list", help="Print unexpired entries")
+    ls.add_argument("provider")
+    ls.add_argument("--reason", choices=REASONS)
+    inv = sub.add_parser("invalidate", help="Forget the given artists")
+    inv.add_argument("provider")
+    inv.add_argument("artists", nargs="+")
+    clr = sub.add_parser("clear", help="Forget every entry (or one reason) of a provider")
+    clr.add_argument("provider")
+    clr.add_argument("--reason", choices=REASONS)
+    args = parser.parse_args()
+
+    with NegativeCache(args.provider, path=args.path) as negatives:
+        if args.command == "list":
+            for key, entry, stored_at in negatives.entries(args.reason):
+                stamp = time.strftime("%Y-%m-%d", time.localtime(stored_at))
+                detail = f"  ({entry['detail']})" if entry.get("detail") else ""
+                print(f"{stamp}  {entry['reason']:<10}  {key}{detail}")
+        elif args.command == "invalidate":
+            for artist in args.artists:
+                found = negatives.invalidate(artist)
+                print(f"{'Invalidated' if found else 'Not cached'}: {artist}")
+        else:
+            print(f"Cleared {negatives.clear(args.reason)} {args.provider} entries")
+
+
+if __name__ == "__main__":
+    main()
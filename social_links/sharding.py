@@ -0,0 +1,158 @@
+"""
+Multi-process sharded runs with a completion manifest.
+
+Splits a list of input records into fixed shards, runs them in a process
+pool, and records every shard's status in manifest.json inside the work
+directory. Rerunning the same command resumes: shards marked "done" are
+skipped, and failed ones are retried up to max_attempts times per run.
+When every shard is done, the outputs are concatenated in shard order, so
+the merged file is identical no matter which worker finished first.
+
+The provider rate budget is global: each worker process gets
+DEFAULT_RATES[host] / workers for every host in `hosts`.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+
+import pandas as pd
+
+from social_links import rate_limit
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ShardManifest:
+    """JSON manifest of shard ranges and their status, rewritten atomically."""
+
+    def __init__(self, work_dir: str):
+        self.work_dir = work_dir
+        self.path = os.path.join(work_dir, MANIFEST_NAME)
+        self.data: dict = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.data = json.load(f)
+
+    def init(self, source: str, total: int, shard_size: int):
+        """Create the shard table, or check an existing one matches this input."""
+        if self.data:
+            if self.data["source"] != source or self.data["total"] != total:
+                raise ValueError(
+                    f"{self.path} was built for {self.data['source']} ({self.data['total']} rows); "
+                    f"use a different --work-dir or delete it"
+                )
+            return
+        shards = []
+        for shard_id, start in enumerate(range(0, total, shard_size)):
+            shards.append({
+                "id": shard_id,
+                "start": start,
+                "end": min(start + shard_size, total),
+                "status": "pending",
+                "attempts": 0,
+                "output": os.path.join(self.work_dir, f"shard_{shard_id:04d}.csv"),
+                "error": None,
+            })
+        self.data = {"source": source, "total": total, "shard_size": shard_size, "shards": shards}
+        self.save()
+
+    @property
+    def shards(self) -> list[dict]:
+        return self.data["shards"]
+
+    def update(self, shard_id: int, **fields):
+        self.shards[shard_id].update(fields)
+        self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+def _init_worker(hosts: list[str], workers: int):
+    # Each process has its own buckets, so split the global budget evenly
+    for host in hosts:
+        rate = rate_limit.DEFAULT_RATES.get(host, rate_limit.FALLBACK_RATE)
+        rate_limit.configure(host, rate / workers)
+
+
+def _run_shard(worker_fn: Callable[[list[dict]], list[dict]], records: list[dict],
+               columns: list[str], output: str) -> int:
+    rows = worker_fn(records)
+    tmp = output + ".tmp"
+    pd.DataFrame(rows, columns=columns).to_csv(tmp, index=False)
+    os.replace(tmp, output)
+    return len(rows)
+
+
+def run_sharded(records: list[dict], worker_fn: Callable[[list[dict]], list[dict]],
+                columns: list[str], output_path: Optional[str], work_dir: str, source: str,
+                shard_size: int = 1000, workers: int = 4, max_attempts: int = 3,
+                hosts: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Run `worker_fn` over `records` in shards and merge the results.
+
+    `worker_fn` must be a picklable top-level function taking a list of input
+    records and returning a list of output row dicts. Returns the merged
+    DataFrame (also written to output_path unless it is None), or raises
+    RuntimeError if some shards still failed after max_attempts tries in
+    this run.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    manifest = ShardManifest(work_dir)
+    manifest.init(source, len(records), shard_size)
+
+    todo = [s for s in manifest.shards if s["status"] != "done"]
+    done = sum(1 for s in manifest.shards if s["status"] == "done")
+    logger.info(f"{len(manifest.shards)} shards: {done} done, {len(todo)} to run on {workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(hosts or [], workers)
+    ) as pool:
+        # Attempts in this run; the manifest keeps the all-time count
+        tries = {}
+
+        def submit(shard):
+            tries[shard["id"]] = tries.get(shard["id"], 0) + 1
+            manifest.update(shard["id"], status="running", attempts=shard["attempts"] + 1)
+            chunk = records[shard["start"]:shard["end"]]
+            return pool.submit(_run_shard, worker_fn, chunk, columns, shard["output"])
+
+        futures = {submit(s): s["id"] for s in todo}
+        while futures:
+            for future in as_completed(list(futures)):
+                shard_id = futures.pop(future)
+                shard = manifest.shards[shard_id]
+                try:
+                    n_rows = future.result()
+                except Exception as e:
+                    logger.error(f"Shard {shard_id} failed (attempt {tries[shard_id]}): {e}")
+                    manifest.update(shard_id, status="failed", error=str(e))
+                    if tries[shard_id] < max_attempts:
+                        futures[submit(shard)] = shard_id
+                    continue
+                manifest.update(shard_id, status="done", rows=n_rows, error=None)
+                done += 1
+                logger.info(f"Shard {shard_id} done ({n_rows} rows) — {done}/{len(manifest.shards)}")
+
+    failed = [s["id"] for s in manifest.shards if s["status"] != "done"]
+    if failed:
+        raise RuntimeError(f"Shards {failed} did not complete; rerun to retry them")
+
+    merged = pd.concat(
+        (pd.read_csv(s["output"], dtype=str) for s in manifest.shards), ignore_index=True
+    )
+    merged = merged.reindex(columns=columns)
+    if output_path:
+        merged.to_csv(output_path, index=False)
+    logger.info(f"Merged {len(manifest.shards)} shards ({len(merged)} rows)")
+    return merged
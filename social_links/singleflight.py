@@ -0,0 +1,131 @@
+"""
+Single-flight request coalescing.
+
+When several workers ask for the same thing at once (two threads searching
+the same artist, two tasks fetching the same MBID), only the first call
+runs; the others wait for it and get the same result, or the same
+exception. Nothing is remembered once the call finishes, so this is not a
+cache: it only removes duplicate requests that overlap in time, which
+caches cannot see because neither caller has stored anything yet.
+
+SingleFlight is for threads (the shared HTTP layer), AsyncSingleFlight for
+coroutines on one event loop (the async engine). Both count calls and how
+many of them were coalesced, reported through stats() like the caches.
+
+Results are shared objects: callers must treat them as read-only.
+
+Usage:
+    flights = SingleFlight("musicbrainz")
+    resp = flights.do(request_key("GET", url, params), lambda: session.get(url, params=params))
+    print(flights.stats())
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+def _frozen(value) -> str:
+    if value is None:
+        return ""
+    items = value.items() if isinstance(value, dict) else value
+    return repr(sorted((str(k), str(v)) for k, v in items))
+
+
+def request_key(method: str, url: str, params=None, headers: Optional[dict] = None) -> tuple:
+    """Key identifying one HTTP request; parameter and header order don't matter."""
+    return method.upper(), url, _frozen(params), _frozen(headers)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _Counters:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+
+    def stats(self) -> str:
+        rate = self.coalesced / self.calls if self.calls else 0.0
+        return f"{self.name}: {self.calls} calls, {self.coalesced} coalesced ({rate:.0%})"
+
+    def reset_stats(self):
+        self.calls = 0
+        self.coalesced = 0
+
+
+class SingleFlight(_Counters):
+    """Thread-safe: concurrent do() calls with equal keys share one execution."""
+
+    def __init__(self, name: str = "single-flight"):
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight(_Counters):
+    """Coroutine version for one event loop; no locking needed."""
+
+    def __init__(self, name: str = "single-flight"):
+        super().__init__(name)
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]):
+        self.calls += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marks the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[key]
+        return result
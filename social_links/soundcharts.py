@@ -0,0 +1,105 @@
+"""
+Soundcharts API client.
+"""
+
+import logging
+from typing import Optional
+
+from social_links import http_client
+from social_links.names import normalize_name
+
+logger = logging.getLogger(__name__)
+
+SOUNDCHARTS_BASE_URL = "https://customer.api.soundcharts.com/api/v2"
+
+
+class SoundchartsClient:
+    """Client for interacting with the Soundcharts API."""
+
+    def __init__(self, app_id: str, api_key: str):
+        if not app_id or not api_key:
+            raise ValueError(
+                "Soundcharts credentials not found. "
+                "Please set SOUNDCHARTS_APP_ID and SOUNDCHARTS_API_KEY in your .env file."
+            )
+        self.app_id = app_id
+        self.api_key = api_key
+        self.headers = {
+            "x-app-id": self.app_id,
+            "x-api-key": self.api_key,
+            "Accept": "application/json",
+        }
+
+    def _make_request(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
+        """
+        Make an authenticated request to the Soundcharts API.
+
+        Returns None on 404. Other errors raise once the shared HTTP layer has
+        used up its retries.
+        """
+        resp = http_client.get(
+            f"{SOUNDCHARTS_BASE_URL}{endpoint}", params=params, headers=self.headers, timeout=30
+        )
+        if resp.status_code == 404:
+            logger.debug(f"Resource not found: {endpoint}")
+            return None
+        if not resp.ok:
+            logger.error(f"HTTP error {resp.status_code} for {endpoint}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def search_artist(self, artist_name: str, spotify_id: Optional[str] = None) -> Optional[str]:
+        """
+        Search for an artist and return their Soundcharts UUID.
+
+        If a Spotify ID is provided, attempts to look up directly first.
+        Falls back to name search if direct lookup fails.
+        """
+        if spotify_id:
+            logger.info(f"Looking up artist by Spotify ID: {spotify_id}")
+            result = self._make_request(f"/artist/by-platform/spotify/{spotify_id}")
+            if result and "object" in result:
+                uuid = result["object"].get("uuid")
+                if uuid:
+                    logger.info(f"Found artist UUID via Spotify ID: {uuid}")
+                    return uuid
+
+        logger.info(f"Searching for artist by name: {artist_name}")
+        result = self._make_request("/artist/search", params={"q": artist_name, "limit": 5})
+
+        if not result or "items" not in result or not result["items"]:
+            logger.warning(f"No results found for artist: {artist_name}")
+            return None
+
+        items = result["items"]
+        for item in items:
+            if normalize_name(item.get("name")) == normalize_name(artist_name):
+                uuid = item.get("uuid")
+                logger.info(f"Found exact match for '{artist_name}': {uuid}")
+                return uuid
+
+        top_result = items[0]
+        uuid = top_result.get("uuid")
+        logger.info(f"Using top result for '{artist_name}': {top_result.get('name')} ({uuid})")
+        return uuid
+
+    def get_artist_identifiers(self, artist_uuid: str) -> dict:
+        """Fetch all platform identifiers (including social media) for an artist by their UUID."""
+        result = self._make_request(f"/artist/{artist_uuid}/identifiers")
+
+        if not result or "items" not in result:
+            return {}
+
+        # Only store default identifiers, or first occurrence if no default
+        identifiers = {}
+        for item in result.get("items", []):
+            platform_code = item.get("platformCode", "").lower()
+            url = item.get("url")
+            if platform_code and url:
+                if platform_code not in identifiers or item.get("default", False):
+                    identifiers[platform_code] = {
+                        "url": url,
+                        "identifier": item.get("identifier"),
+                        "platform_name": item.get("platformName"),
+                    }
+        return identifiers
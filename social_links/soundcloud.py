@@ -0,0 +1,59 @@
+"""
+SoundCloud public search (HTML fallback).
+
+There is no free official API anymore, but the public people-search page
+links to artist profiles. We make one GET and take the first profile link.
+"""
+
+import logging
+import re
+from typing import Optional
+
+import requests
+
+from social_links import http_client
+from social_links.negative_cache import NO_RESULTS, NegativeCache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = "https://soundcloud.com/search/people"
+
+_PROFILE_LINK = re.compile(r'href="/([\w\-]+)"')
+
+# Site paths that look like profiles in the HTML but are not
+SKIP_PATHS = {
+    "discover", "search", "stream", "upload", "you", "pages",
+    "settings", "charts", "stations", "people", "tracks", "sets",
+    "groups", "tags", "popular", "pro", "go", "creators", "feed",
+    "library", "messages", "notifications", "legal", "jobs",
+    "imprint", "privacy", "cookies", "terms-of-use",
+}
+
+
+def search_soundcloud(artist_name: str, negative_cache: Optional[NegativeCache] = None) -> Optional[dict]:
+    """
+    Return {"url", "handle"} for the first profile in the search results, or None.
+
+    Artists in `negative_cache` are not searched; a results page without
+    any profile is recorded there.
+    """
+    if negative_cache is not None and artist_name in negative_cache:
+        return None
+    try:
+        resp = http_client.get(
+            SEARCH_URL,
+            params={"q": artist_name},
+            headers={"User-Agent": "Mozilla/5.0 (research pipeline)"},
+        )
+    except requests.RequestException as e:
+        logger.debug(f"SoundCloud search failed: {e}")
+        return None
+    if not resp.ok:
+        return None
+
+    for match in _PROFILE_LINK.findall(resp.text):
+        if match.lower() not in SKIP_PATHS and len(match) > 1:
+            return {"url": f"https://soundcloud.com/{match}", "handle": match}
+    if negative_cache is not None:
+        negative_cache.record(artist_name, NO_RESULTS)
+    return None
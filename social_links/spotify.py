@@ -0,0 +1,163 @@
+"""
+Spotify Web API client (client-credentials flow).
+
+The best free anchor for artist identity: search returns a structured
+artist object whose id we store as spotify_id.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+import requests
+
+from social_links import http_client
+from social_links.names import normalize_name
+from social_links.negative_cache import NO_RESULTS, NegativeCache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+API_BASE = "https://api.spotify.com/v1"
+
+# /v1/artists?ids= accepts at most this many IDs per request
+MAX_IDS_PER_REQUEST = 50
+
+# One malformed ID fails the whole /v1/artists batch with a 400
+SPOTIFY_ID = re.compile(r"^[0-9A-Za-z]{22}$")
+
+# Row columns filled from a hydrated artist object (see artist_columns)
+ARTIST_COLUMNS = ["spotify_url", "spotify_followers", "spotify_genres"]
+
+
+def is_spotify_id(value) -> bool:
+    """Whether `value` looks like a Spotify ID: 22 base62 characters."""
+    return isinstance(value, str) and SPOTIFY_ID.match(value) is not None
+
+
+def artist_columns(artist: dict) -> dict:
+    """ARTIST_COLUMNS values of a Spotify artist object, as strings like every stored column."""
+    followers = (artist.get("followers") or {}).get("total")
+    return {
+        "spotify_url": (artist.get("external_urls") or {}).get("spotify"),
+        "spotify_followers": None if followers is None else str(followers),
+        "spotify_genres": ", ".join(artist.get("genres") or []) or None,
+    }
+
+
+class SpotifyClient:
+    """
+    Handles token refresh and artist lookups. Safe to share between threads.
+
+    With a `negative_cache`, search_artist() skips artists cached as having
+    no match and records searches that come back empty.
+    """
+
+    def __init__(self, client_id: str, client_secret: str,
+                 negative_cache: Optional[NegativeCache] = None):
+        if not client_id or not client_secret:
+            raise ValueError("SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET are required in .env")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.negative_cache = negative_cache
+        self.token_expires_at = 0.0
+        self._headers: dict = {}
+        self._token_lock = threading.Lock()
+        self._refresh_token()
+
+    def _refresh_token(self):
+        """Get a new bearer token using client-credentials flow."""
+        resp = http_client.request(
+            "POST",
+            TOKEN_URL,
+            data={"grant_type": "client_credentials"},
+            auth=(self.client_id, self.client_secret),
+            rate_limited=False,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        self._headers = {"Authorization": f"Bearer {data['access_token']}"}
+        # Tokens last 3600s; refresh 5 min early
+        self.token_expires_at = time.time() + data.get("expires_in", 3600) - 300
+        logger.info("Spotify token refreshed")
+
+    def _ensure_token(self):
+        with self._token_lock:
+            if time.time() >= self.token_expires_at:
+                self._refresh_token()
+
+    def _get(self, path: str, params: Optional[dict] = None) -> Optional[dict]:
+        self._ensure_token()
+        try:
+            resp = http_client.get(f"{API_BASE}{path}", params=params, headers=self._headers)
+            if resp.status_code == 401:
+                # Token revoked or expired early; refresh once and retry
+                with self._token_lock:
+                    self._refresh_token()
+                resp = http_client.get(f"{API_BASE}{path}", params=params, headers=self._headers)
+        except requests.RequestException as e:
+            logger.debug(f"Spotify request failed for {path}: {e}")
+            return None
+        if not resp.ok:
+            logger.debug(f"Spotify {resp.status_code} for {path}")
+            return None
+        return resp.json()
+
+    def search_artist(self, name: str) -> Optional[dict]:
+        """
+        Search Spotify for an artist by name. Returns the best-match artist object
+        or None. We prefer exact matches on the normalised name.
+        """
+        if self.negative_cache is not None and name in self.negative_cache:
+            return None
+        data = self._get("/search", params={"q": name, "type": "artist", "limit": 5})
+        items = (data or {}).get("artists", {}).get("items", [])
+        if not items:
+            # data is None when the request failed; that is not a miss
+            if data is not None and self.negative_cache is not None:
+                self.negative_cache.record(name, NO_RESULTS)
+            return None
+        for item in items:
+            if normalize_name(item.get("name")) == normalize_name(name):
+                return item
+        return items[0]
+
+    def get_artist(self, spotify_id: str) -> Optional[dict]:
+        """Fetch a full artist object by Spotify ID."""
+        return self._get(f"/artists/{spotify_id}")
+
+    def get_artists(self, spotify_ids: list[str]) -> list[Optional[dict]]:
+        """
+        Fetch up to MAX_IDS_PER_REQUEST artists in one request.
+
+        The result lines up with `spotify_ids`; unknown IDs come back as None.
+        """
+        if len(spotify_ids) > MAX_IDS_PER_REQUEST:
+            raise ValueError(f"At most {MAX_IDS_PER_REQUEST} IDs per request")
+        data = self._get("/artists", params={"ids": ",".join(spotify_ids)})
+        if data is None:
+            return [None] * len(spotify_ids)
+        return data.get("artists", [])
+
+    def iter_artists(self, spotify_ids: Iterable[str]) -> Iterator[dict]:
+        """
+        Hydrate any number of artist IDs, MAX_IDS_PER_REQUEST per request.
+
+        Yields artist objects as each batch arrives, so callers can write
+        results back while later batches are still being fetched. IDs that
+        Spotify does not recognise are skipped, and malformed ones are never
+        sent, so they cannot fail the batch they would have been in.
+        """
+        batch = []
+        for spotify_id in spotify_ids:
+            if not is_spotify_id(spotify_id):
+                logger.debug(f"Skipping malformed Spotify ID {spotify_id!r}")
+                continue
+            batch.append(spotify_id)
+            if len(batch) == MAX_IDS_PER_REQUEST:
+                yield from filter(None, self.get_artists(batch))
+                batch = []
+        if batch:
+            yield from filter(None, self.get_artists(batch))
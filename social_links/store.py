@@ -0,0 +1,284 @@
+"""
+Canonical columnar artist store.
+
+One Parquet file per category (rappers, female_singers, dj_producers),
+laid out hive-style so the whole store also reads as a single dataset:
+
+    artist_store/category=rappers/data.parquet
+    artist_store/category=female_singers/data.parquet
+    artist_store/category=dj_producers/data.parquet
+
+Enrichment scripts read and write these instead of handing CSVs to each
+other. Reads take a column list, so a script that only touches the social
+columns never parses the ~190 Soundcharts columns. Writes go to a temp
+file first and are moved into place, so a crash never leaves a half-written
+partition. The social schema columns are always stored as strings, which
+means no script has to guess dtypes again. Excel is produced from here
+only as a final export (see export_excel).
+
+The first time a script runs against an empty partition it seeds it from
+the CSV it used to read (import_csv), so existing files migrate themselves.
+
+Requires pyarrow:
+    pip install pyarrow
+
+Usage:
+    store = ArtistStore()
+    store.import_csv("rappers", "rappers_enriched.csv")
+    df = store.read("rappers", columns=["artist_name", "instagram_url"])
+    store.write_columns("rappers", df)
+    store.merge("dj_producers", checkpoint.to_frame(COLUMNS))
+    df = store.join_by_name("rappers", soundcharts_df, name_col="Artist")
+
+    python -m social_links.store import rappers rappers_enriched.csv
+    python -m social_links.store export rappers "Final_Social Links/rappers_final.xlsx"
+"""
+
+import argparse
+import os
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from social_links.excel_export import StreamingWorkbook, frame_rows
+from social_links.names import normalize_names
+
+CATEGORIES = ("rappers", "female_singers", "dj_producers")
+
+# Next to the social_links package, so every script shares one store
+# whatever directory it is run from
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artist_store")
+
+# The enrichment schema shared by every category; always stored as strings
+COLUMNS = [
+    "artist_name", "soundcharts_uuid", "spotify_id",
+    "instagram_url", "instagram_handle",
+    "tiktok_url", "tiktok_handle",
+    "youtube_url", "youtube_channel_id",
+    "soundcloud_url", "soundcloud_handle",
+    "twitter_url", "twitter_handle",
+    "facebook_url", "website_url",
+    "lookup_status", "error_message",
+]
+
+# Columns of the "Social Links" export sheet
+SOCIAL_LINK_COLUMNS = [
+    "artist_name", "instagram_url", "instagram_handle", "tiktok_url", "tiktok_handle",
+    "youtube_url", "youtube_channel_id", "soundcloud_url", "soundcloud_handle",
+    "twitter_url", "twitter_handle", "facebook_url", "website_url",
+]
+
+
+def artist_keys(df: pd.DataFrame) -> pd.Series:
+    """Key per row: the Soundcharts uuid, else "name:" + the normalised name."""
+    names = "name:" + normalize_names(df["artist_name"]).fillna("")
+    if "soundcharts_uuid" not in df.columns:
+        return names
+    uuids = df["soundcharts_uuid"].astype("string").str.strip()
+    return uuids.where(uuids.notna() & ~uuids.isin(["", "nan", "None"]), names).astype(object)
+
+
+class ArtistStore:
+    """Parquet-backed artist tables, one partition per category."""
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+
+    def path(self, category: str) -> str:
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown category {category!r}; expected one of {CATEGORIES}")
+        return os.path.join(self.root, f"category={category}", "data.parquet")
+
+    def exists(self, category: str) -> bool:
+        return os.path.exists(self.path(category))
+
+    # -----------------------------------------------------------------------
+    # Reading
+    # -----------------------------------------------------------------------
+
+    def columns(self, category: str) -> list[str]:
+        """Column names of a partition, from the Parquet footer only."""
+        return pq.read_schema(self.path(category)).names
+
+    def read(self, category: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Load a category, optionally projecting to `columns`.
+
+        Rows come back in stored order with a 0..n-1 index, which is what
+        write_columns() matches on. Missing values are None/NaN as with read_csv.
+        """
+        if not self.exists(category):
+            return pd.DataFrame(columns=columns or COLUMNS)
+        if columns is not None:
+            available = set(self.columns(category))
+            missing = [c for c in columns if c not in available]
+            columns = [c for c in columns if c in available]
+        table = pq.read_table(self.path(category), columns=columns)
+        df = table.to_pandas()
+        if columns is not None:
+            for col in missing:
+                df[col] = None
+        return df
+
+    def join_by_name(self, category: str, df: pd.DataFrame, name_col: str = "Artist",
+                     columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Copy of `df` (e.g. a Soundcharts export) with stored `columns` joined
+        on by normalised artist name.
+
+        Only artist_name and `columns` are read. A column `df` already has
+        keeps its own value where the store has none; the first stored row
+        wins when a name is stored twice.
+        """
+        columns = columns or COLUMNS[1:]
+        stored = self.read(category, columns=["artist_name", *columns])
+        stored.index = normalize_names(stored["artist_name"])
+        stored = stored[stored.index.notna() & ~stored.index.duplicated()]
+        keys = normalize_names(df[name_col])
+        df = df.copy()
+        for col in columns:
+            values = keys.map(stored[col])
+            df[col] = values.where(values.notna(), df[col]) if col in df.columns else values
+        return df
+
+    # -----------------------------------------------------------------------
+    # Writing
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _to_table(df: pd.DataFrame) -> pa.Table:
+        df = df.reset_index(drop=True)
+        for col in df.columns:
+            # Schema columns, and any text column with mixed values, as strings
+            if col in COLUMNS or df[col].dtype == object:
+                df[col] = df[col].astype(object).where(df[col].isna(), df[col].astype(str))
+                df[col] = df[col].where(df[col].notna(), None)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # All-empty columns would otherwise be stored with Arrow's null type
+        for i, field in enumerate(table.schema):
+            if field.name in COLUMNS or pa.types.is_null(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+        return table
+
+    def write(self, category: str, df: pd.DataFrame):
+        """Replace a whole partition atomically."""
+        path = self.path(category)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        pq.write_table(self._to_table(df), tmp, compression="zstd")
+        os.replace(tmp, path)
+
+    def write_columns(self, category: str, df: pd.DataFrame):
+        """
+        Replace just the columns in `df`, matching rows by index.
+
+        For scripts that read a projection, edit it, and write it back; the
+        columns they did not read are carried over from the stored file.
+        """
+        full = self.read(category)
+        if len(df) != len(full):
+            raise ValueError(f"{category}: expected {len(full)} rows, got {len(df)}")
+        for col in df.columns:
+            full[col] = df[col].values
+        self.write(category, full)
+
+    def merge(self, category: str, rows: pd.DataFrame) -> tuple[int, int]:
+        """
+        Upsert enrichment results into a partition, matching rows by artist_keys().
+
+        A matched row takes the cells `rows` has a value for and keeps its
+        stored value where `rows` is empty, so links other scripts filled in
+        (MusicBrainz, Wikidata) survive a rerun, as do columns `rows` lacks.
+        Unmatched rows are appended. Returns (updated, added).
+        """
+        if not self.exists(category):
+            self.write(category, rows)
+            return 0, len(rows)
+        full = self.read(category)
+        keys = artist_keys(full)
+        first = ~keys.duplicated()
+        position = pd.Series(full.index[first], index=keys[first].to_numpy())
+
+        rows = rows.reset_index(drop=True)
+        row_keys = artist_keys(rows)
+        rows = rows[~row_keys.duplicated(keep="last")]
+        target = row_keys[rows.index].map(position)
+        matched = target.notna()
+
+        updates = rows[matched]
+        targets = target[matched].astype(int).to_numpy()
+        for col in rows.columns:
+            if col not in full.columns:
+                full[col] = None
+            has_value = updates[col].notna().to_numpy()
+            if has_value.any():
+                full.loc[targets[has_value], col] = updates[col].to_numpy()[has_value]
+
+        added = rows[~matched]
+        if len(added):
+            full = pd.concat([full, added], ignore_index=True)
+        self.write(category, full)
+        return int(matched.sum()), len(added)
+
+    def append(self, category: str, rows: pd.DataFrame):
+        """Add rows to a partition; columns not in `rows` are left empty."""
+        if not self.exists(category):
+            self.write(category, rows)
+            return
+        self.write(category, pd.concat([self.read(category), rows], ignore_index=True))
+
+    def import_csv(self, category: str, csv_path: str) -> int:
+        """
+        One-off migration from the CSV a script used to read. Only runs when
+        the partition does not exist yet, so it is safe to call on every start.
+        Returns rows imported.
+        """
+        if self.exists(category) or not os.path.exists(csv_path):
+            return 0
+        dtypes = {col: str for col in COLUMNS}
+        df = pd.read_csv(csv_path, dtype=dtypes, low_memory=False)
+        self.write(category, df)
+        return len(df)
+
+    # -----------------------------------------------------------------------
+    # Final export
+    # -----------------------------------------------------------------------
+
+    def export_excel(self, category: str, output_path: str,
+                     social_columns: list[str] = SOCIAL_LINK_COLUMNS) -> int:
+        """Write 'All Data' + 'Social Links' sheets with the streaming writer."""
+        df = self.read(category)
+        with StreamingWorkbook(output_path) as wb:
+            wb.add_sheet("All Data", *frame_rows(df))
+            wb.add_sheet("Social Links", *frame_rows(df.reindex(columns=social_columns)))
+        return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import CSVs into / export Excel from the artist store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Seed a category from a CSV (replaces it with --force)")
+    imp.add_argument("category", choices=CATEGORIES)
+    imp.add_argument("csv_path")
+    imp.add_argument("--force", action="store_true")
+    exp = sub.add_parser("export", help="Write a category to a two-sheet .xlsx")
+    exp.add_argument("category", choices=CATEGORIES)
+    exp.add_argument("output_path")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    store = ArtistStore(args.root)
+    if args.command == "import":
+        if args.force and store.exists(args.category):
+            os.remove(store.path(args.category))
+        n = store.import_csv(args.category, args.csv_path)
+        print(f"Imported {n} rows into {store.path(args.category)}")
+    else:
+        n = store.export_excel(args.category, args.output_path)
+        print(f"Exported {n} rows to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Offline Wikidata social identifiers, joined on spotify_id.
+
+Wikidata links Spotify artist IDs (P1902) to the artist's accounts:
+
+    P2003 Instagram username     P7085 TikTok username
+    P2397 YouTube channel ID     P2002 X (Twitter) username
+    P2013 Facebook username      P3040 SoundCloud ID
+    P856  official website
+
+ingest() streams a Wikidata JSON dump (latest-all.json.gz / .bz2, or any
+JSONL subset of one) and keeps only entities with a Spotify ID. Lines
+without "P1902" are skipped before being parsed, which is what makes a pass
+over the full dump practical. The result is a small Parquet index with one
+row per Spotify ID.
+
+join_social_columns() then fills the social schema for every row with a
+known spotify_id in one merge against that index, before any rate-limited
+API is asked. Like the other fill helpers, it only writes empty cells.
+URLs are built from the identifiers with the canonical profile prefixes in
+social_links.handles.
+
+Requires pyarrow:
+    pip install pyarrow
+
+Usage:
+    python -m social_links.wikidata ingest latest-all.json.gz
+    python -m social_links.wikidata join rappers
+
+    filled = join_social_columns(df)   # {"instagram_url": 1204, ...}
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from social_links.handles import PROFILE_URLS
+
+logger = logging.getLogger(__name__)
+
+# Next to the social_links package, so every script shares one index
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wikidata_social.parquet")
+
+SPOTIFY_PROPERTY = "P1902"
+
+# Wikidata property -> index column
+PROPERTIES = {
+    "P2003": "instagram_handle",
+    "P7085": "tiktok_handle",
+    "P2397": "youtube_channel_id",
+    "P2002": "twitter_handle",
+    "P2013": "facebook_handle",
+    "P3040": "soundcloud_handle",
+    "P856": "website_url",
+}
+INDEX_COLUMNS = ["spotify_id", "wikidata_id", *PROPERTIES.values()]
+
+# Social column -> (index column, profile URL prefix or None to copy as-is)
+FILL_COLUMNS = {
+    "instagram_handle": ("instagram_handle", None),
+    "instagram_url": ("instagram_handle", PROFILE_URLS["instagram"]),
+    "tiktok_handle": ("tiktok_handle", None),
+    "tiktok_url": ("tiktok_handle", PROFILE_URLS["tiktok"]),
+    "youtube_channel_id": ("youtube_channel_id", None),
+    "youtube_url": ("youtube_channel_id", PROFILE_URLS["youtube"] + "channel/"),
+    "twitter_handle": ("twitter_handle", None),
+    "twitter_url": ("twitter_handle", PROFILE_URLS["twitter"]),
+    "soundcloud_handle": ("soundcloud_handle", None),
+    "soundcloud_url": ("soundcloud_handle", PROFILE_URLS["soundcloud"]),
+    "facebook_url": ("facebook_handle", PROFILE_URLS["facebook"]),
+    "website_url": ("website_url", None),
+}
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open}
+_RANK_ORDER = {"preferred": 0, "normal": 1}
+
+
+def _open_lines(source: str) -> Iterator[bytes]:
+    opener = _OPENERS.get(os.path.splitext(source)[1], open)
+    with opener(source, "rb") as f:
+        yield from f
+
+
+def _claim_values(entity: dict, prop: str) -> list[str]:
+    """String values of a property, preferred rank first, deprecated ones dropped."""
+    claims = [
+        c for c in entity.get("claims", {}).get(prop, [])
+        if c.get("rank") in _RANK_ORDER and c.get("mainsnak", {}).get("snaktype") == "value"
+    ]
+    claims.sort(key=lambda c: _RANK_ORDER[c["rank"]])
+    values = []
+    for claim in claims:
+        value = claim["mainsnak"].get("datavalue", {}).get("value")
+        if isinstance(value, str) and value not in values:
+            values.append(value)
+    return values
+
+
+def entity_rows(entity: dict) -> list[dict]:
+    """Index rows for one Wikidata entity: one per Spotify artist ID it carries."""
+    spotify_ids = _claim_values(entity, SPOTIFY_PROPERTY)
+    if not spotify_ids:
+        return []
+    ids = {}
+    for prop, col in PROPERTIES.items():
+        values = _claim_values(entity, prop)
+        ids[col] = values[0] if values else None
+    return [{"spotify_id": sid, "wikidata_id": entity.get("id"), **ids} for sid in spotify_ids]
+
+
+def ingest(source: str, path: str = DEFAULT_PATH) -> int:
+    """
+    Build the index from a dump (the JSON array with one entity per line, or
+    JSONL), replacing any index at `path` once done. Returns rows written.
+    """
+    marker = f'"{SPOTIFY_PROPERTY}"'.encode()
+    rows = []
+    scanned = 0
+    started = time.monotonic()
+    for line in _open_lines(source):
+        scanned += 1
+        if scanned % 1_000_000 == 0:
+            logger.info(f"Scanned {scanned:,} entities, {len(rows):,} with a Spotify ID "
+                        f"({time.monotonic() - started:.0f}s)")
+        if marker not in line:
+            continue
+        # The full dump is one JSON array: "[", then "{...}," per line, then "]"
+        line = line.strip().rstrip(b",")
+        if not line.startswith(b"{"):
+            continue
+        rows.extend(entity_rows(json.loads(line)))
+
+    df = pd.DataFrame(rows, columns=INDEX_COLUMNS).drop_duplicates("spotify_id")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.cast(pa.schema([pa.field(col, pa.string()) for col in INDEX_COLUMNS]))
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return len(df)
+
+
+def load_index(path: str = DEFAULT_PATH) -> pd.DataFrame:
+    return pd.read_parquet(path, columns=INDEX_COLUMNS)
+
+
+def load_existing_index(path: str = DEFAULT_PATH) -> Optional[pd.DataFrame]:
+    """The index at `path`, or None if it has not been ingested."""
+    return load_index(path) if os.path.exists(path) else None
+
+
+def join_social_columns(df: pd.DataFrame, index: Optional[pd.DataFrame] = None,
+                        spotify_col: str = "spotify_id",
+                        rows=None) -> dict[str, int]:
+    """
+    Fill empty social cells of `df` in place from the Wikidata index.
+
+    Rows are matched on `spotify_col`; `rows` (a boolean mask aligned with
+    `df`) limits which rows may be touched. Columns of FILL_COLUMNS that
+    `df` lacks are skipped. Returns cells filled per column.
+    """
+    if index is None:
+        index = load_index()
+    keys = df[spotify_col].astype("string").str.strip()
+    if rows is not None:
+        keys = keys.where(rows)
+    matched = pd.DataFrame({"spotify_id": keys}).merge(
+        index, on="spotify_id", how="left", validate="many_to_one"
+    )
+    matched.index = df.index
+
+    filled = {}
+    for col, (source_col, prefix) in FILL_COLUMNS.items():
+        if col not in df.columns:
+            continue
+        values = matched[source_col]
+        if prefix is not None:
+            values = prefix + values
+        hit = values.notna() & df[col].isna()
+        if hit.any():
+            df[col] = df[col].mask(hit, values)
+        filled[col] = int(hit.sum())
+    return filled
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Build or apply the Wikidata social-ID index")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ing = sub.add_parser("ingest", help="Extract Spotify-keyed social IDs from a Wikidata dump")
+    ing.add_argument("source")
+    join = sub.add_parser("join", help="Fill a category of the artist store from the index")
+    join.add_argument("category")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        n = ingest(args.source, args.path)
+        print(f"Wrote {n:,} Spotify IDs to {args.path}")
+        return
+
+    from social_links.store import ArtistStore
+
+    store = ArtistStore()
+    columns = ["spotify_id", *FILL_COLUMNS]
+    df = store.read(args.category, columns=columns)
+    filled = join_social_columns(df, load_index(args.path))
+    store.write_columns(args.category, df)
+    for col, n in filled.items():
+        print(f"  {col:<20} {n:>8,}")
+    print(f"Filled {sum(filled.values()):,} cells in {store.path(args.category)}")
+
+
+if __name__ == "__main__":
+    main()
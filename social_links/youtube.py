@@ -0,0 +1,131 @@
+"""
+YouTube Data API v3 client.
+
+Search costs 100 quota units against a 10,000 unit daily budget, so callers
+should only search when youtube_url is missing, and should queue searches
+through social_links.youtube_quota rather than spend them inline.
+"""
+
+import logging
+from typing import Optional
+
+from social_links import http_client
+from social_links.youtube_quota import LIST_COST, QUOTA_REASONS, SEARCH_COST, QuotaLedger
+
+logger = logging.getLogger(__name__)
+
+API_BASE = "https://www.googleapis.com/youtube/v3"
+
+
+class YouTubeClient:
+    """
+    Finds an artist's official channel, skipping auto-generated topic channels.
+
+    With a `ledger` (social_links.youtube_quota.QuotaLedger) every request is
+    charged to the key's Pacific-day budget, shared across runs and scripts,
+    and searching stops once fewer than SEARCH_COST units are left.
+    list_channels() costs 1 unit, so it keeps working after searches stop.
+    """
+
+    def __init__(self, api_key: str, ledger: Optional[QuotaLedger] = None):
+        if not api_key:
+            raise ValueError("YOUTUBE_API_KEY is required in .env")
+        self.api_key = api_key
+        self.ledger = ledger
+        self._exhausted = False
+
+    def _can_spend(self, units: int) -> bool:
+        if self.ledger is not None:
+            # Re-read each time, so a long run picks the new day up by itself
+            return self.ledger.remaining(self.api_key) >= units
+        return not self._exhausted
+
+    @property
+    def quota_exhausted(self) -> bool:
+        """True once there is not enough quota left for a search."""
+        return not self._can_spend(SEARCH_COST)
+
+    def _get(self, endpoint: str, params: dict, cost: int) -> Optional[dict]:
+        # None if the request was not made (quota spent) or failed
+        if not self._can_spend(cost):
+            return None
+        try:
+            resp = http_client.get(f"{API_BASE}/{endpoint}", params={**params, "key": self.api_key})
+        except Exception as e:
+            logger.debug(f"YouTube {endpoint} error: {e}")
+            return None
+        if resp.status_code == 403:
+            reason = _error_reason(resp)
+            if reason not in QUOTA_REASONS:
+                # keyInvalid, accessNotConfigured, forbidden, ...: not the quota
+                logger.error(f"YouTube {endpoint} refused: 403 {reason or 'without a reason'}")
+                return None
+            logger.warning("YouTube API quota exhausted — pausing YouTube requests until it resets")
+            self._exhausted = True
+            if self.ledger is not None:
+                self.ledger.mark_exhausted(self.api_key)
+            return None
+        if self.ledger is not None:
+            self.ledger.charge(self.api_key, cost)
+        if not resp.ok:
+            logger.error(f"YouTube {endpoint} error: {resp.status_code}")
+            return None
+        return resp.json()
+
+    def search(self, artist_name: str) -> Optional[list[dict]]:
+        """
+        Raw channel search hits for an artist; None if the search was not
+        made (quota spent) or failed, as opposed to [] for no hits.
+        """
+        data = self._get("search", {
+            "part": "snippet",
+            "q": f"{artist_name} official artist",
+            "type": "channel",
+            "maxResults": 3,
+        }, SEARCH_COST)
+        return None if data is None else data.get("items", [])
+
+    def list_channels(self, **params) -> Optional[list[dict]]:
+        """
+        channels.list by forHandle, forUsername or up to 50 comma-separated
+        ids, at 1 unit per call. None if not made or failed.
+        """
+        data = self._get("channels", {"part": "id", **params}, LIST_COST)
+        return None if data is None else data.get("items", [])
+
+    @staticmethod
+    def pick_channel(items: list[dict], artist_name: str) -> Optional[dict]:
+        """The artist's channel among search hits, as a dict with url and channel_id."""
+        # Prefer channels whose title closely matches the artist name
+        name_lower = artist_name.lower()
+        for item in items:
+            title = item["snippet"]["title"].lower()
+            if " - topic" in title:
+                continue
+            if name_lower in title or title in name_lower:
+                return _channel(item["snippet"]["channelId"])
+
+        # Fall back to first non-topic result
+        for item in items:
+            if " - topic" not in item["snippet"]["title"].lower():
+                return _channel(item["snippet"]["channelId"])
+        return None
+
+    def search_channel(self, artist_name: str) -> Optional[dict]:
+        """
+        Search for an artist's YouTube channel.
+        Returns dict with url and channel_id, or None.
+        """
+        items = self.search(artist_name)
+        return self.pick_channel(items, artist_name) if items else None
+
+
+def _error_reason(resp) -> Optional[str]:
+    try:
+        return resp.json()["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def _channel(channel_id: str) -> dict:
+    return {"url": f"https://www.youtube.com/channel/{channel_id}", "channel_id": channel_id}
@@ -0,0 +1,178 @@
+"""
+Resolve stored YouTube handles to canonical UC channel IDs.
+
+fill_handles() can only take a channel ID out of a /channel/UC... URL; for
+/@handle, /c/name and /user/name links it stores "@handle", "c/name" or
+"user/name" in youtube_channel_id instead. Those are not channel IDs, and
+looking the artist up again through search costs 100 quota units.
+channels.list answers the same question for 1 unit:
+
+    @handle     forHandle=@handle
+    user/name   forUsername=name, then forHandle=@name
+    c/name      forHandle=@name, then forUsername=name
+                (custom URLs have no lookup of their own; most became
+                handles of the same name)
+
+Values that are already UC IDs can be verified 50 per call with id=.
+
+Answers, including "no such channel", are cached in SQLite by the stored
+value, so a value is only ever looked up once per CACHE_TTL. rewrite()
+replaces a whole column in one pass: every distinct value is resolved once,
+then mapped back onto the rows. Values that can't be resolved are kept as
+they are.
+
+Usage:
+    resolver = ChannelResolver(YouTubeClient(api_key, ledger=QuotaLedger()))
+    counts = resolver.rewrite(df)   # {"resolved": 812, "unresolved": 23, ...}
+
+    python -m social_links.youtube_channels female_singers
+    python -m social_links.youtube_channels rappers --verify
+"""
+
+import argparse
+import logging
+import os
+import re
+from typing import Iterable, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from social_links.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Next to the social_links package, so every script shares one cache
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "youtube_channels.sqlite")
+CACHE_TTL = 90 * 86400
+
+# channels.list takes at most this many ids per call
+VERIFY_BATCH = 50
+
+CHANNEL_ID = re.compile(r"^UC[A-Za-z0-9_-]{22}$")
+
+
+def is_channel_id(value) -> bool:
+    return isinstance(value, str) and CHANNEL_ID.match(value) is not None
+
+
+def _lookups(value: str) -> list[dict]:
+    """channels.list parameters to try, in order, for a stored identifier."""
+    if value.startswith("@"):
+        return [{"forHandle": value}]
+    kind, _, name = value.partition("/")
+    if kind == "user" and name:
+        return [{"forUsername": name}, {"forHandle": f"@{name}"}]
+    if kind == "c" and name:
+        return [{"forHandle": f"@{name}"}, {"forUsername": name}]
+    return []
+
+
+class ChannelResolver:
+    """Maps @handle / c/ / user/ values to UC IDs through cached channels.list calls."""
+
+    def __init__(self, client, cache: Optional[TTLCache] = None):
+        self.client = client
+        self.cache = cache if cache is not None else TTLCache(CACHE_PATH, table="youtube_channels", ttl=CACHE_TTL)
+        self.requests = 0
+
+    def _list(self, **params) -> Optional[list[dict]]:
+        items = self.client.list_channels(**params)
+        if items is not None:
+            self.requests += 1
+        return items
+
+    def resolve_one(self, value: str) -> Optional[str]:
+        """UC ID for one stored value, or None. Failed requests are not cached."""
+        if is_channel_id(value):
+            return value
+        cached = self.cache.get(value)
+        if cached is not None:
+            return cached["channel_id"]
+        for params in _lookups(value):
+            items = self._list(**params)
+            if items is None:
+                return None
+            if items:
+                self.cache[value] = {"channel_id": items[0]["id"]}
+                return items[0]["id"]
+        self.cache[value] = {"channel_id": None}
+        return None
+
+    def resolve(self, values: Iterable[str]) -> dict[str, Optional[str]]:
+        """{value: UC ID or None} for every distinct value."""
+        return {value: self.resolve_one(value) for value in dict.fromkeys(values)}
+
+    def verify(self, channel_ids: Iterable[str]) -> set[str]:
+        """The UC IDs among `channel_ids` that YouTube still knows, 50 per call."""
+        ids = list(dict.fromkeys(channel_ids))
+        existing = set()
+        for start in range(0, len(ids), VERIFY_BATCH):
+            items = self._list(id=",".join(ids[start:start + VERIFY_BATCH]))
+            if items is None:
+                # Unverified IDs are kept, not reported as gone
+                existing.update(ids[start:])
+                break
+            existing.update(item["id"] for item in items)
+        return existing
+
+    def rewrite(self, df: pd.DataFrame, col: str = "youtube_channel_id", verify: bool = False) -> dict[str, int]:
+        """
+        Replace handle-style values of `col` with UC IDs in place.
+
+        With `verify`, UC IDs already in the column are checked too and the
+        count of ones YouTube no longer knows is reported (they are left in
+        place). Returns counts: resolved, unresolved, and invalid if verified.
+        """
+        values = df[col].astype("string").str.strip()
+        is_id = values.str.match(CHANNEL_ID.pattern).fillna(False).astype(bool)
+        todo = values.notna() & ~is_id
+
+        resolved = pd.Series(self.resolve(values[todo].unique()), dtype=object)
+        mapped = values[todo].map(resolved)
+        hit = mapped.notna()
+        df.loc[mapped.index[hit], col] = mapped[hit]
+        self.cache.flush()
+
+        counts = {"resolved": int(hit.sum()), "unresolved": int((~hit).sum())}
+        if verify:
+            known = values[is_id]
+            existing = self.verify(known.unique())
+            counts["invalid"] = int((~known.isin(existing)).sum())
+        return counts
+
+    def stats(self) -> str:
+        return f"youtube channels: {self.requests} channels.list calls; {self.cache.stats()}"
+
+    def close(self):
+        self.cache.close()
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Rewrite youtube_channel_id of a category to UC channel IDs")
+    parser.add_argument("category")
+    parser.add_argument("--verify", action="store_true", help="Also check stored UC IDs, 50 per call")
+    args = parser.parse_args()
+
+    from social_links.store import ArtistStore
+    from social_links.youtube import YouTubeClient
+    from social_links.youtube_quota import QuotaLedger
+
+    api_key = os.getenv("YOUTUBE_API_KEY")
+    with QuotaLedger() as ledger:
+        resolver = ChannelResolver(YouTubeClient(api_key, ledger=ledger))
+        store = ArtistStore()
+        df = store.read(args.category, columns=["youtube_channel_id"])
+        counts = resolver.rewrite(df, verify=args.verify)
+        if counts["resolved"]:
+            store.write_columns(args.category, df)
+        print(", ".join(f"{n:,} {name}" for name, n in counts.items()))
+        print(resolver.stats())
+        print(ledger.stats(api_key))
+        resolver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+YouTube Data API quota accounting and search scheduling.
+
+A key gets 10,000 units a day and a channel search costs 100 of them, so
+one key resolves about 100 artists a day. The quota resets at midnight
+Pacific time, not at local midnight.
+
+QuotaLedger stores the units spent per key per Pacific day in SQLite, so
+every script and every run sees the same budget. Keys are identified by a
+hash and never stored. YouTubeClient charges each request to it and stops
+searching once the day's budget is spent, or once Google answers
+quotaExceeded.
+
+YouTubeScheduler decides who gets those searches. Scripts queue artists that
+lack a YouTube channel, together with a value (Spotify followers), instead of
+searching them inline. run() then searches the queue highest value first and
+pauses when the budget is gone. It either returns, leaving the rest queued
+for the next run, or with wait=True sleeps until the quota resets and carries
+on. Searched artists are never searched again, so a resumed run goes
+straight to the next pending artist. apply() copies the channels found into
+any frame with artist_name / soundcharts_uuid columns, filling empty cells
+only.
+
+Usage:
+    ledger = QuotaLedger()
+    youtube = YouTubeClient(api_key, ledger=ledger)
+    scheduler = YouTubeScheduler(youtube, "rappers")
+    scheduler.enqueue("Lil Baby", uuid, value=followers)
+    scheduler.run()
+    scheduler.apply(df)
+
+    python -m social_links.youtube_quota status
+    python -m social_links.youtube_quota run rappers --wait
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from social_links.names import normalize_name
+from social_links.store import artist_keys
+
+logger = logging.getLogger(__name__)
+
+# Next to the social_links package, so every script shares one ledger
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "youtube_quota.sqlite")
+
+DAILY_QUOTA = 10_000
+SEARCH_COST = 100
+LIST_COST = 1
+
+# Quota days start at midnight in this zone
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+# error.errors[].reason values of a 403 that mean the quota is spent
+QUOTA_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+
+PENDING = "pending"
+FOUND = "found"
+NOT_FOUND = "not_found"
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """The Pacific-time date quota is being charged to, e.g. "2026-10-16"."""
+    return (now or datetime.now(QUOTA_TZ)).astimezone(QUOTA_TZ).date().isoformat()
+
+
+def seconds_until_reset(now: Optional[datetime] = None) -> float:
+    now = (now or datetime.now(QUOTA_TZ)).astimezone(QUOTA_TZ)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), QUOTA_TZ)
+    return (midnight - now).total_seconds()
+
+
+def key_id(api_key: str) -> str:
+    """Stable identifier for an API key that does not reveal it."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class QuotaLedger:
+    """Units spent per API key per Pacific day; every write is committed."""
+
+    def __init__(self, path: str = DEFAULT_PATH, daily_quota: int = DAILY_QUOTA):
+        self.path = path
+        self.daily_quota = daily_quota
+        self._conn = _connect(path)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_units (key_id TEXT NOT NULL, day TEXT NOT NULL, "
+            "units INTEGER NOT NULL, PRIMARY KEY (key_id, day))"
+        )
+        self._conn.commit()
+
+    def spent(self, api_key: str, day: Optional[str] = None) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT units FROM quota_units WHERE key_id = ? AND day = ?",
+                (key_id(api_key), day or quota_day()),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, api_key: str) -> int:
+        return max(self.daily_quota - self.spent(api_key), 0)
+
+    def charge(self, api_key: str, units: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO quota_units VALUES (?, ?, ?) "
+                "ON CONFLICT (key_id, day) DO UPDATE SET units = units + excluded.units",
+                (key_id(api_key), quota_day(), units),
+            )
+            self._conn.commit()
+
+    def mark_exhausted(self, api_key: str):
+        """Google says the quota is gone: book the rest of the day as spent."""
+        remaining = self.remaining(api_key)
+        if remaining:
+            self.charge(api_key, remaining)
+
+    def usage(self) -> list[tuple[str, str, int]]:
+        """(key_id, day, units) for every key and day on record, newest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key_id, day, units FROM quota_units ORDER BY day DESC, key_id"
+            ).fetchall()
+
+    def stats(self, api_key: str) -> str:
+        return f"youtube quota: {self.spent(api_key):,} of {self.daily_quota:,} units used on {quota_day()} (PT)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class YouTubeScheduler:
+    """Persistent queue of channel searches for one category, spent by value."""
+
+    def __init__(self, client, category: str, path: str = DEFAULT_PATH, wait: bool = False):
+        self.client = client
+        self.category = category
+        self.wait = wait
+        self._conn = _connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS youtube_queue (category TEXT NOT NULL, artist_key TEXT NOT NULL, "
+            "artist_name TEXT NOT NULL, value REAL NOT NULL, status TEXT NOT NULL, channel_id TEXT, "
+            "searched_on TEXT, PRIMARY KEY (category, artist_key))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS youtube_queue_pending ON youtube_queue (category, status, value)"
+        )
+        self._conn.commit()
+
+    def enqueue(self, artist_name: str, soundcharts_uuid: Optional[str] = None, value: float = 0):
+        """Queue one artist; an artist already queued keeps its place, at the higher value."""
+        uuid = str(soundcharts_uuid).strip() if soundcharts_uuid is not None else ""
+        key = uuid if uuid not in ("", "nan", "None") else f"name:{normalize_name(artist_name)}"
+        self._conn.execute(
+            "INSERT INTO youtube_queue (category, artist_key, artist_name, value, status) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (category, artist_key) "
+            "DO UPDATE SET value = max(value, excluded.value)",
+            (self.category, key, artist_name, float(value or 0), PENDING),
+        )
+        self._conn.commit()
+
+    def pending(self) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM youtube_queue WHERE category = ? AND status = ?", (self.category, PENDING)
+        ).fetchone()[0]
+
+    def _next(self) -> Optional[tuple[str, str]]:
+        return self._conn.execute(
+            "SELECT artist_key, artist_name FROM youtube_queue WHERE category = ? AND status = ? "
+            "ORDER BY value DESC, rowid LIMIT 1",
+            (self.category, PENDING),
+        ).fetchone()
+
+    def run(self, limit: Optional[int] = None) -> int:
+        """
+        Search pending artists, highest value first, until the queue is empty,
+        `limit` searches were made, or the quota is spent (then sleep until it
+        resets if `wait`, else stop). Returns searches made.
+        """
+        searched = 0
+        while limit is None or searched < limit:
+            job = self._next()
+            if job is None:
+                break
+            if self.client.quota_exhausted:
+                if not self.wait:
+                    logger.info(f"YouTube quota spent; {self.pending()} {self.category} searches "
+                                f"left for the next quota day")
+                    break
+                delay = seconds_until_reset() + 60
+                logger.info(f"YouTube quota spent; resuming {self.pending()} searches in {delay / 3600:.1f}h")
+                time.sleep(delay)
+                continue
+
+            key, artist_name = job
+            items = self.client.search(artist_name)
+            if items is None:
+                # Refused or failed: stays pending. A failure that isn't the
+                # quota also ends this run rather than spinning on it.
+                if not self.client.quota_exhausted:
+                    break
+                continue
+            channel = self.client.pick_channel(items, artist_name)
+            self._conn.execute(
+                "UPDATE youtube_queue SET status = ?, channel_id = ?, searched_on = ? "
+                "WHERE category = ? AND artist_key = ?",
+                (FOUND if channel else NOT_FOUND, channel and channel["channel_id"], quota_day(),
+                 self.category, key),
+            )
+            self._conn.commit()
+            searched += 1
+        return searched
+
+    def channels(self) -> pd.DataFrame:
+        """artist_key -> channel_id for every channel found so far."""
+        return pd.read_sql_query(
+            "SELECT artist_key, channel_id FROM youtube_queue WHERE category = ? AND status = ?",
+            self._conn, params=(self.category, FOUND),
+        )
+
+    def apply(self, df: pd.DataFrame, rows=None) -> int:
+        """
+        Fill empty youtube_url / youtube_channel_id cells of `df` in place with
+        the channels found, and tag lookup_status. `rows` (a boolean mask
+        aligned with `df`) limits which rows may be touched. Returns rows filled.
+        """
+        found = self.channels().set_index("artist_key")["channel_id"]
+        channel = artist_keys(df).map(found)
+        hit = channel.notna() & df["youtube_url"].isna()
+        if rows is not None:
+            hit &= rows
+        if not hit.any():
+            return 0
+        df.loc[hit, "youtube_url"] = "https://www.youtube.com/channel/" + channel[hit]
+        df.loc[hit & df["youtube_channel_id"].isna(), "youtube_channel_id"] = channel
+        if "lookup_status" in df.columns:
+            status = df.loc[hit, "lookup_status"]
+            df.loc[hit, "lookup_status"] = (status + ",youtube_api").where(status.notna(), "youtube_api")
+        return int(hit.sum())
+
+    def stats(self) -> str:
+        counts = dict(self._conn.execute(
+            "SELECT status, COUNT(*) FROM youtube_queue WHERE category = ? GROUP BY status", (self.category,)
+        ).fetchall())
+        return (f"youtube queue ({self.category}): {counts.get(FOUND, 0)} found, "
+                f"{counts.get(NOT_FOUND, 0)} not found, {counts.get(PENDING, 0)} pending")
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="YouTube quota ledger and queued channel searches")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Print units spent per key and day, and the queues")
+    run = sub.add_parser("run", help="Spend today's quota on a category's queue and update the store")
+    run.add_argument("category")
+    run.add_argument("--wait", action="store_true", help="Sleep through quota resets until the queue is empty")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        with QuotaLedger(args.path) as ledger:
+            for key, day, units in ledger.usage():
+                print(f"{day}  key {key}  {units:>6,} units")
+        conn = _connect(args.path)
+        try:
+            queues = conn.execute(
+                "SELECT category, status, COUNT(*) FROM youtube_queue GROUP BY category, status"
+            ).fetchall()
+        except sqlite3.OperationalError:  # nothing queued yet
+            queues = []
+        for category, status, n in queues:
+            print(f"{category:<16} {status:<10} {n:>8,}")
+        conn.close()
+        return
+
+    from social_links.store import ArtistStore
+    from social_links.youtube import YouTubeClient
+
+    api_key = os.getenv("YOUTUBE_API_KEY")
+    ledger = QuotaLedger(args.path)
+    scheduler = YouTubeScheduler(YouTubeClient(api_key, ledger=ledger), args.category, args.path, wait=args.wait)
+    searched = scheduler.run()
+
+    store = ArtistStore()
+    df = store.read(args.category, columns=["artist_name", "soundcharts_uuid", "youtube_url",
+                                            "youtube_channel_id", "lookup_status"])
+    filled = scheduler.apply(df)
+    if filled:
+        store.write_columns(args.category, df)
+    print(f"{searched} searches, {filled} rows filled in {store.path(args.category)}")
+    print(scheduler.stats())
+    print(ledger.stats(api_key))
+    scheduler.close()
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,27 @@
 # ===== Social Links Pipeline (Resume + Cache + Parallel) =====
 
+import asyncio
 import pandas as pd
-import requests
-import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import os
-import json
+from functools import partial
+
+from social_links import http_client
+from social_links.cache import SQLiteCache, TTLCache
+from social_links.checkpoint import CheckpointLog
+from social_links.dedup import plan_lookups
+from social_links.excel_export import frame_rows, replace_sheet
+from social_links.mb_replica import MBReplica
+from social_links.musicbrainz import (
+    MB_API_BASE, USER_AGENT, MusicBrainzClient, best_search_hit, links_from_artist, search_miss_reason,
+)
+from social_links.names import normalize_name, repair_mojibake
+from social_links.negative_cache import NegativeCache
+from social_links.rate_limit import configure as configure_rate_limit
+
+try:
+    from social_links.async_engine import AsyncEngine, lookup_musicbrainz
+except ImportError:  # aiohttp not installed
+    AsyncEngine = None
 
 file_paths = [
     "Final_Social Links/rappers_final_enriched (michelle ivanova's conflicted copy).xlsx",
@@ -13,73 +29,103 @@ file_paths = [
     "Final_Social Links/dj_producers_final.xlsx"
 ]
 
+# Normalised artist name (social_links.names) -> MBID. The old JSON cache is
+# imported on first run; its raw-name keys are still read as a fallback.
+MB_CACHE_DB = "musicbrainz_cache.sqlite"
 MB_CACHE_FILE = "musicbrainz_id_cache.json"
 
-if os.path.exists(MB_CACHE_FILE):
-    with open(MB_CACHE_FILE, "r") as f:
-        mb_id_cache = json.load(f)
-else:
-    mb_id_cache = {}
+# MBID -> full url-rels response, so reruns skip the second request too
+MB_RESPONSE_TTL = 30 * 86400
+MB_RESPONSE_CACHE_SIZE = 200_000
+
+# Local copy of the MusicBrainz artist dump (python -m social_links.mb_replica
+# ingest artist.tar.xz). When present, searches and url-rels are answered from
+# it and the API is only called for artists it doesn't have.
+MB_REPLICA_DB = "musicbrainz_replica.sqlite"
+
+# MusicBrainz allows 1 request/second per client. All worker threads share one
+# token bucket, so this is the combined rate across the whole pool.
+MB_RATE_LIMIT = 1.0
+MAX_WORKERS = 3
+
+# Use the asyncio engine (needs aiohttp) instead of the thread pool. With the
+# rate limiter doing the pacing, hundreds of lookups can wait in flight at once.
+USE_ASYNC = True
+MAX_IN_FLIGHT = 200
+
+# Artists MusicBrainz had no match for (below MIN_SCORE or no hits) are not
+# searched again until the entry expires; None uses the provider default
+MB_NEGATIVE_TTL = None
+
+configure_rate_limit("musicbrainz.org", MB_RATE_LIMIT)
+
+mb_id_cache = SQLiteCache(MB_CACHE_DB, table="mb_ids")
+mb_id_cache.import_json(MB_CACHE_FILE)
+mb_response_cache = TTLCache(
+    MB_CACHE_DB, table="mb_url_rels", ttl=MB_RESPONSE_TTL, max_entries=MB_RESPONSE_CACHE_SIZE
+)
+mb_negative_cache = NegativeCache("musicbrainz", ttl=MB_NEGATIVE_TTL)
+mb_replica = MBReplica.open_existing(MB_REPLICA_DB)
+
+def cached_mbid(artist_name):
+    key = normalize_name(artist_name)
+    mbid = mb_id_cache.get(key)
+    if mbid is None and key != artist_name:
+        # Entry written before keys were normalised: move it to the new key.
+        # Not counted, so one lookup is one hit or one miss in the stats
+        mbid = mb_id_cache.peek(artist_name)
+        if mbid is not None:
+            mb_id_cache[key] = mbid
+    return mbid
+
 
 def get_all_social_links(artist_name):
     try:
-        headers = {"User-Agent": "SocialLinkUpdater/1.0 (research)"}
+        headers = {"User-Agent": USER_AGENT}
 
-        if artist_name in mb_id_cache:
-            artist_id = mb_id_cache[artist_name]
-        else:
-            resp = requests.get(
-                "https://musicbrainz.org/ws/2/artist/",
-                params={"query": f'artist:"{artist_name}"', "fmt": "json", "limit": 1},
+        artist_id = cached_mbid(artist_name)
+        if artist_id is None:
+            hits = mb_replica.search(artist_name, limit=1) if mb_replica else []
+            if hits:
+                data = {"artists": hits}
+            elif artist_name in mb_negative_cache:
+                return None
+            else:
+                data = http_client.get_json(
+                    f"{MB_API_BASE}/artist/",
+                    params={"query": f'artist:"{repair_mojibake(artist_name)}"', "fmt": "json", "limit": 1},
+                    headers=headers,
+                    timeout=10
+                )
+            hit = best_search_hit(data or {})
+            if hit is None:
+                if data is not None:
+                    mb_negative_cache.record(artist_name, *search_miss_reason(data))
+                return None
+            artist_id = hit["id"]
+            mb_id_cache[normalize_name(artist_name)] = artist_id
+
+        artist = mb_replica.lookup(artist_id) if mb_replica else None
+        if artist is None:
+            artist = mb_response_cache.get(artist_id)
+        if artist is None:
+            artist = http_client.get_json(
+                f"{MB_API_BASE}/artist/{artist_id}",
+                params={"inc": "url-rels", "fmt": "json"},
                 headers=headers,
                 timeout=10
             )
-            data = resp.json()
-            if not data.get("artists") or data["artists"][0].get("score", 0) < 90:
+            if artist is None:
                 return None
-            artist_id = data["artists"][0]["id"]
-            mb_id_cache[artist_name] = artist_id
-            with open(MB_CACHE_FILE, "w") as f:
-                json.dump(mb_id_cache, f)
-
-        time.sleep(1.1)
-
-        resp = requests.get(
-            f"https://musicbrainz.org/ws/2/artist/{artist_id}",
-            params={"inc": "url-rels", "fmt": "json"},
-            headers=headers,
-            timeout=10
-        )
-
-        artist_country = data["artists"][0].get("country", "")
-        urls = {"artist_country": artist_country}
-        for rel in resp.json().get("relations", []):
-            url = rel.get("url", {}).get("resource", "")
-            if "instagram.com" in url and "instagram_url" not in urls:
-                urls["instagram_url"] = url
-                urls["instagram_handle"] = url.rstrip("/").split("/")[-1]
-            elif "tiktok.com" in url and "tiktok_url" not in urls:
-                urls["tiktok_url"] = url
-                urls["tiktok_handle"] = url.rstrip("/").split("/")[-1].replace("@", "")
-            elif "youtube.com" in url and "youtube_url" not in urls:
-                urls["youtube_url"] = url
-                urls["youtube_channel_id"] = url.rstrip("/").split("/")[-1]
-            elif "soundcloud.com" in url and "soundcloud_url" not in urls:
-                urls["soundcloud_url"] = url
-                urls["soundcloud_handle"] = url.rstrip("/").split("/")[-1]
-            elif "twitter.com" in url and "twitter_url" not in urls:
-                urls["twitter_url"] = url
-                urls["twitter_handle"] = url.rstrip("/").split("/")[-1]
-            elif "facebook.com" in url and "facebook_url" not in urls:
-                urls["facebook_url"] = url
-            elif rel.get("type") == "official homepage" and "website_url" not in urls:
-                urls["website_url"] = url
+            mb_response_cache[artist_id] = artist
 
+        urls = links_from_artist(artist)
         return urls if urls else None
     except:
         return None
 
-save_interval = 500
+# Rows are appended to the checkpoint log as they finish; fsync every N rows
+save_interval = 100
 
 social_cols = [
     "Artist", "Artist country", "instagram_url", "instagram_handle", "tiktok_url", "tiktok_handle",
@@ -87,55 +133,189 @@ social_cols = [
     "twitter_handle", "facebook_url", "website_url"
 ]
 
-for file_path in file_paths:
-    CHECKPOINT_CSV = file_path.replace(".xlsx", "_CHECKPOINT.csv")
-    FINAL_EXCEL = file_path.replace(".xlsx", "_SOCIAL_LINKS_FINAL.xlsx")
+def process_artist(artist):
+    links = get_all_social_links(artist)
+    row = {"Artist": artist}
+    if links:
+        row.update(links)
+    return row
+
+
+def run_threaded(artists, on_result):
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(process_artist, a): a for a in artists}
+        for idx, future in enumerate(as_completed(futures), start=1):
+            on_result(idx, future.result())
+
+
+async def lookup_cached(engine, artist):
+    # Reuse a known MBID so only the url-rels request is made
+    mbid = cached_mbid(artist)
+    links = await lookup_musicbrainz(engine, repair_mojibake(artist), mbid, mb_response_cache,
+                                     mb_negative_cache, mb_replica)
+    found = links.pop("mbid", None)
+    if found and mbid is None:
+        mb_id_cache[normalize_name(artist)] = found
+    return links
+
+
+async def run_async(artists, on_result):
+    async with AsyncEngine(max_in_flight=MAX_IN_FLIGHT) as engine:
+        idx = 0
+        async for artist, links in engine.map(lookup_cached, artists):
+            idx += 1
+            row = {"Artist": artist}
+            row.update(links)
+            on_result(idx, row)
+    print(f"Async engine: {engine.flights.stats()}", flush=True)
+
+
+def load_job(file_path):
+    checkpoint_csv = file_path.replace(".xlsx", "_CHECKPOINT.csv")
+    checkpoint_log = file_path.replace(".xlsx", "_CHECKPOINT.jsonl")
 
     print(f"Loading {file_path}...", flush=True)
     df_artists = pd.read_excel(file_path, sheet_name="Sheet1")
 
     artist_col = next((c for c in df_artists.columns if "artist" in c.lower() or "name" in c.lower()), df_artists.columns[0])
+    uuid_col = next((c for c in df_artists.columns if "uuid" in c.lower()), None)
+    spotify_col = next((c for c in df_artists.columns if c.lower().replace(" ", "_") == "spotify_id"), None)
+    artists = pd.DataFrame({
+        "Artist": df_artists[artist_col],
+        "uuid": df_artists[uuid_col] if uuid_col else None,
+        "spotify_id": df_artists[spotify_col] if spotify_col else None,
+    })
+
+    checkpoint = CheckpointLog(checkpoint_log, sync_every=save_interval)
+    imported = checkpoint.import_csv(checkpoint_csv)
+    if imported:
+        print(f"Imported {imported} rows from {checkpoint_csv} into {checkpoint_log}", flush=True)
+    return {"path": file_path, "checkpoint_csv": checkpoint_csv, "artists": artists, "checkpoint": checkpoint}
+
+
+# ---------------------------------------------------------------------------
+# Plan: every file's artists, deduped across categories, enriched once
+# ---------------------------------------------------------------------------
+
+jobs = {job["path"]: job for job in map(load_job, file_paths)}
+plan = plan_lookups({path: job["artists"] for path, job in jobs.items()}, uuid_col="uuid")
+
+# Rows already in any checkpoint are reused for every file, by lookup key
+key_of_name = plan.drop_duplicates("name_key").set_index("name_key")["lookup_key"].to_dict()
+done_rows = {}
+done_names = {}
+for path, job in jobs.items():
+    done_names[path] = set()
+    for record in job["checkpoint"].records:
+        name_key = normalize_name(record.get("Artist"))
+        done_names[path].add(name_key)
+        done_rows.setdefault(key_of_name.get(name_key, name_key), record)
+
+pending = plan[[name_key not in done_names[source] for source, name_key in zip(plan["source"], plan["name_key"])]]
+reused = pending["lookup_key"].isin(done_rows.keys())
+for source, name, lookup_key in pending.loc[reused, ["source", "name", "lookup_key"]].itertuples(index=False):
+    jobs[source]["checkpoint"].append({**done_rows[lookup_key], "Artist": name})
+
+# Representative name -> every (file, name) its result fans out to
+to_fetch = pending[~reused]
+fan_out = {
+    rep: list(zip(group["source"], group["name"]))
+    for rep, group in to_fetch.groupby("representative", sort=False)
+}
+artists = list(fan_out)
+
+for path, job in jobs.items():
+    print(f"{path}: {int((plan['source'] == path).sum())} artists, "
+          f"{len(done_names[path])} already done", flush=True)
+print(f"Plan: {len(pending)} artist rows to fill, {int(reused.sum())} from existing results, "
+      f"{len(artists)} unique lookups ({len(to_fetch) - len(artists)} shared across files or spellings)",
+      flush=True)
+
+# ---------------------------------------------------------------------------
+# Resolve: MBIDs of artists with a known Spotify ID, 100 per request via
+# /ws/2/url, then of the rest by batched name search, so the run below mostly
+# only fetches url-rels
+# ---------------------------------------------------------------------------
 
-    if os.path.exists(CHECKPOINT_CSV):
-        df_checkpoint = pd.read_csv(CHECKPOINT_CSV)
-        # Dynamically find the column for artist names
-        artist_col_checkpoint = next((c for c in df_checkpoint.columns if "artist" in c.lower()), None)
-        if artist_col_checkpoint:
-            processed = set(df_checkpoint[artist_col_checkpoint].astype(str))
+spotify_of_key = {}
+for job in jobs.values():
+    known = job["artists"].dropna(subset=["Artist", "spotify_id"])
+    for name, spotify_id in zip(known["Artist"], known["spotify_id"].astype(str).str.strip()):
+        if spotify_id:
+            spotify_of_key.setdefault(key_of_name.get(normalize_name(name)), spotify_id)
+
+unresolved = {
+    spotify_of_key[key]: rep
+    for rep, key in to_fetch.drop_duplicates("representative")[["representative", "lookup_key"]].itertuples(index=False)
+    if key in spotify_of_key and cached_mbid(rep) is None
+}
+if unresolved:
+    resolved = MusicBrainzClient(USER_AGENT).resolve_spotify_ids(list(unresolved))
+    for spotify_id, mbid in resolved.items():
+        mb_id_cache[normalize_name(unresolved[spotify_id])] = mbid
+    print(f"Resolved {len(resolved)} of {len(unresolved)} Spotify IDs to MBIDs without a search", flush=True)
+
+# Everyone else without a known MBID is searched SEARCH_BATCH names per
+# request; names a batch can't place keep their single search in the run below
+unsearched = {repair_mojibake(a): a for a in artists if cached_mbid(a) is None}
+if unsearched:
+    found = MusicBrainzClient(USER_AGENT, negative_cache=mb_negative_cache, replica=mb_replica).search_artists(
+        list(unsearched), fallback=False
+    )
+    for name, hit in found.items():
+        if hit is not None:
+            mb_id_cache[normalize_name(unsearched[name])] = hit["id"]
+    print(f"Batch search matched {sum(h is not None for h in found.values())} of {len(unsearched)} "
+          f"artists without an MBID", flush=True)
+
+
+# Each unique lookup runs in the stage of the first file that needs it. A file
+# is complete after its own stage: whatever it shares with earlier files was
+# fetched in theirs and fanned out to its checkpoint already.
+owner = to_fetch.drop_duplicates("representative").set_index("representative")["source"].to_dict()
+
+
+def on_result(stage_size, idx, row):
+    for source, name in fan_out[row["Artist"]]:
+        jobs[source]["checkpoint"].append({**row, "Artist": name})
+    if idx % 100 == 0:
+        print(f"Processed {idx} of {stage_size} unique artists", flush=True)
+
+
+for path, job in jobs.items():
+    stage = [a for a in artists if owner[a] == path]
+    for cache in (mb_id_cache, mb_response_cache, mb_negative_cache):
+        cache.reset_stats()
+    if stage:
+        print(f"\n{path}: {len(stage)} unique lookups", flush=True)
+        if USE_ASYNC and AsyncEngine is not None:
+            asyncio.run(run_async(stage, partial(on_result, len(stage))))
         else:
-            print(f"Error: No artist column found in {CHECKPOINT_CSV}", flush=True)
-            processed = set()
-        results = df_checkpoint.to_dict("records")
-    else:
-        processed = set()
-        results = []
-
-    artists = [a for a in df_artists[artist_col].dropna().unique().tolist() if str(a) not in processed]
-    print(f"Processing {len(artists)} artists from {file_path}", flush=True)
-
-    def process_artist(artist):
-        time.sleep(1.1)
-        links = get_all_social_links(artist)
-        row = {"Artist": artist}
-        if links:
-            row.update(links)
-        return row
+            run_threaded(stage, partial(on_result, len(stage)))
+    mb_id_cache.flush()
+    mb_response_cache.flush()
 
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = {executor.submit(process_artist, a): a for a in artists}
-        for idx, future in enumerate(as_completed(futures), start=1):
-            results.append(future.result())
-            if idx % 100 == 0:
-                print(f"Processed {idx} artists from {file_path}", flush=True)
-            if idx % save_interval == 0:
-                pd.DataFrame(results, columns=social_cols).to_csv(CHECKPOINT_CSV, index=False)
+    checkpoint = job["checkpoint"]
+    checkpoint.close()
+    df_final = checkpoint.to_frame(social_cols)
+    df_final.to_csv(job["checkpoint_csv"], index=False)
 
-    df_final = pd.DataFrame(results, columns=social_cols)
-    df_final.to_csv(CHECKPOINT_CSV, index=False)
+    # Swap just the Social Links sheet; the other sheets are copied untouched
+    replace_sheet(path, "Social Links", *frame_rows(df_final))
 
-    with pd.ExcelWriter(file_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        df_final.to_excel(writer, sheet_name="Social Links", index=False)
+    print(f"\nCompleted processing {path}!", flush=True)
+    print(f"MusicBrainz cache:", flush=True)
+    print(f"  {mb_id_cache.stats()}", flush=True)
+    print(f"  {mb_response_cache.stats()}", flush=True)
+    print(f"  {mb_negative_cache.stats()}", flush=True)
 
-    print(f"\nCompleted processing {file_path}!", flush=True)
+if mb_replica:
+    print(f"{mb_replica.stats()}", flush=True)
+print(f"{http_client.flights.stats()}", flush=True)
 
+mb_id_cache.close()
+mb_response_cache.close()
+mb_negative_cache.close()
+if mb_replica:
+    mb_replica.close()
 print(f"\nAll files processed!", flush=True)
@@ -0,0 +1,136 @@
+"""
+replace_sheet() on a workbook that already has custom number formats, a
+chart drawing on the sheet being replaced, and a calcChain: the other
+sheet's formats must survive, the new dates must get formats of their own,
+and the old sheet's drawing and the calcChain must leave the package.
+"""
+
+import datetime
+import os
+import re
+import sys
+import zipfile
+
+import openpyxl
+from openpyxl.chart import BarChart, Reference
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.excel_export import (
+    _add_number_formats,
+    _cell_number_formats,
+    _orphaned_parts,
+    replace_sheet,
+)
+
+CALC_CHAIN = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<calcChain xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    b'<c r="B2" i="2"/></calcChain>'
+)
+CALC_CHAIN_REL = (
+    '<Relationship Id="rId99" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/calcChain" '
+    'Target="calcChain.xml"/>'
+)
+CALC_CHAIN_OVERRIDE = (
+    '<Override PartName="/xl/calcChain.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.calcChain+xml"/>'
+)
+
+
+def _add_calc_chain(path: str):
+    """openpyxl never writes a calcChain, so add one the way Excel would."""
+    with zipfile.ZipFile(path) as zf:
+        parts = {item.filename: zf.read(item) for item in zf.infolist()}
+    parts["xl/calcChain.xml"] = CALC_CHAIN
+    rels = parts["xl/_rels/workbook.xml.rels"].decode("utf-8")
+    parts["xl/_rels/workbook.xml.rels"] = rels.replace(
+        "</Relationships>", CALC_CHAIN_REL + "</Relationships>").encode("utf-8")
+    types = parts["[Content_Types].xml"].decode("utf-8")
+    parts["[Content_Types].xml"] = types.replace(
+        "</Types>", CALC_CHAIN_OVERRIDE + "</Types>").encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+
+def _workbook(path: str):
+    wb = openpyxl.Workbook()
+    data = wb.active
+    data.title = "All Data"
+    data["A1"] = "Released"
+    data["A2"] = datetime.date(2020, 5, 6)
+    data["A2"].number_format = "dd/mm/yyyy"
+    data["B1"] = "Plays"
+    data["B2"] = 1500
+    data["B2"].number_format = '#,##0 "plays"'
+
+    social = wb.create_sheet("Social Links")
+    social.append(["artist", "followers"])
+    social.append(["Old Artist", 10])
+    chart = BarChart()
+    chart.add_data(Reference(social, min_col=2, min_row=1, max_row=2), titles_from_data=True)
+    social.add_chart(chart, "D2")
+    wb.save(path)
+    _add_calc_chain(path)
+
+
+def test_replace_sheet_with_formats_drawing_and_calc_chain(tmp_path):
+    path = str(tmp_path / "final.xlsx")
+    _workbook(path)
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        orphans = _orphaned_parts(zf, "xl/worksheets/sheet2.xml")
+    assert "xl/calcChain.xml" in names
+    assert orphans == {"xl/drawings/drawing1.xml", "xl/charts/chart1.xml"}
+
+    rows = [("New Artist", datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4))]
+    assert replace_sheet(path, "Social Links", ["artist", "joined", "seen"], rows) == 1
+
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        content_types = zf.read("[Content_Types].xml").decode("utf-8")
+        rels = zf.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+    for part in ("xl/calcChain.xml", "xl/drawings/drawing1.xml", "xl/charts/chart1.xml",
+                 "xl/worksheets/_rels/sheet2.xml.rels"):
+        assert part not in names
+        assert f'PartName="/{part}"' not in content_types
+    assert "calcChain" not in rels
+
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == ["All Data", "Social Links"]
+    data = wb["All Data"]
+    assert data["A2"].number_format == "dd/mm/yyyy"
+    assert data["B2"].number_format == '#,##0 "plays"'
+    social = wb["Social Links"]
+    assert [c.value for c in social[1]] == ["artist", "joined", "seen"]
+    assert social["A2"].value == "New Artist"
+    assert social["B2"].value == datetime.datetime(2024, 1, 2)
+    assert social["C2"].value == datetime.datetime(2024, 1, 2, 3, 4)
+    assert social["B2"].is_date and social["C2"].is_date
+
+
+def test_add_number_formats_reuses_existing_codes():
+    styles = (
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs></styleSheet>'
+    )
+    formats = [(0, None), (164, "yyyy-mm-dd"), (165, "yyyy-mm-dd h:mm:ss"), (14, None)]
+    new_styles, mapping = _add_number_formats(styles, formats)
+
+    # The known code keeps its id; only the unknown one is added, after 164
+    assert re.findall(r'numFmtId="(\d+)" formatCode="([^"]*)"', new_styles) == [
+        ("164", "yyyy-mm-dd"), ("165", "yyyy-mm-dd h:mm:ss"),
+    ]
+    assert '<numFmts count="2">' in new_styles
+    assert mapping == {0: 0, 1: 1, 2: 2, 3: 3}
+    assert [fmt for fmt, _ in _cell_number_formats(new_styles.encode("utf-8"))] == [0, 164, 165, 14]
+
+    # A second call finds the entries the first one added
+    again, mapping = _add_number_formats(new_styles, formats)
+    assert again == new_styles
+    assert mapping == {0: 0, 1: 1, 2: 2, 3: 3}
@@ -0,0 +1,37 @@
+"""
+demux_hits() splitting one OR'd artist search back into per-name results,
+with an alias match and a homonym in the same batch.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.musicbrainz import batch_query, demux_hits
+
+
+def test_demux_alias_and_homonym_in_one_batch():
+    names = ["Nirvana", "beyoncé  knowles", "nirvana ", "Nobody Here"]
+    hits = [
+        # Two artists called Nirvana, best score first
+        {"id": "nirvana-us", "name": "Nirvana", "score": 100},
+        {"id": "beyonce", "name": "Beyoncé", "score": 98,
+         "aliases": [{"name": "Beyoncé Knowles"}, {"name": "B"}]},
+        {"id": "nirvana-uk", "name": "Nirvana", "score": 97},
+        # Only a partial match for a name nobody asked for exactly
+        {"id": "nobody", "name": "Nobody", "score": 91, "aliases": None},
+    ]
+    matched = demux_hits(hits, names)
+
+    # Both spellings of the homonym get the best-scored hit, not the later one
+    assert matched["Nirvana"]["id"] == "nirvana-us"
+    assert matched["nirvana "]["id"] == "nirvana-us"
+    # Matched through an alias, case and spacing folded
+    assert matched["beyoncé  knowles"]["id"] == "beyonce"
+    assert "Nobody Here" not in matched
+    assert set(matched) == {"Nirvana", "nirvana ", "beyoncé  knowles"}
+
+
+def test_batch_query_quotes_each_name():
+    assert batch_query(['Say "Hi"', "A\\B"]) == 'artist:"Say \\"Hi\\"" OR artist:"A\\\\B"'
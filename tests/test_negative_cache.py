@@ -0,0 +1,51 @@
+"""
+Two processes sharing one negative-cache file, as the workers of
+enrich_dj_sharded.py do: one keeps reading hits while the other opens the
+cache and records a miss. The writer must not wait on the reader.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.negative_cache import NO_LINKS, NO_RESULTS, NegativeCache
+
+# Far below the 30s SQLite busy timeout a held lock would run into
+MAX_WRITE_SECONDS = 5
+
+
+def _read_hits(path: str, ready, done):
+    negatives = NegativeCache("musicbrainz", path=path)
+    negatives.record("Known Miss", NO_RESULTS)
+    assert "Known Miss" in negatives
+    ready.set()
+    # Keep reading, without closing, until the other process is done
+    while not done.is_set():
+        assert "Known Miss" in negatives
+        time.sleep(0.01)
+    negatives.close()
+
+
+def test_reader_does_not_block_writer(tmp_path):
+    path = str(tmp_path / "negative_cache.sqlite")
+    ctx = multiprocessing.get_context("spawn")
+    ready, done = ctx.Event(), ctx.Event()
+    reader = ctx.Process(target=_read_hits, args=(path, ready, done))
+    reader.start()
+    try:
+        assert ready.wait(30)
+        started = time.monotonic()
+        with NegativeCache("musicbrainz", path=path) as negatives:
+            negatives.record("New Miss", NO_LINKS)
+            assert negatives.reason("Known Miss") == NO_RESULTS
+        assert time.monotonic() - started < MAX_WRITE_SECONDS
+    finally:
+        done.set()
+        reader.join(30)
+    assert reader.exitcode == 0
+
+    with NegativeCache("musicbrainz", path=path) as negatives:
+        assert negatives.reason("New Miss") == NO_LINKS
@@ -0,0 +1,79 @@
+"""
+ArtistStore.merge() matching rows by artist_keys(): Soundcharts uuids
+first, normalised names for rows without one, the first stored row for a
+key stored twice, and the last incoming row for a key sent twice.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from social_links.store import ArtistStore, artist_keys
+
+
+def test_artist_keys_fall_back_to_normalised_names():
+    df = pd.DataFrame({
+        "artist_name": ["Lil Foo", "  DJ  BAR ", "Baz", None],
+        "soundcharts_uuid": ["u1", None, "nan", ""],
+    })
+    assert artist_keys(df).tolist() == ["u1", "name:dj bar", "name:baz", "name:"]
+    assert artist_keys(df[["artist_name"]]).tolist() == ["name:lil foo", "name:dj bar", "name:baz", "name:"]
+
+
+def test_merge_duplicate_and_uuid_less_keys(tmp_path):
+    store = ArtistStore(str(tmp_path))
+    store.write("rappers", pd.DataFrame({
+        "artist_name": ["Lil Foo", "DJ Bar", "Lil Foo (dupe)", "Qux"],
+        "soundcharts_uuid": ["u1", None, "u1", "u4"],
+        "instagram_url": ["https://instagram.com/foo", None, "https://instagram.com/dupe", None],
+        "twitter_url": [None, "https://twitter.com/djbar", None, None],
+        "Followers": ["100", "200", "300", "400"],
+    }))
+
+    updated, added = store.merge("rappers", pd.DataFrame({
+        # u1 sent twice: the last row wins, and goes to the first stored u1 row
+        "artist_name": ["Lil Foo", "Lil Foo", "dj bar", "New Artist"],
+        "soundcharts_uuid": ["u1", "u1", "", None],
+        "instagram_url": ["https://instagram.com/stale", None, "https://instagram.com/djbar", None],
+        "twitter_url": [None, "https://twitter.com/foo", None, "https://twitter.com/new"],
+    }))
+    assert (updated, added) == (2, 1)
+
+    df = store.read("rappers")
+    # Matched rows take the incoming spelling of the name
+    assert df["artist_name"].tolist() == ["Lil Foo", "dj bar", "Lil Foo (dupe)", "Qux", "New Artist"]
+    # Empty cells in the update keep the stored value
+    assert df.loc[0, "instagram_url"] == "https://instagram.com/foo"
+    assert df.loc[0, "twitter_url"] == "https://twitter.com/foo"
+    # The uuid-less row matched by its normalised name
+    assert df.loc[1, "instagram_url"] == "https://instagram.com/djbar"
+    assert df.loc[1, "twitter_url"] == "https://twitter.com/djbar"
+    # The second stored u1 row and unmatched rows are untouched
+    assert df.loc[2, "instagram_url"] == "https://instagram.com/dupe"
+    assert pd.isna(df.loc[2, "twitter_url"])
+    assert df["Followers"].tolist()[:4] == ["100", "200", "300", "400"]
+    assert pd.isna(df.loc[4, "Followers"])
+    assert df.loc[4, "twitter_url"] == "https://twitter.com/new"
+
+
+def test_join_by_name_keeps_outside_values(tmp_path):
+    store = ArtistStore(str(tmp_path))
+    store.write("dj_producers", pd.DataFrame({
+        "artist_name": ["DJ Bar", "dj  bar", "Qux"],
+        "instagram_url": [None, "https://instagram.com/second", "https://instagram.com/qux"],
+        "lookup_status": ["spotify", "musicbrainz", None],
+    }))
+    soundcharts = pd.DataFrame({
+        "Artist": ["DJ BAR", "Nobody", "qux"],
+        "lookup_status": ["auto_generated"] * 3,
+    })
+    df = store.join_by_name("dj_producers", soundcharts, columns=["instagram_url", "lookup_status"])
+
+    # The first stored DJ Bar wins even where it is empty
+    assert pd.isna(df.loc[0, "instagram_url"])
+    assert df["lookup_status"].tolist() == ["spotify", "auto_generated", "auto_generated"]
+    assert df.loc[2, "instagram_url"] == "https://instagram.com/qux"
+    assert list(soundcharts.columns) == ["Artist", "lookup_status"]